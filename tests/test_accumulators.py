@@ -0,0 +1,65 @@
+"""增量回归累加器：分块合并与一次拟合一致，加入后删除回到零累加和"""
+import importlib.util
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '数据分析.py')
+_spec = importlib.util.spec_from_file_location('shuju_fenxi', SCRIPT)
+m = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(m)
+
+FIT_COLUMNS = ['点数_n', '系数_a', '指数_b', '相关系数_r']
+
+
+@pytest.fixture(scope='module')
+def series_dfs():
+    rng = np.random.default_rng(1)
+    n = 2000
+    table = pd.DataFrame({
+        'series': np.where(np.arange(n) % 2, 'I', 'II'),
+        'L_v': rng.uniform(10, 80, n),
+        'V_g': rng.uniform(10, 30, n),
+        'T': rng.uniform(15, 28, n),
+        'C1': rng.uniform(19, 27, n),
+        'C2': rng.uniform(9, 12, n),
+    })
+    return m.process_long_table(table, 0.8)
+
+
+def _split_accumulators(series_dfs):
+    halves = [m.RelationshipAccumulators(), m.RelationshipAccumulators()]
+    for name, df in series_dfs.items():
+        halves[0].add(name, df.iloc[:len(df) // 2])
+        halves[1].add(name, df.iloc[len(df) // 2:])
+    return halves
+
+
+def test_merge_matches_fit_series_table(series_dfs):
+    first, second = _split_accumulators(series_dfs)
+    merged = first.merge(second).fit_table()
+    reference = m.fit_series_table(series_dfs, n_boot=0)
+    pd.testing.assert_frame_equal(merged[['关系', '系列']], reference[['关系', '系列']])
+    np.testing.assert_allclose(merged[FIT_COLUMNS].to_numpy(float), reference[FIT_COLUMNS].to_numpy(float), rtol=1e-9)
+
+
+def test_add_then_remove_returns_to_zero(series_dfs):
+    acc = m.RelationshipAccumulators()
+    for name, df in series_dfs.items():
+        acc.add(name, df)
+    scale = max(np.abs(a.sums).max() for a in acc.accumulators.values())
+    for name, df in series_dfs.items():
+        acc.remove(name, df)
+    for a in acc.accumulators.values():
+        np.testing.assert_allclose(a.sums, 0, atol=1e-9 * scale)
+        assert a.n == 0
+
+
+def test_archive_fit_matches_direct_fit(tmp_path, series_dfs):
+    db = str(tmp_path / m.RESULTS_DB_NAME)
+    m.record_series_run(series_dfs, 0.8, db_path=db)
+    archive = m.accumulate_results_db(db, chunk_rows=137).fit_table()
+    reference = m.fit_series_table(series_dfs, n_boot=0)
+    np.testing.assert_allclose(archive[FIT_COLUMNS].to_numpy(float), reference[FIT_COLUMNS].to_numpy(float), rtol=1e-9)
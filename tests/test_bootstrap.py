@@ -0,0 +1,51 @@
+"""幂律拟合的bootstrap区间：各(系列, 关系)独立随机数流，与系列顺序、同时拟合的其他系列及分块大小无关"""
+import importlib.util
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '数据分析.py')
+_spec = importlib.util.spec_from_file_location('shuju_fenxi', SCRIPT)
+m = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(m)
+
+N_BOOT = 300
+
+
+@pytest.fixture(scope='module')
+def series_dfs():
+    rng = np.random.default_rng(2)
+    n = 300
+    table = pd.DataFrame({
+        'series': np.array(['I', 'II', 'III'])[np.arange(n) % 3],
+        'L_v': rng.uniform(10, 80, n),
+        'V_g': rng.uniform(10, 30, n),
+        'T': rng.uniform(15, 28, n),
+        'C1': rng.uniform(19, 27, n),
+        'C2': rng.uniform(9, 12, n),
+    })
+    return m.process_long_table(table, 0.8)
+
+
+def _fit(series_dfs):
+    return m.fit_series_table(series_dfs, n_boot=N_BOOT).set_index(['系列', '关系'])
+
+
+def test_intervals_do_not_depend_on_series_order(series_dfs):
+    forward = _fit(series_dfs)
+    backward = _fit(dict(reversed(list(series_dfs.items()))))
+    pd.testing.assert_frame_equal(forward, backward.loc[forward.index])
+
+
+def test_intervals_do_not_depend_on_other_series(series_dfs):
+    together = _fit(series_dfs)
+    alone = _fit({'II': series_dfs['II']})
+    pd.testing.assert_frame_equal(together.loc[alone.index], alone)
+
+
+def test_intervals_do_not_depend_on_chunk_size(series_dfs, monkeypatch):
+    reference = _fit(series_dfs)
+    monkeypatch.setattr(m, 'BOOTSTRAP_CHUNK_ELEMENTS', 1000)
+    pd.testing.assert_frame_equal(_fit(series_dfs), reference)
@@ -0,0 +1,51 @@
+"""向量化计算与逐行参考实现(calculate_kxa_h、validate_data_input)的一致性"""
+import importlib.util
+import os
+
+import numpy as np
+import pytest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '数据分析.py')
+_spec = importlib.util.spec_from_file_location('shuju_fenxi', SCRIPT)
+m = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(m)
+
+N_ROWS = 20000
+
+
+@pytest.fixture(scope='module')
+def rows():
+    """随机输入：含超出温度表、C2低于平衡值、C1<C2等回退分支"""
+    rng = np.random.default_rng(0)
+    return {
+        'L_v': rng.uniform(5, 200, N_ROWS),
+        'V_g': rng.uniform(1, 50, N_ROWS),
+        'T': rng.uniform(-2, 32, N_ROWS),
+        'C1': rng.uniform(2, 30, N_ROWS),
+        'C2': rng.uniform(1, 25, N_ROWS),
+        'h': rng.uniform(0.2, 2.0, N_ROWS),
+    }
+
+
+@pytest.mark.parametrize('D', [0.102, 0.15])
+def test_batch_matches_scalar(rows, D):
+    tower = m.DEFAULT_TOWER.replace(D=D)
+    batch = m.calculate_kxa_h_batch(rows['L_v'], rows['V_g'], rows['T'], rows['C1'], rows['C2'], rows['h'], tower)
+    scalar = np.array([m.calculate_kxa_h(*row, tower)
+                       for row in zip(rows['L_v'], rows['T'], rows['C1'], rows['C2'], rows['h'])])
+    for i, key in enumerate(('Kxa', 'H_OL', 'U_L', 'ln_term', 'x1', 'x2', 'x_star')):
+        np.testing.assert_allclose(batch[key], scalar[:, i], rtol=1e-12, atol=0, err_msg=key)
+
+
+def test_inputs_cover_fallback_branches(rows):
+    batch = m.calculate_kxa_h_batch(rows['L_v'], rows['V_g'], rows['T'], rows['C1'], rows['C2'], rows['h'])
+    main_branch = (batch['x1'] - batch['x_star'] > 0) & (batch['x2'] - batch['x_star'] > 0)
+    assert main_branch.any() and not main_branch.all()
+    assert ((rows['T'] < 0) | (rows['T'] > 30)).any()
+
+
+def test_validation_matches_scalar(rows):
+    codes = m.validate_data_array(rows['T'], rows['C1'], rows['C2'])
+    passed = m.valid_mask(codes, m.ERR_C2_BELOW_SAT | m.ERR_C1_OUT_OF_RANGE)
+    reference = np.array([m.validate_data_input(*row)[0] for row in zip(rows['T'], rows['C1'], rows['C2'])])
+    np.testing.assert_array_equal(passed, reference)
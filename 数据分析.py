@@ -1,25 +1,88 @@
+import time
+_STARTUP_T0 = time.perf_counter()  # 程序启动时刻，供--startup-profile统计
+
 import numpy as np
-import matplotlib.pyplot as plt
-import pandas as pd
 import warnings
-import matplotlib.font_manager as fm
+import importlib
 import os
 import sys  # 新增导入
-from openpyxl import Workbook
-from matplotlib.font_manager import FontProperties
+import threading
 warnings.filterwarnings('ignore')
 
-# 创建中文字体对象
-chinese_font = FontProperties(fname=r"C:\Windows\Fonts\simhei.ttf")  # Windows系统
-# 如果上述路径不行，尝试：
-#chinese_font = FontProperties(family='Microsoft YaHei')
+# ========== 新增：重型库延迟导入 ==========
+# 菜单界面用不到pandas/matplotlib，首次访问属性时才真正导入，缩短冷启动时间
+class _LazyModule:
+    """模块占位对象：首次访问属性时导入真实模块"""
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+pd = _LazyModule('pandas')
+plt = _LazyModule('matplotlib.pyplot')
+fm = _LazyModule('matplotlib.font_manager')
+asyncio = _LazyModule('asyncio')   # 只有实时采集模式用到
+
+# 中文字体在plot_figures中按系统可用字体选择，不在导入时加载字体文件
+
+# ========== 新增：塔配置（代替实验常数全局变量） ==========
+class TowerConfig:
+    """一座填料塔的几何尺寸与物性常数
+
+    创建后不可修改，可在线程、进程之间直接共享；参数不同时用replace()生成新配置。
+    h为该塔默认的填料层高度，计算函数仍按调用时传入的h计算
+    """
+    _PARAMS = ('D', 'h', 'M_w', 'M_O2', 'rho_w')
+    __slots__ = _PARAMS + ('F',)
+
+    def __init__(self, D=0.102, h=0.8, M_w=18.015, M_O2=32.00, rho_w=1000):
+        for name, value in zip(self._PARAMS, (D, h, M_w, M_O2, rho_w)):
+            value = float(value)
+            if not value > 0:
+                raise ValueError(f"塔配置参数 {name} 必须为正数: {value}")
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, 'F', np.pi * self.D**2 / 4)   # 塔截面积
+
+    def __setattr__(self, name, value):
+        raise AttributeError("TowerConfig不可修改，请用replace()生成新配置")
 
-# 实验常数
-D = 0.102
-F = np.pi * D**2 / 4
-M_w = 18.015
-M_O2 = 32.00
-rho_w = 1000
+    def params(self):
+        """构造参数字典"""
+        return {name: getattr(self, name) for name in self._PARAMS}
+
+    def replace(self, **changes):
+        """返回修改了部分参数的新配置"""
+        return TowerConfig(**{**self.params(), **changes})
+
+    @classmethod
+    def from_table(cls, df, base=None, **overrides):
+        """批处理用：参数取overrides中非None的值，其次取数据表中同名列的首行，否则沿用base"""
+        base = DEFAULT_TOWER if base is None else base
+        changes = {}
+        for name in cls._PARAMS:
+            if overrides.get(name) is not None:
+                changes[name] = overrides[name]
+            elif name in df.columns and len(df) and pd.notna(df[name].iloc[0]):
+                changes[name] = float(df[name].iloc[0])
+        return base.replace(**changes)
+
+    def __reduce__(self):
+        return (TowerConfig, tuple(self.params().values()))
+
+    def __eq__(self, other):
+        return isinstance(other, TowerConfig) and self.params() == other.params()
+
+    def __hash__(self):
+        return hash(tuple(self.params().values()))
+
+    def __repr__(self):
+        return "TowerConfig(" + ", ".join(f"{k}={v:g}" for k, v in self.params().items()) + ")"
+
+DEFAULT_TOWER = TowerConfig()   # 实验室标准塔：内径102 mm
 
 # 氧平衡浓度表
 temp_x_star = {
@@ -43,22 +106,33 @@ C_sat_dict = {
     30: 7.54
 }
 
-def get_C_sat(T):
-    """根据温度获取氧饱和浓度(mg/L)"""
-    T_int = int(T)
-    if T_int in C_sat_dict:
-        if T == T_int:
-            return C_sat_dict[T_int]
-        else:
-            T1, T2 = T_int, T_int + 1
-            if T2 in C_sat_dict:
-                C1, C2 = C_sat_dict[T1], C_sat_dict[T2]
-                return C1 + (C2 - C1) * (T - T1)
-    if T < 0:
-        return C_sat_dict[0]
-    elif T > 30:
-        return C_sat_dict[30]
-    return 8.26  # 25°C的默认值
+# ========== 新增：温度表的数组化插值 ==========
+# 由上面两张字典表预先构建有序数组，查表时整列插值，无逐点分支
+_T_grid = np.array(sorted(temp_x_star), dtype=float)
+_x_star_grid = np.array([temp_x_star[t] for t in sorted(temp_x_star)])
+_C_sat_grid = np.array([C_sat_dict[t] for t in sorted(C_sat_dict)])
+
+# 细分辨率表（0.01°C步长），导入时构建一次，查表时按均匀网格直接取下标
+# 最近邻误差不超过原表末位精度
+FINE_T_STEP = 0.01
+_T_fine = np.arange(_T_grid[0], _T_grid[-1] + FINE_T_STEP / 2, FINE_T_STEP)
+_x_star_fine = np.interp(_T_fine, _T_grid, _x_star_grid)
+_C_sat_fine = np.interp(_T_fine, _T_grid, _C_sat_grid)
+
+def _lookup_by_temperature(T, values, fine_values, fine):
+    """按温度查表：超出0-30°C时取端点值，T非有限值时为NaN；标量输入返回float，数组输入返回数组"""
+    T = np.asarray(T, dtype=float)
+    if fine:
+        idx = np.rint((np.clip(T, _T_fine[0], _T_fine[-1]) - _T_fine[0]) / FINE_T_STEP)
+        finite = np.isfinite(idx)   # NaN转为整数下标会越界，单独屏蔽
+        result = np.where(finite, fine_values[np.where(finite, idx, 0).astype(np.intp)], np.nan)
+    else:
+        result = np.interp(T, _T_grid, values)
+    return float(result) if result.ndim == 0 else result
+
+def get_C_sat(T, fine=False):
+    """根据温度获取氧饱和浓度(mg/L)，T可为标量或数组"""
+    return _lookup_by_temperature(T, _C_sat_grid, _C_sat_fine, fine)
 
 def validate_data_input(T, C1, C2):
     """验证输入数据是否满足条件"""
@@ -80,32 +154,90 @@ def validate_data_input(T, C1, C2):
             error_msg += f"当前：C1 = {C1:.2f} mg/L，不在18-28 mg/L范围内"
         return False, error_msg
 
-def get_x_star(T):
-    """根据温度获取平衡摩尔分数"""
-    T_int = int(T)
-    if T_int in temp_x_star:
-        if T == T_int:
-            return temp_x_star[T_int]
-        else:
-            T1, T2 = T_int, T_int + 1
-            if T2 in temp_x_star:
-                x1, x2 = temp_x_star[T1], temp_x_star[T2]
-                return x1 + (x2 - x1) * (T - T1)
-    if T < 0:
-        return temp_x_star[0]
-    elif T > 30:
-        return temp_x_star[30]
-    return 4.65e-6
-
-def concentration_to_mole_fraction(C):
+# 整列验证错误码（按位组合，0表示通过）
+ERR_OK = 0
+ERR_C2_BELOW_SAT = 1       # C2 < C_sat
+ERR_C1_OUT_OF_RANGE = 2    # C1不在18-28 mg/L范围内
+ERR_FLOW_NON_POSITIVE = 4  # 液体或气体流量 ≤ 0
+ERR_T_OUT_OF_TABLE = 8     # 水温超出平衡/饱和浓度表范围(0-30°C)
+
+ERROR_CODE_MESSAGES = {
+    ERR_C2_BELOW_SAT: 'C2低于该温度下的饱和浓度C_sat',
+    ERR_C1_OUT_OF_RANGE: 'C1不在18-28 mg/L范围内',
+    ERR_FLOW_NON_POSITIVE: '流量L_v或V_g不为正',
+    ERR_T_OUT_OF_TABLE: '水温超出0-30°C的查表范围',
+}
+
+def validate_data_array(T, C1, C2, L_v=None, V_g=None):
+    """整列验证输入数据，返回每行的uint8错误码（按位组合，ERR_OK为通过）
+
+    C2、C1的条件同validate_data_input，另检查水温是否在表内；给出L_v、V_g时检查流量为正。
+    只产生整数码，说明文字由format_error_code按需生成
+    """
+    T = np.asarray(T, dtype=float)
+    C1 = np.asarray(C1, dtype=float)
+    C2 = np.asarray(C2, dtype=float)
+    codes = (~(C2 >= get_C_sat(T))).astype(np.uint8) * np.uint8(ERR_C2_BELOW_SAT)
+    codes |= (~((C1 >= 18) & (C1 <= 28))).astype(np.uint8) * np.uint8(ERR_C1_OUT_OF_RANGE)
+    codes |= (~((T >= _T_grid[0]) & (T <= _T_grid[-1]))).astype(np.uint8) * np.uint8(ERR_T_OUT_OF_TABLE)
+    for flow in (L_v, V_g):
+        if flow is not None:
+            codes |= (~(np.asarray(flow, dtype=float) > 0)).astype(np.uint8) * np.uint8(ERR_FLOW_NON_POSITIVE)
+    return codes
+
+def valid_mask(codes, flags=0xFF):
+    """错误码 -> 布尔掩码：不含flags中任何一位的行为True（默认即通过全部检查的行）"""
+    return (np.asarray(codes) & np.uint8(flags)) == 0
+
+def format_error_code(code, T=None, C1=None, C2=None, L_v=None, V_g=None):
+    """把一行的错误码渲染为说明文字，只在需要展示该行时调用；给出数值时附带当前值"""
+    code = int(code)
+    parts = []
+    for flag, msg in ERROR_CODE_MESSAGES.items():
+        if not code & flag:
+            continue
+        if flag == ERR_C2_BELOW_SAT and T is not None and C2 is not None:
+            C_sat = get_C_sat(T)
+            msg += f"：C2({C2:.2f}) - C_sat({C_sat:.2f}) = {C2 - C_sat:.2f} < 0"
+        elif flag == ERR_C1_OUT_OF_RANGE and C1 is not None:
+            msg += f"：当前C1 = {C1:.2f} mg/L"
+        elif flag == ERR_FLOW_NON_POSITIVE and L_v is not None and V_g is not None:
+            msg += f"：当前L_v = {L_v:g}，V_g = {V_g:g}"
+        elif flag == ERR_T_OUT_OF_TABLE and T is not None:
+            msg += f"：当前T = {T:g}°C"
+        parts.append(msg)
+    return '；'.join(parts)
+
+def iter_error_messages(codes, L_v=None, V_g=None, T=None, C1=None, C2=None, limit=None):
+    """逐个产出未通过验证的行(行号, 说明文字)；按需迭代，只为实际查看的行生成字符串"""
+    bad_rows = np.flatnonzero(np.asarray(codes))
+    for row in bad_rows[:limit]:
+        values = {name: (None if col is None else float(col[row]))
+                  for name, col in (('L_v', L_v), ('V_g', V_g), ('T', T), ('C1', C1), ('C2', C2))}
+        yield int(row), format_error_code(codes[row], **values)
+
+def summarize_error_codes(codes):
+    """统计错误码数组中各类错误的行数，返回{说明: 行数}"""
+    codes = np.asarray(codes)
+    return {msg: int(np.count_nonzero(codes & flag))
+            for flag, msg in ERROR_CODE_MESSAGES.items() if np.any(codes & flag)}
+
+def get_x_star(T, fine=False):
+    """根据温度获取平衡摩尔分数，T可为标量或数组"""
+    return _lookup_by_temperature(T, _x_star_grid, _x_star_fine, fine)
+
+def concentration_to_mole_fraction(C, tower=None):
     """将mg/L浓度转换为摩尔分数"""
-    return C / (M_O2 * 1000) / (1000 / M_w)
+    tower = DEFAULT_TOWER if tower is None else tower
+    return C / (tower.M_O2 * 1000) / (1000 / tower.M_w)
 
-def calculate_kxa_h(L_v, T, C1, C2, h):
-    """计算Kxa和H_OL"""
-    L = (L_v * rho_w) / (M_w * 1000)
-    x1 = concentration_to_mole_fraction(C1)
-    x2 = concentration_to_mole_fraction(C2)
+def calculate_kxa_h(L_v, T, C1, C2, h, tower=None):
+    """计算Kxa和H_OL（tower为塔配置，默认DEFAULT_TOWER）"""
+    tower = DEFAULT_TOWER if tower is None else tower
+    F = tower.F
+    L = (L_v * tower.rho_w) / (tower.M_w * 1000)
+    x1 = concentration_to_mole_fraction(C1, tower)
+    x2 = concentration_to_mole_fraction(C2, tower)
     x_star = get_x_star(T)
     
     # 确保推动力为正
@@ -124,116 +256,775 @@ def calculate_kxa_h(L_v, T, C1, C2, h):
     
     return Kxa, H_OL, U_L, ln_term, x1, x2, x_star
 
-def process_series_data(series_name, data, h):
-    """处理一个系列的数据"""
-    results = []
-    
-    for i, (L_v, V_g, T, C1, C2) in enumerate(data, 1):
-        Kxa, H_OL, U_L, ln_term, x1, x2, x_star = calculate_kxa_h(L_v, T, C1, C2, h)
-        
-        u = (V_g / 3600) / F
-        L_mol = (L_v * rho_w) / (M_w * 1000)
-        
-        result = {
-            '组号': f'{series_name}-{i}',
-            '液体流量_L_v_L_h': L_v,
-            '气体流量_V_g_m3_h': V_g,
-            '水温_T_C': T,
-            '入口浓度_C1_mg_L': C1,
-            '出口浓度_C2_mg_L': C2,
-            '喷淋密度_U_L_m3_m2_h': U_L,
-            '空塔气速_u_m_s': u,
-            '液体摩尔流量_L_kmol_h': L_mol,
-            '入口摩尔分数_x1': x1,
-            '出口摩尔分数_x2': x2,
-            '平衡摩尔分数_x_star': x_star,
-            '对数项_ln': ln_term,
-            '体积传质系数_Kxa_kmol_m3_h': Kxa,
-            '传质单元高度_H_OL_m': H_OL
-        }
-        results.append(result)
-    
-    return pd.DataFrame(results)
+# ========== 新增：向量化批量计算引擎 ==========
+def calculate_kxa_h_batch(L_v, V_g, T, C1, C2, h, tower=None):
+    """向量化计算Kxa和H_OL（整列输入，结果与calculate_kxa_h逐行一致）
+
+    参数均可为标量或等长数组（h可广播），tower为塔配置（默认DEFAULT_TOWER），
+    返回各派生列组成的字典。
+    """
+    base = _kxa_base_columns(L_v, V_g, T, C1, C2, tower)
+    return {**base, **_kxa_height_columns(base, h, tower)}
+
+def _kxa_base_columns(L_v, V_g, T, C1, C2, tower=None):
+    """与填料层高度h无关的派生列：L、x1、x2、x_star、ln_term、U_L、u"""
+    tower = DEFAULT_TOWER if tower is None else tower
+    F = tower.F
+    L_v = np.asarray(L_v, dtype=float)
+    V_g = np.asarray(V_g, dtype=float)
+    T = np.asarray(T, dtype=float)
+    C1 = np.asarray(C1, dtype=float)
+    C2 = np.asarray(C2, dtype=float)
+
+    L = (L_v * tower.rho_w) / (tower.M_w * 1000)
+    x1 = concentration_to_mole_fraction(C1, tower)
+    x2 = concentration_to_mole_fraction(C2, tower)
+    x_star = get_x_star(T)
+
+    # 确保推动力为正
+    x_star = np.where(x2 <= x_star, x2 * 0.9, x_star)
+
+    # 主分支：对数平均推动力；否则退回浓度比（下限1.1）
+    d1 = x1 - x_star
+    d2 = x2 - x_star
+    ok = (d1 > 0) & (d2 > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ln_main = np.log(d1 / d2)
+    ratio = np.maximum(x1 / np.maximum(x2, 1e-10), 1.1)
+    ln_term = np.where(ok, ln_main, np.log(ratio))
+
+    U_L = L_v / (F * 1000)
+    u = (V_g / 3600) / F
+
+    return {'L': L, 'x1': x1, 'x2': x2, 'x_star': x_star, 'ln_term': ln_term, 'U_L': U_L, 'u': u}
+
+def _kxa_height_columns(base, h, tower=None):
+    """由_kxa_base_columns的结果计算随h变化的Kxa、H_OL"""
+    tower = DEFAULT_TOWER if tower is None else tower
+    h = np.asarray(h, dtype=float)
+    ln_term = base['ln_term']
+    Kxa = (base['L'] / (tower.F * h)) * ln_term
+    with np.errstate(divide='ignore', invalid='ignore'):
+        H_OL = np.where(ln_term > 0, h / ln_term, h)
+    return {'Kxa': Kxa, 'H_OL': H_OL}
+
+def _detail_frame(labels, arr, h, tower=None):
+    """由输入数组（每行L_v, V_g, T, C1, C2）整列计算并组装明细表"""
+    return _assemble_detail(labels, arr, calculate_kxa_h_batch(*arr.T, h, tower))
+
+def _assemble_detail(labels, arr, res):
+    """由输入数组和calculate_kxa_h_batch的结果组装明细表"""
+    L_v, V_g, T, C1, C2 = arr.T
+    return pd.DataFrame({
+        '组号': labels,
+        '液体流量_L_v_L_h': L_v,
+        '气体流量_V_g_m3_h': V_g,
+        '水温_T_C': T,
+        '入口浓度_C1_mg_L': C1,
+        '出口浓度_C2_mg_L': C2,
+        '喷淋密度_U_L_m3_m2_h': res['U_L'],
+        '空塔气速_u_m_s': res['u'],
+        '液体摩尔流量_L_kmol_h': res['L'],
+        '入口摩尔分数_x1': res['x1'],
+        '出口摩尔分数_x2': res['x2'],
+        '平衡摩尔分数_x_star': res['x_star'],
+        '对数项_ln': res['ln_term'],
+        '体积传质系数_Kxa_kmol_m3_h': res['Kxa'],
+        '传质单元高度_H_OL_m': res['H_OL'],
+    })
+
+def process_series_data(series_name, data, h, tower=None):
+    """处理一个系列的数据（整列向量化计算）"""
+    arr = np.asarray(data, dtype=float).reshape(-1, 5)
+    return _detail_frame([f'{series_name}-{i}' for i in range(1, len(arr) + 1)], arr, h, tower)
+
+# ========== 新增：多系列长表处理 ==========
+
+# 系列改变的是哪一股流量，决定作图横轴、幂律关系和汇总表的列
+SERIES_AXES = {
+    'liquid': {'x_col': '喷淋密度_U_L_m3_m2_h', 'var': 'U_L', 'flow_col': '液体流量_L_v_L_h'},
+    'gas': {'x_col': '空塔气速_u_m_s', 'var': 'u', 'flow_col': '气体流量_V_g_m3_h'},
+}
+DEFAULT_SERIES_AXES = {'I': 'liquid', 'II': 'gas'}   # 标准实验：系列I改液体流量，系列II改气体流量
+
+def series_axis(name, df):
+    """判断系列改变的流量('liquid'/'gas')：标准系列名直接查表，其余取相对离散度较大的一方"""
+    if name in DEFAULT_SERIES_AXES:
+        return DEFAULT_SERIES_AXES[name]
+
+    def spread(col):
+        values = df[col].to_numpy(dtype=float)
+        mean = abs(values.mean()) if len(values) else 0.0
+        return values.std() / mean if mean > 0 else 0.0
+    return 'gas' if spread('气体流量_V_g_m3_h') > spread('液体流量_L_v_L_h') else 'liquid'
+
+def process_long_table(table, h, series_col='series', tower=None):
+    """处理含任意多个系列的长表（列：series、L_v、V_g、T、C1、C2）
+
+    全部行一次向量化计算，再按系列分组编号（组号为"系列-序号"）；
+    返回{系列名: 明细DataFrame}，系列按首次出现的顺序排列
+    """
+    names = table[series_col].astype(str).to_numpy()
+    numbers = pd.Series(names).groupby(names, sort=False).cumcount().to_numpy() + 1
+    labels = [f'{name}-{i}' for name, i in zip(names, numbers)]
+    detail = _detail_frame(labels, table[INPUT_VALUE_COLUMNS].to_numpy(dtype=float), h, tower)
+    return {name: part.reset_index(drop=True) for name, part in detail.groupby(names, sort=False)}
+
+# ========== 新增：批量幂律拟合引擎 ==========
+
+def _regression_from_sums(n, sx, sy, sxx, syy, sxy):
+    """由累加和求 y = c + b·x 的最小二乘解、相关系数和标准误差（参数可为数组，点数<2时为NaN）"""
+    n = np.asarray(n, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Sxx = sxx - sx * sx / n
+        Syy = syy - sy * sy / n
+        Sxy = sxy - sx * sy / n
+        b = Sxy / Sxx
+        c = (sy - b * sx) / n
+        r = Sxy / np.sqrt(Sxx * Syy)
+        s2 = np.maximum(Syy - b * Sxy, 0) / (n - 2)   # 残差方差，自由度n-2
+        se_b = np.sqrt(s2 / Sxx)
+        se_c = np.sqrt(s2 * (1 / n + (sx / n)**2 / Sxx))
+    enough = n >= 2
+    return {key: np.where(enough, value, np.nan)
+            for key, value in {'b': b, 'c': c, 'r': r, 'se_b': se_b, 'se_c': se_c}.items()}
+
+def _power_law_terms(x, y):
+    """各数据点对回归累加和的贡献，形状(11, 点数)：点数、对数坐标的5个和、原始值的5个和
+
+    只保留x、y均为正的有限值
+    """
+    x = np.atleast_1d(np.asarray(x, dtype=float))
+    y = np.atleast_1d(np.asarray(y, dtype=float))
+    valid = (x > 0) & (y > 0) & np.isfinite(x) & np.isfinite(y)
+    x, y = x[valid], y[valid]
+    lx, ly = np.log10(x), np.log10(y)
+    return np.stack([np.ones_like(x), lx, ly, lx * lx, ly * ly, lx * ly, x, y, x * x, y * y, x * y]), valid
+
+def _power_law_from_sums(sums):
+    """由累加和（最后一维为_power_law_terms的11项）求幂律拟合结果"""
+    sums = np.asarray(sums, dtype=float)
+    n = sums[..., 0]
+    log_fit = _regression_from_sums(n, *(sums[..., i] for i in range(1, 6)))
+    raw_fit = _regression_from_sums(n, *(sums[..., i] for i in range(6, 11)))
+    return {
+        'n': np.rint(n).astype(int),
+        'a': 10**log_fit['c'],
+        'b': log_fit['b'],
+        'se_b': log_fit['se_b'],
+        'se_lg_a': log_fit['se_c'],
+        'r2': log_fit['r']**2,
+        'r': raw_fit['r'],
+    }
+
+def fit_power_laws_grouped(groups, x, y, n_groups=None):
+    """按组批量拟合 y = a·x^b（对数坐标线性回归），所有组一次闭式求解
 
-def save_to_excel(df1, df2, filename, h):
-    """保存数据到Excel文件"""
+    groups为非负整数组号；只使用x、y均为正的有限值。返回每组的
+    n、a、b、se_b、se_lg_a（lg a的标准误差）、r2（对数拟合R²）和r（原始值的相关系数）
+    """
+    groups = np.asarray(groups, dtype=np.intp)
+    if n_groups is None:
+        n_groups = int(groups.max()) + 1 if len(groups) else 0
+    terms, valid = _power_law_terms(x, y)
+    g = groups[valid]
+    sums = np.stack([np.bincount(g, weights=t, minlength=n_groups) for t in terms], axis=-1)
+    return _power_law_from_sums(sums)
+
+# 自助法(bootstrap)置信区间：重采样次数为0时不计算
+BOOTSTRAP_RESAMPLES = 0
+BOOTSTRAP_CONFIDENCE = 0.95
+BOOTSTRAP_SEED = 12345                 # 固定种子，保证图表与工作簿的区间一致、可复现
+BOOTSTRAP_CHUNK_ELEMENTS = 4_000_000   # 每块重采样矩阵的元素上限，控制内存
+
+def bootstrap_power_laws_grouped(groups, x, y, n_groups, n_boot, confidence=None, seed=None, streams=None):
+    """按组做配对bootstrap，求幂律 y = a·x^b 中a、b的百分位置信区间
+
+    每块把全部重采样、全部组排成一个矩阵，用reduceat一次求出各重采样的回归，不逐次循环。
+    streams为每组的随机数流标识（如"系列/关系"）：给出时每组由(seed, 标识)派生独立的随机数流，
+    区间与组的编号及同时计算的其他组无关；否则全部组共用一个随机数流。
+    返回每组的a_lo、a_hi、b_lo、b_hi；点数少于3的组为NaN
+    """
+    confidence = BOOTSTRAP_CONFIDENCE if confidence is None else confidence
+    seed = BOOTSTRAP_SEED if seed is None else seed
+    groups = np.asarray(groups, dtype=np.intp)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = (x > 0) & (y > 0) & np.isfinite(x) & np.isfinite(y)
+    order = np.argsort(groups[valid], kind='stable')
+    g = groups[valid][order]
+    lx = np.log10(x[valid][order])
+    ly = np.log10(y[valid][order])
+    result = {key: np.full(n_groups, np.nan) for key in ('a_lo', 'a_hi', 'b_lo', 'b_hi')}
+
+    counts = np.bincount(g, minlength=n_groups)
+    use = counts[g] >= 3
+    g, lx, ly = g[use], lx[use], ly[use]
+    if n_boot <= 0 or len(g) == 0:
+        return result
+
+    # 按组中心化，减小累加和公式的舍入误差
+    with np.errstate(invalid='ignore'):
+        mean_x = np.bincount(g, weights=lx, minlength=n_groups) / counts
+        mean_y = np.bincount(g, weights=ly, minlength=n_groups) / counts
+    lx = lx - mean_x[g]
+    ly = ly - mean_y[g]
+    group_ids, group_starts = np.unique(g, return_index=True)
+    point_start = group_starts[np.searchsorted(group_ids, g)]
+    point_count = counts[g]
+    n = counts[group_ids].astype(float)
+
+    if streams is None:
+        rng = np.random.default_rng(seed)
+    else:
+        rngs = [np.random.default_rng([seed, int.from_bytes(str(streams[k]).encode('utf-8'), 'little')])
+                for k in group_ids]
+    chunk = max(1, BOOTSTRAP_CHUNK_ELEMENTS // len(g))
+    b_parts, c_parts = [], []
+    for start in range(0, n_boot, chunk):
+        rows = min(chunk, n_boot - start)
+        if streams is None:
+            u = rng.random((rows, len(g)))
+        else:
+            # 各组的列按组号排列，逐组从自己的随机数流取数（分块不改变每个流的序列）
+            u = np.concatenate([r.random((rows, int(c))) for r, c in zip(rngs, counts[group_ids])], axis=1)
+        # 每个位置在所属组内有放回抽样
+        idx = point_start + (u * point_count).astype(np.intp)
+        bx, by = lx[idx], ly[idx]
+
+        def total(v):
+            return np.add.reduceat(v, group_starts, axis=1)
+
+        fit = _regression_from_sums(n, total(bx), total(by), total(bx * bx), total(by * by), total(bx * by))
+        # 抽到的x全部相同时回归无定义
+        flat = np.maximum.reduceat(bx, group_starts, axis=1) == np.minimum.reduceat(bx, group_starts, axis=1)
+        b_parts.append(np.where(flat, np.nan, fit['b']))
+        c_parts.append(np.where(flat, np.nan, fit['c']))
+
+    b = np.concatenate(b_parts)
+    # 中心化后的截距还原为lg a
+    lg_a = np.concatenate(c_parts) + mean_y[group_ids] - b * mean_x[group_ids]
+    tail = (1 - confidence) / 2 * 100
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)   # 全部退化的组得到NaN
+        result['b_lo'][group_ids], result['b_hi'][group_ids] = np.nanpercentile(b, [tail, 100 - tail], axis=0)
+        lg_lo, lg_hi = np.nanpercentile(lg_a, [tail, 100 - tail], axis=0)
+    result['a_lo'][group_ids], result['a_hi'][group_ids] = 10**lg_lo, 10**lg_hi
+    return result
+
+def _fit_table_columns(fit):
+    """拟合结果字典 -> 拟合表的各列"""
+    return {
+        '点数_n': fit['n'],
+        '系数_a': fit['a'],
+        '指数_b': fit['b'],
+        '指数标准误差_se_b': fit['se_b'],
+        'lg系数标准误差_se_lg_a': fit['se_lg_a'],
+        '对数拟合决定系数_R2': fit['r2'],
+        '相关系数_r': fit['r'],
+    }
+
+def _add_bootstrap_columns(table, ci):
+    """为拟合表附加a、b的bootstrap置信区间列"""
+    table['置信水平'] = BOOTSTRAP_CONFIDENCE
+    table['系数_a_下限'] = ci['a_lo']
+    table['系数_a_上限'] = ci['a_hi']
+    table['指数_b_下限'] = ci['b_lo']
+    table['指数_b_上限'] = ci['b_hi']
+
+def fit_series_table(series_dfs, n_boot=None):
+    """拟合任意多个系列：每个系列按其横轴（见series_axis）拟合Kxa和H_OL两个幂律关系
+
+    series_dfs为{系列名: 明细DataFrame}；返回每个(系列, 关系)一行的拟合表。
+    与绘图一致，只使用Kxa>0且H_OL>0的数据点。n_boot>0时（默认取BOOTSTRAP_RESAMPLES）
+    附加a、b的bootstrap置信区间：全部关系一次重采样，每个(系列, 关系)用独立的随机数流，
+    区间与其他系列及其顺序无关
+    """
+    n_boot = BOOTSTRAP_RESAMPLES if n_boot is None else n_boot
+    names, series_names, groups, xs, ys = [], [], [], [], []
+    for series_name, df in series_dfs.items():
+        axis = SERIES_AXES[series_axis(series_name, df)]
+        positive = ((df['体积传质系数_Kxa_kmol_m3_h'] > 0) & (df['传质单元高度_H_OL_m'] > 0)).to_numpy()
+        x = df[axis['x_col']].to_numpy(dtype=float)[positive]
+        for label, y_col in (('Kxa', '体积传质系数_Kxa_kmol_m3_h'), ('H_OL', '传质单元高度_H_OL_m')):
+            groups.append(np.full(len(x), len(names), dtype=np.intp))
+            xs.append(x)
+            ys.append(df[y_col].to_numpy(dtype=float)[positive])
+            names.append(f"{label}_{axis['var']}")
+            series_names.append(series_name)
+    all_groups = np.concatenate(groups) if groups else np.zeros(0, dtype=np.intp)
+    all_xs = np.concatenate(xs) if xs else np.zeros(0)
+    all_ys = np.concatenate(ys) if ys else np.zeros(0)
+    fit = fit_power_laws_grouped(all_groups, all_xs, all_ys, n_groups=len(names))
+
+    table = pd.DataFrame({'关系': names, '系列': series_names, **_fit_table_columns(fit)})
+    if n_boot > 0 and len(names):
+        streams = [f'{series_name}/{name}' for series_name, name in zip(series_names, names)]
+        _add_bootstrap_columns(table, bootstrap_power_laws_grouped(all_groups, all_xs, all_ys, len(names), n_boot,
+                                                                   streams=streams))
+    return table
+
+def fit_series_relationships(series1_df, series2_df, n_boot=None):
+    """拟合一次标准分析（系列I、II）的四个幂律关系，返回以'关系'为索引的拟合表（图表用）
+
+    即fit_series_table的两系列形式，图表与导出的幂律拟合表结果一致
+    """
+    return fit_series_table({'I': series1_df, 'II': series2_df}, n_boot=n_boot).set_index('关系')
+
+def format_fit_interval(fit, a_digits):
+    """拟合表中一行的置信区间说明（图表文字用）；未计算bootstrap时为空字符串"""
+    if '系数_a_下限' not in fit.index or not np.isfinite(fit['指数_b_下限']):
+        return ''
+    return (f"\n{fit['置信水平']:.0%}CI: a∈[{fit['系数_a_下限']:.{a_digits}f}, {fit['系数_a_上限']:.{a_digits}f}]"
+            f", b∈[{fit['指数_b_下限']:.2f}, {fit['指数_b_上限']:.2f}]")
+
+# ========== 新增：测量不确定度的蒙特卡洛传播 ==========
+
+# 各输入量的标准不确定度(1σ)：('rel', 相对值) 或 ('abs', 绝对值)
+MEASUREMENT_UNCERTAINTY = {
+    'L_v': ('rel', 0.02),    # 液体转子流量计 ±2%
+    'V_g': ('rel', 0.025),   # 气体转子流量计 ±2.5%
+    'T': ('abs', 0.2),       # 水温 ±0.2°C
+    'C1': ('abs', 0.2),      # 溶氧仪 ±0.2 mg/L
+    'C2': ('abs', 0.2),
+}
+UNCERTAINTY_SAMPLES = 0              # 每行的抽样次数，0表示不计算
+UNCERTAINTY_PERCENTILES = (2.5, 50, 97.5)
+UNCERTAINTY_SEED = 12345
+UNCERTAINTY_CHUNK_ELEMENTS = 1_000_000   # 每块 行数×抽样数 的上限，控制内存
+
+# 参与统计的输出：calculate_kxa_h_batch结果键 -> 详细数据中的列名
+UNCERTAINTY_OUTPUTS = {
+    'U_L': '喷淋密度_U_L_m3_m2_h',
+    'u': '空塔气速_u_m_s',
+    'x1': '入口摩尔分数_x1',
+    'x2': '出口摩尔分数_x2',
+    'x_star': '平衡摩尔分数_x_star',
+    'ln_term': '对数项_ln',
+    'Kxa': '体积传质系数_Kxa_kmol_m3_h',
+    'H_OL': '传质单元高度_H_OL_m',
+}
+
+def propagate_uncertainty(series_df, h, n_samples=None, uncertainty=None, percentiles=None, seed=None,
+                          tower=None):
+    """蒙特卡洛传播测量不确定度
+
+    每行抽n_samples组正态扰动的L_v、V_g、T、C1、C2，按(行×抽样)矩阵整块送入
+    calculate_kxa_h_batch；按行分块，内存只与UNCERTAINTY_CHUNK_ELEMENTS有关。
+    返回每行各输出列的均值、标准差和百分位数；n_samples至少为2（样本标准差需要两次以上抽样）
+    """
+    n_samples = UNCERTAINTY_SAMPLES if n_samples is None else n_samples
+    if n_samples < 2:
+        raise ValueError(f"不确定度抽样次数至少为2，当前为{n_samples}")
+    uncertainty = MEASUREMENT_UNCERTAINTY if uncertainty is None else uncertainty
+    percentiles = UNCERTAINTY_PERCENTILES if percentiles is None else percentiles
+    rng = np.random.default_rng(UNCERTAINTY_SEED if seed is None else seed)
+    inputs = {
+        'L_v': series_df['液体流量_L_v_L_h'].to_numpy(dtype=float),
+        'V_g': series_df['气体流量_V_g_m3_h'].to_numpy(dtype=float),
+        'T': series_df['水温_T_C'].to_numpy(dtype=float),
+        'C1': series_df['入口浓度_C1_mg_L'].to_numpy(dtype=float),
+        'C2': series_df['出口浓度_C2_mg_L'].to_numpy(dtype=float),
+    }
+    rows = len(series_df)
+    columns = {}
+    for col in UNCERTAINTY_OUTPUTS.values():
+        columns[f'{col}_均值'] = np.full(rows, np.nan)
+        columns[f'{col}_标准差'] = np.full(rows, np.nan)
+        for q in percentiles:
+            columns[f'{col}_P{q:g}'] = np.full(rows, np.nan)
+
+    block = max(1, UNCERTAINTY_CHUNK_ELEMENTS // max(n_samples, 1))
+    for start in range(0, rows if n_samples > 0 else 0, block):
+        rows_slice = slice(start, min(start + block, rows))
+        draws = {}
+        for name, values in inputs.items():
+            kind, sigma = uncertainty[name]
+            base = values[rows_slice, None]
+            scale = base * sigma if kind == 'rel' else sigma
+            draws[name] = base + rng.standard_normal((len(base), n_samples)) * scale
+        res = calculate_kxa_h_batch(draws['L_v'], draws['V_g'], draws['T'], draws['C1'], draws['C2'], h, tower)
+
+        for key, col in UNCERTAINTY_OUTPUTS.items():
+            values = res[key]
+            columns[f'{col}_均值'][rows_slice] = values.mean(axis=1)
+            columns[f'{col}_标准差'][rows_slice] = values.std(axis=1, ddof=1)
+            for q, row_values in zip(percentiles, np.percentile(values, percentiles, axis=1)):
+                columns[f'{col}_P{q:g}'][rows_slice] = row_values
+
+    return pd.DataFrame({'组号': series_df['组号'].to_numpy(), **columns})
+
+# ========== 新增：导出格式设置 ==========
+# xlsx为工作簿；parquet/feather/csv为每个表单独一个文件，可与xlsx同时输出
+EXPORT_FORMATS = ('xlsx',)
+SUPPORTED_EXPORT_FORMATS = ('xlsx', 'parquet', 'feather', 'csv')
+EXCEL_STREAMING_ROWS = 10_000  # 明细行数超过该值时改用只写模式流式导出
+EXCEL_CHUNK_ROWS = 5_000       # 流式导出时每次转换的行数
+
+def _sheet_name(name):
+    """Excel表名：去掉不允许的字符，最长31个字符"""
+    for ch in '[]:*?/\\':
+        name = name.replace(ch, '_')
+    return name[:31]
+
+def build_series_sheets(series_dfs, h, tower=None, extra_sheets=None, n_boot=None, n_samples=None):
+    """组装任意多个系列的导出表，返回{表名: DataFrame}（保持工作簿中的顺序）
+
+    每个系列一张明细表和一张汇总表，汇总表列取该系列改变的流量及其对应的横轴；
+    extra_sheets（如设计反算结果）放在实验条件之前；n_boot为拟合的bootstrap重采样次数，
+    n_samples>0时每个系列另加一张蒙特卡洛不确定度表
+    """
+    sheets = {_sheet_name(f'系列{name}_详细数据'): df for name, df in series_dfs.items()}
+    for name, df in series_dfs.items():
+        sheets[_sheet_name(f'系列{name}_汇总')] = _summary_sheet(name, df)
+    sheets['幂律拟合'] = fit_series_table(series_dfs, n_boot)
+    n_samples = UNCERTAINTY_SAMPLES if n_samples is None else n_samples
+    if n_samples > 0:
+        for name, df in series_dfs.items():
+            sheets[_sheet_name(f'系列{name}_不确定度')] = propagate_uncertainty(df, h, n_samples, tower=tower)
+    sheets.update(extra_sheets or {})
+
+    # 添加实验条件说明
+    sheets['实验条件'] = _conditions_sheet(h, tower)
+    return sheets
+
+def _summary_sheet(name, df):
+    """一个系列的汇总表"""
+    axis = SERIES_AXES[series_axis(name, df)]
+    return df[['组号', axis['flow_col'], axis['x_col'], '体积传质系数_Kxa_kmol_m3_h', '传质单元高度_H_OL_m']]
+
+def _conditions_sheet(h, tower=None):
+    """实验条件说明表"""
+    tower = DEFAULT_TOWER if tower is None else tower
+    return pd.DataFrame({
+        '参数': ['塔内径_D_m', '塔截面积_F_m2', '填料层高度_h_m', 
+                '水的密度_rho_w_g_L', '水的摩尔质量_M_w_g_mol', '氧的摩尔质量_M_O2_g_mol'],
+        '数值': [tower.D, tower.F, h, tower.rho_w, tower.M_w, tower.M_O2],
+        '单位': ['m', 'm2', 'm', 'g/L', 'g/mol', 'g/mol']
+    })
+
+def _write_excel(sheets, filename, streaming=False):
+    """把各表写入一个xlsx工作簿"""
+    if streaming:
+        _write_excel_streaming(sheets, filename)
+        return
+    with pd.ExcelWriter(filename, engine='openpyxl') as writer:
+        for sheet_name, df in sheets.items():
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
+
+def _write_excel_streaming(sheets, filename, chunk_rows=EXCEL_CHUNK_ROWS):
+    """openpyxl只写模式逐行写出，工作簿不在内存中累积"""
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    for sheet_name, df in sheets.items():
+        ws = wb.create_sheet(title=sheet_name)
+        ws.append([str(c) for c in df.columns])
+        for start in range(0, len(df), chunk_rows):
+            block = df.iloc[start:start + chunk_rows].astype(object)
+            for row in block.where(block.notna(), None).itertuples(index=False, name=None):
+                ws.append(row)
+    wb.save(filename)
+
+def _write_sheet_files(sheets, filename, fmt):
+    """每个表另存为一个parquet/feather/csv文件，返回写出的路径列表"""
+    stem = os.path.splitext(filename)[0]
+    paths = []
+    for sheet_name, df in sheets.items():
+        path = f'{stem}_{sheet_name}.{fmt}'
+        if fmt == 'parquet':
+            df.to_parquet(path, index=False)  # 需要pyarrow
+        elif fmt == 'feather':
+            df.reset_index(drop=True).to_feather(path)  # 需要pyarrow
+        elif fmt == 'csv':
+            df.to_csv(path, index=False, encoding='utf-8-sig')  # 带BOM，Excel打开中文不乱码
+        else:
+            raise ValueError(f"不支持的导出格式: {fmt}")
+        paths.append(path)
+    return paths
+
+def save_series_to_excel(series_dfs, filename, h, formats=None, streaming=None, tower=None, extra_sheets=None,
+                         n_boot=None, n_samples=None):
+    """保存任意多个系列的结果到Excel文件
+
+    formats为导出格式列表（默认EXPORT_FORMATS），可选xlsx/parquet/feather/csv；
+    streaming为None时按数据行数自动选择openpyxl只写流式导出
+    """
+    formats = EXPORT_FORMATS if formats is None else formats
     try:
-        print(f"\n正在保存数据到: {filename}")
+        sheets = build_series_sheets(series_dfs, h, tower, extra_sheets, n_boot, n_samples)
         
-        with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-            # 保存详细数据
-            df1.to_excel(writer, sheet_name='系列I_详细数据', index=False)
-            df2.to_excel(writer, sheet_name='系列II_详细数据', index=False)
-            
-            # 创建汇总表
-            summary_df1 = pd.DataFrame({
-                '组号': df1['组号'],
-                '液体流量_L_v_L_h': df1['液体流量_L_v_L_h'],
-                '喷淋密度_U_L_m3_m2_h': df1['喷淋密度_U_L_m3_m2_h'],
-                '体积传质系数_Kxa_kmol_m3_h': df1['体积传质系数_Kxa_kmol_m3_h'],
-                '传质单元高度_H_OL_m': df1['传质单元高度_H_OL_m']
-            })
-            
-            summary_df2 = pd.DataFrame({
-                '组号': df2['组号'],
-                '气体流量_V_g_m3_h': df2['气体流量_V_g_m3_h'],
-                '空塔气速_u_m_s': df2['空塔气速_u_m_s'],
-                '体积传质系数_Kxa_kmol_m3_h': df2['体积传质系数_Kxa_kmol_m3_h'],
-                '传质单元高度_H_OL_m': df2['传质单元高度_H_OL_m']
-            })
-            
-            summary_df1.to_excel(writer, sheet_name='系列I_汇总', index=False)
-            summary_df2.to_excel(writer, sheet_name='系列II_汇总', index=False)
-            
-            # 添加实验条件说明
-            conditions_df = pd.DataFrame({
-                '参数': ['塔内径_D_m', '塔截面积_F_m2', '填料层高度_h_m', 
-                        '水的密度_rho_w_g_L', '水的摩尔质量_M_w_g_mol', '氧的摩尔质量_M_O2_g_mol'],
-                '数值': [D, F, h, rho_w, M_w, M_O2],
-                '单位': ['m', 'm2', 'm', 'g/L', 'g/mol', 'g/mol']
-            })
-            conditions_df.to_excel(writer, sheet_name='实验条件', index=False)
+        if 'xlsx' in formats:
+            print(f"\n正在保存数据到: {filename}")
+            if streaming is None:
+                streaming = max((len(df) for df in series_dfs.values()), default=0) > EXCEL_STREAMING_ROWS
+            _write_excel(sheets, filename, streaming)
+            print(f"✓ Excel文件已成功保存: {filename}")
         
-        print(f"✓ Excel文件已成功保存: {filename}")
+        for fmt in formats:
+            if fmt != 'xlsx':
+                paths = _write_sheet_files(sheets, filename, fmt)
+                print(f"✓ 已导出{len(paths)}个{fmt}文件: {os.path.splitext(filename)[0]}_*.{fmt}")
         return True
             
     except Exception as e:
         print(f"✗ 保存Excel文件时出错: {e}")
         return False
 
-def plot_figures(series1_df, series2_df, h):
-    """绘制所有图表 - 修复中文显示、负号和标签重叠问题"""
-    # ========== 第一步：优先配置全局字体（必须在创建figure之前） ==========
-    # 1. 验证系统可用字体（排查字体是否存在）
-    def check_font_available(font_name):
-        """检查指定字体是否存在于系统中"""
-        font_list = [f.name for f in fm.fontManager.ttflist]
-        return font_name in font_list
-
-    # 2. 定义优先级字体列表（优先中文字体，最后兜底西文字体）
-    font_candidates = [
-        'Microsoft YaHei',    # 微软雅黑（Windows）
-        'SimHei',             # 黑体（Windows）
-        'PingFang SC',        # 苹方（macOS）
-        'Noto Sans SC',       # 思源黑体（Linux/macOS/Windows）
-        'DejaVu Sans'         # 兜底西文字体（无中文）
-    ]
+def save_to_excel(df1, df2, filename, h, formats=None, streaming=None, n_boot=None, n_samples=None):
+    """保存标准两系列（I、II）的数据到Excel文件"""
+    return save_series_to_excel({'I': df1, 'II': df2}, filename, h, formats, streaming,
+                                n_boot=n_boot, n_samples=n_samples)
+
+# ========== 新增：字体解析缓存 ==========
+
+# 优先级字体列表（优先中文字体，最后兜底西文字体）
+FONT_CANDIDATES = [
+    'Microsoft YaHei',    # 微软雅黑（Windows）
+    'SimHei',             # 黑体（Windows）
+    'PingFang SC',        # 苹方（macOS）
+    'Noto Sans SC',       # 思源黑体（Linux/macOS/Windows）
+    'DejaVu Sans'         # 兜底西文字体（无中文）
+]
+# 本程序的磁盘缓存目录（字体解析结果、图表渲染缓存等）
+APP_CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+                             'oxygen_desorption')
+FONT_CACHE_FILE = os.path.join(APP_CACHE_DIR, 'font.json')
+
+_plot_font = None  # 本进程已解析并应用的字体
+
+def _font_manager_key():
+    """字体管理器状态标识：matplotlib版本 + 其字体列表缓存文件(fontlist-v*.json)的mtime/大小
+
+    只查看文件状态，不导入font_manager（导入时加载字体列表，正是要省去的耗时）；
+    找不到该文件时返回None，此时不使用缓存
+    """
+    import glob
+    import matplotlib
+    key = [matplotlib.__version__]
+    for fontlist_json in sorted(glob.glob(os.path.join(matplotlib.get_cachedir(), 'fontlist-v*.json'))):
+        try:
+            st = os.stat(fontlist_json)
+        except OSError:
+            continue
+        key += [os.path.basename(fontlist_json), st.st_mtime_ns, st.st_size]
+    return '|'.join(str(k) for k in key) if len(key) > 1 else None
+
+def resolve_plot_font():
+    """返回系统中可用的第一个候选字体；结果写入缓存文件，字体未变化时直接读取"""
+    import json
+    key = _font_manager_key()
+    try:
+        with open(FONT_CACHE_FILE, encoding='utf-8') as f:
+            cached = json.load(f)
+        if key is not None and cached.get('key') == key and cached.get('candidates') == FONT_CANDIDATES:
+            return cached['font']
+    except (OSError, ValueError, KeyError):
+        pass
+
+    # 缓存失效：只扫描一遍字体列表
+    installed = {f.name for f in fm.fontManager.ttflist}
+    font = next((name for name in FONT_CANDIDATES if name in installed), 'DejaVu Sans')
+    key = key or _font_manager_key()   # 首次加载字体管理器后才生成字体列表缓存文件
+    try:
+        os.makedirs(APP_CACHE_DIR, exist_ok=True)
+        with open(FONT_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'candidates': FONT_CANDIDATES, 'font': font}, f, ensure_ascii=False)
+    except OSError:
+        pass
+    return font
+
+def configure_plot_font():
+    """解析字体并配置全局rcParams，每个进程只执行一次"""
+    global _plot_font
+    if _plot_font is not None:
+        return _plot_font
+    _plot_font = resolve_plot_font()
+    print(f"✓ 使用字体: {_plot_font}")
     
-    # 筛选系统实际存在的第一个字体
-    available_font = 'DejaVu Sans'  # 默认
-    for font in font_candidates:
-        if check_font_available(font):
-            available_font = font
-            print(f"✓ 使用字体: {font}")
-            break
+    # 核心配置（修复负号+指定可用中文字体）；直接改matplotlib.rcParams，无需导入pyplot
+    import matplotlib
+    matplotlib.rcParams['font.sans-serif'] = [_plot_font]  # 仅保留可用的中文字体
+    matplotlib.rcParams['axes.unicode_minus'] = False      # 关键：关闭unicode减号，正确显示负号
+    matplotlib.rcParams['font.family'] = 'sans-serif'      # 明确字体族
+    return _plot_font
+
+# ========== 新增：智能文本位置管理器 ==========
+class TextPositionManager:
+    """智能管理文本位置，防止重叠
+
+    已放置的文本按均匀网格（格宽=最小距离）建立空间索引，查重只看邻近网格；
+    备选位置一次性向量化检查。先尝试原来的6个方向，再逐圈扩大搜索范围。
+    """
+    def __init__(self, ax, min_distance=0.15, search_rings=3, step=0.1):
+        self.ax = ax
+        self.positions = []
+        self.min_distance = min_distance  # 最小距离阈值
+        self._grid = {}                   # (列, 行) -> 该网格内已放置的位置列表
+        self._offsets = self._candidate_offsets(search_rings, step)
+
+    @staticmethod
+    def _candidate_offsets(rings, step):
+        """备选偏移量数组：原有的6个方向在前，其余按圈由近到远"""
+        base = [(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (-1, -1)]
+        offsets = list(base)
+        for r in range(1, rings + 1):
+            ring = [(dx, dy) for dx in range(-r, r + 1) for dy in range(-r, r + 1)
+                    if max(abs(dx), abs(dy)) == r and (dx, dy) not in base]
+            offsets += sorted(ring, key=lambda d: d[0]**2 + d[1]**2)
+        return np.array(offsets, dtype=float) * step
+
+    def _cell(self, x, y):
+        return int(np.floor(x / self.min_distance)), int(np.floor(y / self.min_distance))
+
+    def _neighbors(self, x_min, y_min, x_max, y_max):
+        """取出覆盖给定范围（外扩一个最小距离）的网格内所有已放置位置，返回(k, 2)数组"""
+        d = self.min_distance
+        i0, j0 = self._cell(x_min - d, y_min - d)
+        i1, j1 = self._cell(x_max + d, y_max + d)
+        points = [p for i in range(i0, i1 + 1) for j in range(j0, j1 + 1) for p in self._grid.get((i, j), ())]
+        return np.array(points, dtype=float).reshape(-1, 2)
+
+    def _is_clear(self, xs, ys):
+        """向量化判断各候选位置是否与已有文本保持最小距离"""
+        xs = np.atleast_1d(xs)
+        ys = np.atleast_1d(ys)
+        near = self._neighbors(xs.min(), ys.min(), xs.max(), ys.max())
+        if len(near) == 0:
+            return np.ones(len(xs), dtype=bool)
+        dist2 = (xs[:, None] - near[:, 0])**2 + (ys[:, None] - near[:, 1])**2
+        return (dist2 >= self.min_distance**2).all(axis=1)
+
+    def add_text(self, text, x, y, transform='axes', **kwargs):
+        """添加文本，自动调整位置避免重叠"""
+        # 转换坐标为相对坐标
+        if transform == 'axes':
+            rel_x, rel_y = x, y
+        else:
+            # 如果是数据坐标，转换为相对坐标
+            rel_x, rel_y = self.ax.transData.transform((x, y))
+            rel_x = rel_x / self.ax.figure.bbox.width
+            rel_y = rel_y / self.ax.figure.bbox.height
+
+        # 与已有文本太近时，取第一个不重叠且在坐标轴内的备选位置
+        if not self._is_clear(rel_x, rel_y)[0]:
+            cand_x = rel_x + self._offsets[:, 0]
+            cand_y = rel_y + self._offsets[:, 1]
+            ok = self._is_clear(cand_x, cand_y) & (cand_x >= 0) & (cand_x <= 1) & (cand_y >= 0) & (cand_y <= 1)
+            if ok.any():
+                k = int(np.argmax(ok))
+                rel_x, rel_y = float(cand_x[k]), float(cand_y[k])
+
+        # 添加文本
+        text_obj = self.ax.text(rel_x, rel_y, text, transform=self.ax.transAxes,
+                                fontfamily='sans-serif', **kwargs)
+        self.positions.append((rel_x, rel_y))
+        self._grid.setdefault(self._cell(rel_x, rel_y), []).append((rel_x, rel_y))
+        return text_obj
+
+# ========== 新增：图表渲染缓存 ==========
+
+# 绘图设置（参与渲染缓存的键）
+PLOT_SETTINGS = {'figsize': (18, 8), 'dpi': 300}
+RENDER_CACHE_DIR = os.path.join(APP_CACHE_DIR, 'renders')
+RENDER_CACHE_MAX_BYTES = 200 * 1024 * 1024
+RENDER_CACHE_VERSION = 3  # 修改绘图代码后递增，使旧缓存失效
+
+def _last_resolved_font():
+    """读取上次解析出的字体名（不导入matplotlib），未解析过时返回空串"""
+    import json
+    if _plot_font is not None:
+        return _plot_font
+    try:
+        with open(FONT_CACHE_FILE, encoding='utf-8') as f:
+            return json.load(f).get('font', '')
+    except (OSError, ValueError):
+        return ''
+
+def render_cache_key(series1_df, series2_df, h, variant='', n_boot=None):
+    """由输入数据、h和绘图设置计算图表内容哈希；variant区分不同的渲染方式"""
+    import hashlib
+    n_boot = BOOTSTRAP_RESAMPLES if n_boot is None else n_boot
+    digest = hashlib.sha256()
+    digest.update(repr((RENDER_CACHE_VERSION, variant, float(h), sorted(PLOT_SETTINGS.items()),
+                        FONT_CANDIDATES, _last_resolved_font(),
+                        (n_boot, BOOTSTRAP_CONFIDENCE, BOOTSTRAP_SEED))).encode('utf-8'))
+    for df in (series1_df, series2_df):
+        digest.update('|'.join(map(str, df.columns)).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def render_cache_lookup(key):
+    """查找缓存的PNG，命中时刷新其mtime（按最近使用淘汰）并返回路径"""
+    path = os.path.join(RENDER_CACHE_DIR, f'{key}.png')
+    try:
+        os.utime(path)
+    except OSError:
+        return None
+    return path
+
+def copy_cached_render(key, png_filename):
+    """缓存命中时把PNG复制到目标路径并返回True"""
+    import shutil
+    cached_png = render_cache_lookup(key)
+    if not cached_png:
+        return False
+    try:
+        shutil.copyfile(cached_png, png_filename)
+    except OSError as e:
+        print(f"⚠ 复制缓存图表失败，重新绘制: {e}")
+        return False
+    print(f"✓ 数据未变化，已直接使用缓存图表: {png_filename}")
+    return True
+
+def render_cache_store(key, png_path, max_bytes=RENDER_CACHE_MAX_BYTES):
+    """把新渲染的PNG存入缓存，并按最近使用时间淘汰超出容量的旧文件"""
+    import shutil
+    try:
+        os.makedirs(RENDER_CACHE_DIR, exist_ok=True)
+        target = os.path.join(RENDER_CACHE_DIR, f'{key}.png')
+        tmp = f'{target}.{os.getpid()}.tmp'
+        shutil.copyfile(png_path, tmp)
+        os.replace(tmp, target)  # 原子替换，多进程同时写入也安全
+
+        entries = []
+        with os.scandir(RENDER_CACHE_DIR) as it:
+            for entry in it:
+                if entry.name.endswith('.png'):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            os.remove(path)
+            total -= size
+    except OSError as e:
+        print(f"⚠ 写入图表缓存失败: {e}")
+
+def plot_figures(series1_df, series2_df, h, png_filename='氧解吸实验分析图表.png', show=True,
+                 use_cache=True, headless=None, n_boot=None):
+    """绘制所有图表 - 修复中文显示、负号和标签重叠问题
+
+    png_filename为图表保存路径；show=False时不弹出窗口并在保存后关闭图形
+    use_cache=True且不弹窗时，相同数据和设置的图表直接复制缓存的PNG，不调用matplotlib
+    headless=True时改用复用模板的无界面渲染（见render_figures_headless），默认取全局HEADLESS
+    n_boot>0时拟合文字附带a、b的bootstrap置信区间。返回实际保存的PNG路径，失败返回None
+    """
+    if headless is None:
+        headless = HEADLESS
+    if headless:
+        return render_figures_headless(series1_df, series2_df, h, png_filename, use_cache, n_boot)
+    # 需要弹窗时必须实际绘制，缓存只用于不显示的情况
+    if use_cache and not show and copy_cached_render(render_cache_key(series1_df, series2_df, h, n_boot=n_boot),
+                                                     png_filename):
+        return png_filename
     
-    # 3. 核心配置（修复负号+指定可用中文字体）
-    plt.rcParams['font.sans-serif'] = [available_font]  # 仅保留可用的中文字体
-    plt.rcParams['axes.unicode_minus'] = False          # 关键：关闭unicode减号，正确显示负号
-    plt.rcParams['font.family'] = 'sans-serif'          # 明确字体族
+    # ========== 第一步：优先配置全局字体（必须在创建figure之前） ==========
+    # 字体解析结果按进程缓存并落盘，重复绘图不再扫描系统字体
+    configure_plot_font()
     
     # ========== 第二步：创建画布（配置后创建） ==========
-    fig = plt.figure(figsize=(18, 8))
+    fig = plt.figure(figsize=PLOT_SETTINGS['figsize'])
     
     # ========== 第三步：中文标签函数（优化字体大小/防重叠） ==========
     def set_chinese_label(ax, xlabel, ylabel, title):
@@ -244,100 +1035,26 @@ def plot_figures(series1_df, series2_df, h):
         # 自动调整标签布局，防止重叠
         ax.tick_params(labelsize=12)  # 刻度字体大小
     
-    # ========== 第四步：计算相关系数 ==========
+    # ========== 第四步：批量拟合与相关系数 ==========
     print("\n" + "="*70)
     print("相关系数计算")
     print("="*70)
     
-    correlation_results = {}  # 存储相关系数结果
+    # 四个幂律关系一次批量拟合，图表与导出的拟合表共用同一结果
+    fits = fit_series_relationships(series1_df, series2_df, n_boot)
+    correlation_results = {name: fit['相关系数_r'] for name, fit in fits.iterrows() if fit['点数_n'] >= 2}
+    for name, label in [('Kxa_U_L', '系列I - Kxa与喷淋密度U_L的相关系数'),
+                        ('H_OL_U_L', '系列I - H_OL与喷淋密度U_L的相关系数'),
+                        ('Kxa_u', '系列II - Kxa与空塔气速u的相关系数'),
+                        ('H_OL_u', '系列II - H_OL与空塔气速u的相关系数')]:
+        if name in correlation_results:
+            print(f"{label}: {correlation_results[name]:.4f}")
+    print("="*70)
     
-    # 系列I：Kxa与U_L的相关系数
     valid_mask1 = (series1_df['体积传质系数_Kxa_kmol_m3_h'] > 0) & (series1_df['传质单元高度_H_OL_m'] > 0)
-    if valid_mask1.any() and sum(valid_mask1) >= 2:
-        valid_data1 = series1_df[valid_mask1]
-        U_L_values = valid_data1['喷淋密度_U_L_m3_m2_h'].values
-        Kxa_values1 = valid_data1['体积传质系数_Kxa_kmol_m3_h'].values
-        
-        # 计算相关系数
-        corr_Kxa_U_L = np.corrcoef(U_L_values, Kxa_values1)[0, 1]
-        correlation_results['Kxa_U_L'] = corr_Kxa_U_L
-        print(f"系列I - Kxa与喷淋密度U_L的相关系数: {corr_Kxa_U_L:.4f}")
-        
-        # 计算H_OL与U_L的相关系数
-        H_OL_values1 = valid_data1['传质单元高度_H_OL_m'].values
-        corr_H_OL_U_L = np.corrcoef(U_L_values, H_OL_values1)[0, 1]
-        correlation_results['H_OL_U_L'] = corr_H_OL_U_L
-        print(f"系列I - H_OL与喷淋密度U_L的相关系数: {corr_H_OL_U_L:.4f}")
-    
-    # 系列II：Kxa与u的相关系数
     valid_mask2 = (series2_df['体积传质系数_Kxa_kmol_m3_h'] > 0) & (series2_df['传质单元高度_H_OL_m'] > 0)
-    if valid_mask2.any() and sum(valid_mask2) >= 2:
-        valid_data2 = series2_df[valid_mask2]
-        u_values = valid_data2['空塔气速_u_m_s'].values
-        Kxa_values = valid_data2['体积传质系数_Kxa_kmol_m3_h'].values
-        
-        # 计算相关系数
-        corr_Kxa_u = np.corrcoef(u_values, Kxa_values)[0, 1]
-        correlation_results['Kxa_u'] = corr_Kxa_u
-        print(f"系列II - Kxa与空塔气速u的相关系数: {corr_Kxa_u:.4f}")
-        
-        # 计算H_OL与u的相关系数
-        H_OL_values = valid_data2['传质单元高度_H_OL_m'].values
-        corr_H_OL_u = np.corrcoef(u_values, H_OL_values)[0, 1]
-        correlation_results['H_OL_u'] = corr_H_OL_u
-        print(f"系列II - H_OL与空塔气速u的相关系数: {corr_H_OL_u:.4f}")
-    print("="*70)
     
-    # ========== 第五步：智能文本位置管理器 ==========
-    class TextPositionManager:
-        """智能管理文本位置，防止重叠"""
-        def __init__(self, ax):
-            self.ax = ax
-            self.positions = []
-            self.min_distance = 0.15  # 最小距离阈值
-            
-        def add_text(self, text, x, y, transform='axes', **kwargs):
-            """添加文本，自动调整位置避免重叠"""
-            # 转换坐标为相对坐标
-            if transform == 'axes':
-                rel_x, rel_y = x, y
-            else:
-                # 如果是数据坐标，转换为相对坐标
-                rel_x, rel_y = self.ax.transData.transform((x, y))
-                rel_x = rel_x / self.ax.figure.bbox.width
-                rel_y = rel_y / self.ax.figure.bbox.height
-            
-            # 检查是否与已有文本太近
-            too_close = False
-            for pos in self.positions:
-                distance = np.sqrt((rel_x - pos[0])**2 + (rel_y - pos[1])**2)
-                if distance < self.min_distance:
-                    too_close = True
-                    break
-            
-            if too_close:
-                # 尝试几个备选位置
-                candidates = [
-                    (rel_x, rel_y + 0.1), (rel_x, rel_y - 0.1),
-                    (rel_x + 0.1, rel_y), (rel_x - 0.1, rel_y),
-                    (rel_x + 0.1, rel_y + 0.1), (rel_x - 0.1, rel_y - 0.1)
-                ]
-                for cand_x, cand_y in candidates:
-                    cand_too_close = False
-                    for pos in self.positions:
-                        distance = np.sqrt((cand_x - pos[0])**2 + (cand_y - pos[1])**2)
-                        if distance < self.min_distance:
-                            cand_too_close = True
-                            break
-                    if not cand_too_close and 0 <= cand_x <= 1 and 0 <= cand_y <= 1:
-                        rel_x, rel_y = cand_x, cand_y
-                        break
-            
-            # 添加文本
-            text_obj = self.ax.text(rel_x, rel_y, text, transform=self.ax.transAxes, 
-                                   fontfamily='sans-serif', **kwargs)
-            self.positions.append((rel_x, rel_y))
-            return text_obj
+    # ========== 第五步：智能文本位置管理器（见模块级TextPositionManager） ==========
     
     # ========== 第六步：图1: Kxa和H_OL与空塔气速u的关系 ==========
     ax1 = plt.subplot(1, 3, 1)
@@ -355,14 +1072,9 @@ def plot_figures(series1_df, series2_df, h):
         # 添加拟合线
         if len(u_values) >= 2:
             try:
-                # 对数值进行线性拟合
-                log_u = np.log10(u_values)
-                log_Kxa = np.log10(Kxa_values)
-                
-                # 线性拟合
-                coeffs = np.polyfit(log_u, log_Kxa, 1)
-                a = 10**coeffs[1]  # 系数a
-                b = coeffs[0]      # 指数b
+                # 取批量拟合结果
+                a = fits.loc['Kxa_u', '系数_a']  # 系数a
+                b = fits.loc['Kxa_u', '指数_b']  # 指数b
                 
                 # 生成拟合曲线
                 u_fit = np.logspace(np.log10(max(u_values.min()*0.9, 1e-3)), 
@@ -378,6 +1090,7 @@ def plot_figures(series1_df, series2_df, h):
                     fit_text = f'Kxa = {a:.2f}·u^{b:.2f}'
                 else:
                     fit_text = f'Kxa = {a:.2f}·u^(-{abs(b):.2f})'
+                fit_text += format_fit_interval(fits.loc['Kxa_u'], 2)
                 
                 # 使用智能位置管理器添加文本
                 text_manager1.add_text(fit_text, 0.05, 0.90,
@@ -411,14 +1124,9 @@ def plot_figures(series1_df, series2_df, h):
         # 添加H_OL的拟合线
         if len(u_values) >= 2:
             try:
-                # 对数值进行线性拟合
-                log_u = np.log10(u_values)
-                log_H_OL = np.log10(H_OL_values)
-                
-                # 线性拟合
-                coeffs = np.polyfit(log_u, log_H_OL, 1)
-                a_H = 10**coeffs[1]
-                b_H = coeffs[0]
+                # 取批量拟合结果
+                a_H = fits.loc['H_OL_u', '系数_a']
+                b_H = fits.loc['H_OL_u', '指数_b']
                 
                 # 生成拟合曲线
                 H_OL_fit = a_H * (u_fit**b_H)
@@ -432,6 +1140,7 @@ def plot_figures(series1_df, series2_df, h):
                     fit_text_H = f'H_OL = {a_H:.3f}·u^{b_H:.2f}'
                 else:
                     fit_text_H = f'H_OL = {a_H:.3f}·u^(-{abs(b_H):.2f})'
+                fit_text_H += format_fit_interval(fits.loc['H_OL_u'], 3)
                 
                 # 使用智能位置管理器添加文本
                 text_manager1.add_text(fit_text_H, 0.95, 0.90,
@@ -475,14 +1184,9 @@ def plot_figures(series1_df, series2_df, h):
         # 添加拟合线
         if len(U_L_values) >= 2:
             try:
-                # 对数值进行线性拟合
-                log_U_L = np.log10(U_L_values)
-                log_Kxa1 = np.log10(Kxa_values1)
-                
-                # 线性拟合
-                coeffs = np.polyfit(log_U_L, log_Kxa1, 1)
-                a = 10**coeffs[1]
-                b = coeffs[0]
+                # 取批量拟合结果
+                a = fits.loc['Kxa_U_L', '系数_a']
+                b = fits.loc['Kxa_U_L', '指数_b']
                 
                 # 生成拟合曲线
                 U_L_fit = np.logspace(np.log10(max(U_L_values.min()*0.9, 1e-3)), 
@@ -498,6 +1202,7 @@ def plot_figures(series1_df, series2_df, h):
                     fit_text = f'Kxa = {a:.2f}·U_L^{b:.2f}'
                 else:
                     fit_text = f'Kxa = {a:.2f}·U_L^(-{abs(b):.2f})'
+                fit_text += format_fit_interval(fits.loc['Kxa_U_L'], 2)
                 
                 # 使用智能位置管理器添加文本
                 text_manager2.add_text(fit_text, 0.05, 0.90,
@@ -530,14 +1235,9 @@ def plot_figures(series1_df, series2_df, h):
         # 添加H_OL的拟合线
         if len(U_L_values) >= 2:
             try:
-                # 对数值进行线性拟合
-                log_U_L = np.log10(U_L_values)
-                log_H_OL1 = np.log10(H_OL_values1)
-                
-                # 线性拟合
-                coeffs = np.polyfit(log_U_L, log_H_OL1, 1)
-                a_H = 10**coeffs[1]
-                b_H = coeffs[0]
+                # 取批量拟合结果
+                a_H = fits.loc['H_OL_U_L', '系数_a']
+                b_H = fits.loc['H_OL_U_L', '指数_b']
                 
                 # 生成拟合曲线
                 H_OL_fit1 = a_H * (U_L_fit**b_H)
@@ -551,6 +1251,7 @@ def plot_figures(series1_df, series2_df, h):
                     fit_text_H = f'H_OL = {a_H:.3f}·U_L^{b_H:.2f}'
                 else:
                     fit_text_H = f'H_OL = {a_H:.3f}·U_L^(-{abs(b_H):.2f})'
+                fit_text_H += format_fit_interval(fits.loc['H_OL_U_L'], 3)
                 
                 # 使用智能位置管理器添加文本
                 text_manager2.add_text(fit_text_H, 0.95, 0.90,
@@ -651,96 +1352,1377 @@ def plot_figures(series1_df, series2_df, h):
     plt.tight_layout(rect=[0, 0, 1, 0.96])  # 为主标题留出空间
     
     # 保存图表
+    saved_png = None
     try:
-        plt.savefig('氧解吸实验分析图表.png', dpi=300, bbox_inches='tight', facecolor='white')
-        print("✓ 图表已保存为PNG文件: 氧解吸实验分析图表.png" 
+        plt.savefig(png_filename, dpi=PLOT_SETTINGS['dpi'], bbox_inches='tight', facecolor='white')
+        saved_png = png_filename
+        print(f"✓ 图表已保存为PNG文件: {png_filename}" 
         " (建议打印彩色版本)")
         print("2405 zjw")
     except Exception as e:
         print(f"✗ 保存PNG图表时出错: {e}")
         # 尝试使用英文文件名保存
         try:
-            plt.savefig('oxygen_desorption_analysis.png', dpi=300, bbox_inches='tight', facecolor='white')
-            print("✓ 图表已保存为英文名PNG文件: oxygen_desorption_analysis.png")
+            fallback_png = os.path.join(os.path.dirname(png_filename), 'oxygen_desorption_analysis.png')
+            plt.savefig(fallback_png, dpi=PLOT_SETTINGS['dpi'], bbox_inches='tight', facecolor='white')
+            saved_png = fallback_png
+            print(f"✓ 图表已保存为英文名PNG文件: {fallback_png}")
         except Exception as e2:
             print(f"✗ 英文名保存也失败: {e2}")
     
-    plt.show()
-    return fig
-   
-def print_processed_tables(df1, df2, h):
-    """打印处理后的数据表 - h已作为参数传入"""
-    print("=" * 120)
-    print("（一）系列 I 数据处理表")
-    print("=" * 120)
-    
-    for idx, row in df1.iterrows():
-        print(f"{row['组号']:>6} | "
-              f"L_v: {row['液体流量_L_v_L_h']:6.1f} L/h | "
-              f"U_L: {row['喷淋密度_U_L_m3_m2_h']:6.2f} m3/(m2·h) | "
-              f"Kxa: {row['体积传质系数_Kxa_kmol_m3_h']:7.2f} kmol/(m3·h) | "
-              f"H_OL: {row['传质单元高度_H_OL_m']:6.3f} m")
+    if use_cache and saved_png:
+        # 字体此时已确定，重新计算键再入库
+        render_cache_store(render_cache_key(series1_df, series2_df, h, n_boot=n_boot), saved_png)
     
-    print("\n" + "=" * 120)
-    print("（二）系列 II 数据处理表")
-    print("=" * 120)
-    
-    for idx, row in df2.iterrows():
-        print(f"{row['组号']:>6} | "
-              f"V_g: {row['气体流量_V_g_m3_h']:6.1f} m3/h | "
-              f"u: {row['空塔气速_u_m_s']:6.4f} m/s | "
-              f"Kxa: {row['体积传质系数_Kxa_kmol_m3_h']:7.2f} kmol/(m3·h) | "
-              f"H_OL: {row['传质单元高度_H_OL_m']:6.3f} m")
+    if show:
+        plt.show()
+    else:
+        plt.close(fig)
+    return saved_png
+   
+# ========== 新增：无界面渲染（复用图形模板） ==========
+
+HEADLESS = False  # 为True时plot_figures默认走无界面渲染（命令行--headless或批处理）
+
+def _format_power_law(name, var, a, b, a_digits):
+    """格式化幂律拟合公式（使用减号而不是负号）"""
+    if b >= 0:
+        return f'{name} = {a:.{a_digits}f}·{var}^{b:.2f}'
+    return f'{name} = {a:.{a_digits}f}·{var}^(-{abs(b):.2f})'
+
+class ChartTemplate:
+    """三联分析图的可复用模板
+
+    图形、坐标轴、标签、图例和布局只构建一次，每次渲染只替换各artist的数据和文字。
+    使用独立的Figure对象（不经过pyplot），不会弹出窗口或阻塞。
+    """
+    # 图1、图2的样式：(横轴列, 公式变量, Kxa线型, Kxa拟合线型, H_OL线型, H_OL拟合线型,
+    #                 Kxa公式底色, H_OL公式底色, 左轴颜色, 右轴颜色, 横轴标签, 标题)
+    TWIN_PANEL_SPECS = [
+        ('空塔气速_u_m_s', 'u', 'bo-', 'b--', 'rs--', 'r:', 'lightblue', 'mistyrose', 'b', 'r',
+         '空塔气速 u (m/s)', '图1: 传质性能与空塔气速关系'),
+        ('喷淋密度_U_L_m3_m2_h', 'U_L', 'go-', 'g--', 'ms--', 'm:', 'lightgreen', 'lavender', 'g', 'm',
+         '喷淋密度 U_L (m³/(m²·h))', '图2: 传质性能与喷淋密度关系'),
+    ]
+
+    def __init__(self, fig=None):
+        from matplotlib.figure import Figure
+        configure_plot_font()
+        self.fig = Figure(figsize=PLOT_SETTINGS['figsize']) if fig is None else fig
+        self.panels = [self._build_twin_panel(i + 1, spec) for i, spec in enumerate(self.TWIN_PANEL_SPECS)]
+        self._build_yx_panel()
+        self.fig.suptitle('氧解吸实验数据分析结果', fontsize=18, fontweight='bold',
+                          fontfamily='sans-serif', y=1.02)
+        self._layout_done = False
+
+    @staticmethod
+    def _set_labels(ax, xlabel, ylabel, title):
+        """设置中文标签（与plot_figures一致）"""
+        ax.set_xlabel(xlabel, fontsize=14, fontfamily='sans-serif')
+        ax.set_ylabel(ylabel, fontsize=14, fontfamily='sans-serif')
+        ax.set_title(title, fontsize=16, fontweight='bold', fontfamily='sans-serif')
+        ax.tick_params(labelsize=12)
+
+    def _set_points(self, line, x, y):
+        """设置数据点（LiveDashboard覆盖此方法以按像素抽稀）"""
+        line.set_data(x, y)
+
+    def _autoscale(self, ax):
+        """按数据重新确定坐标范围"""
+        ax.relim()
+        ax.autoscale_view()
+
+    def _build_twin_panel(self, index, spec):
+        """构建一个Kxa/H_OL双纵轴对数坐标面板，返回其artist字典"""
+        (x_col, var, kxa_style, kxa_fit_style, hol_style, hol_fit_style,
+         kxa_box, hol_box, left_color, right_color, xlabel, title) = spec
+        ax = self.fig.add_subplot(1, 3, index)
+        ax.set_xscale('log')
+        ax.set_yscale('log')
+        axb = ax.twinx()
+        axb.set_yscale('log')
+
+        panel = {'ax': ax, 'axb': axb, 'x_col': x_col, 'var': var}
+        panel['kxa'], = ax.plot([], [], kxa_style, linewidth=2, markersize=10, label='Kxa', zorder=5)
+        panel['kxa_fit'], = ax.plot([], [], kxa_fit_style, linewidth=2, alpha=0.7, label='Kxa拟合', zorder=4)
+        panel['hol'], = axb.plot([], [], hol_style, linewidth=2, markersize=8, label='H_OL', zorder=5)
+        panel['hol_fit'], = axb.plot([], [], hol_fit_style, linewidth=2, alpha=0.7, label='H_OL拟合', zorder=4)
+
+        # 文本按plot_figures中的添加顺序放置，位置与其一致
+        text_manager = TextPositionManager(ax)
+        panel['kxa_text'] = text_manager.add_text('', 0.05, 0.90, verticalalignment='top', fontsize=10,
+                                                  bbox=dict(boxstyle='round', facecolor=kxa_box, alpha=0.8), zorder=6)
+        panel['kxa_corr'] = text_manager.add_text('', 0.05, 0.85, verticalalignment='top', fontsize=10,
+                                                  bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.7), zorder=6)
+        panel['hol_text'] = text_manager.add_text('', 0.95, 0.90, verticalalignment='top',
+                                                  horizontalalignment='right', fontsize=10,
+                                                  bbox=dict(boxstyle='round', facecolor=hol_box, alpha=0.8), zorder=6)
+        panel['hol_corr'] = text_manager.add_text('', 0.95, 0.85, verticalalignment='top',
+                                                  horizontalalignment='right', fontsize=9,
+                                                  bbox=dict(boxstyle='round', facecolor='peachpuff', alpha=0.7), zorder=6)
+
+        self._set_labels(ax, xlabel, '体积传质系数 Kxa (kmol/(m³·h))', title)
+        ax.tick_params(axis='y', labelcolor=left_color)
+        ax.grid(True, which="both", ls="--", alpha=0.3)
+        axb.set_ylabel('传质单元高度 H_OL (m)', fontsize=14, color=right_color)
+        axb.tick_params(axis='y', labelcolor=right_color)
+
+        handles = [panel['kxa'], panel['kxa_fit'], panel['hol'], panel['hol_fit']]
+        ax.legend(handles, [h.get_label() for h in handles], loc='upper left', fontsize=9, ncol=2)
+        return panel
+
+    def _build_yx_panel(self):
+        """构建y-x图面板"""
+        ax3 = self.fig.add_subplot(1, 3, 3)
+        self.ax3 = ax3
+        self.eq_line, = ax3.plot([], [], 'k-', linewidth=3, label='平衡线', zorder=1)
+        self.op_line, = ax3.plot([], [], 'b--', linewidth=2.5, label='操作线', alpha=0.7, zorder=2)
+        self.inlet_point, = ax3.plot([], [], 'ro', markersize=10, label='入口点', zorder=3)
+        self.outlet_point, = ax3.plot([], [], 'go', markersize=10, label='出口点', zorder=3)
+        self.drive_arrows = []
+        for color, y_text, va, label in [('red', 0.2105, 'bottom', '推动力1'), ('orange', 0.2075, 'top', '推动力2')]:
+            arrow = ax3.annotate('', xy=(0, 0.209), xytext=(0, 0.209),
+                                 arrowprops=dict(arrowstyle='<->', color=color, lw=2), zorder=4)
+            text = ax3.text(0, y_text, label, ha='center', va=va, fontsize=10, color=color,
+                            fontfamily='sans-serif',
+                            bbox=dict(boxstyle='round', facecolor='white', alpha=0.7), zorder=5)
+            self.drive_arrows.append((arrow, text))
+        self._set_labels(ax3, '液相氧摩尔分数 x (×10^6)', '气相氧摩尔分数 y', '图3: 氧解吸过程 y-x 图')
+        ax3.grid(True, alpha=0.3)
+        ax3.legend(loc='upper right', fontsize=10)
+
+    def _update_twin_panel(self, panel, df, fits):
+        """用一个系列的数据和批量拟合结果更新双纵轴面板"""
+        valid = (df['体积传质系数_Kxa_kmol_m3_h'] > 0) & (df['传质单元高度_H_OL_m'] > 0)
+        data = df[valid]
+        x = data[panel['x_col']].to_numpy(dtype=float)
+        kxa = data['体积传质系数_Kxa_kmol_m3_h'].to_numpy(dtype=float)
+        hol = data['传质单元高度_H_OL_m'].to_numpy(dtype=float)
+        self._set_points(panel['kxa'], x, kxa)
+        self._set_points(panel['hol'], x, hol)
+
+        has_fit = len(x) >= 2
+        for key in ('kxa_fit', 'hol_fit', 'kxa_text', 'hol_text', 'kxa_corr', 'hol_corr'):
+            panel[key].set_visible(has_fit)
+        if has_fit:
+            x_fit = np.logspace(np.log10(max(x.min()*0.9, 1e-3)), np.log10(x.max()*1.1), 100)
+            kxa_fit = fits.loc[f"Kxa_{panel['var']}"]
+            hol_fit = fits.loc[f"H_OL_{panel['var']}"]
+            a, b = kxa_fit['系数_a'], kxa_fit['指数_b']
+            a_H, b_H = hol_fit['系数_a'], hol_fit['指数_b']
+            panel['kxa_fit'].set_data(x_fit, a * x_fit**b)
+            panel['hol_fit'].set_data(x_fit, a_H * x_fit**b_H)
+            panel['kxa_text'].set_text(_format_power_law('Kxa', panel['var'], a, b, 2)
+                                       + format_fit_interval(kxa_fit, 2))
+            panel['hol_text'].set_text(_format_power_law('H_OL', panel['var'], a_H, b_H, 3)
+                                       + format_fit_interval(hol_fit, 3))
+            panel['kxa_corr'].set_text(f"相关系数 r = {kxa_fit['相关系数_r']:.4f}")
+            panel['hol_corr'].set_text(f"H_OL r = {hol_fit['相关系数_r']:.4f}")
+
+        for ax in (panel['ax'], panel['axb']):
+            self._autoscale(ax)
+
+    def _update_yx_panel(self, series1_df, series2_df):
+        """更新y-x图：平衡线、操作线、第一组的入口/出口点和推动力箭头"""
+        all_x = np.concatenate([df[col].to_numpy(dtype=float)
+                                for df in (series1_df, series2_df)
+                                for col in ('入口摩尔分数_x1', '出口摩尔分数_x2')])
+        x_max = all_x.max() * 1.2 if len(all_x) > 0 else 2e-5
+        x_eq = np.linspace(0, x_max, 100)
+        self.eq_line.set_data(x_eq * 1e6, np.full_like(x_eq, 0.21))
+
+        has_points = len(series1_df) > 0
+        for artist in [self.op_line, self.inlet_point, self.outlet_point] + [a for pair in self.drive_arrows for a in pair]:
+            artist.set_visible(has_points)
+        if has_points:
+            max_x = max(series1_df['入口摩尔分数_x1'].max(), series2_df['入口摩尔分数_x1'].max())
+            min_x = min(series1_df['出口摩尔分数_x2'].min(), series2_df['出口摩尔分数_x2'].min())
+            self.op_line.set_data([max_x * 1e6, min_x * 1e6], [0.21, 0.21])
+
+            first = series1_df.iloc[0]
+            x_star = first['平衡摩尔分数_x_star'] * 1e6
+            x1_point = first['入口摩尔分数_x1'] * 1e6
+            x2_point = first['出口摩尔分数_x2'] * 1e6
+            self.inlet_point.set_data([x1_point], [0.21])
+            self.outlet_point.set_data([x2_point], [0.21])
+            for (arrow, text), x_point in zip(self.drive_arrows, (x1_point, x2_point)):
+                arrow.xy = (x_point, 0.209)
+                arrow.xyann = (x_star, 0.209)
+                text.set_x((x_point + x_star) / 2)
+
+        self._autoscale(self.ax3)
+
+    def render(self, series1_df, series2_df, png_filename, n_boot=None):
+        """用两个系列的数据更新模板并保存PNG"""
+        fits = fit_series_relationships(series1_df, series2_df, n_boot)
+        self._update_twin_panel(self.panels[0], series2_df, fits)
+        self._update_twin_panel(self.panels[1], series1_df, fits)
+        self._update_yx_panel(series1_df, series2_df)
+        return self.save(png_filename)
+
+    def save(self, png_filename):
+        """按当前artist数据保存PNG"""
+        if not self._layout_done:
+            # 布局只在首次渲染（已有刻度标签）时计算一次，之后复用
+            self.fig.tight_layout(rect=[0, 0, 1, 0.96])
+            self._layout_done = True
+        self.fig.savefig(png_filename, dpi=PLOT_SETTINGS['dpi'], bbox_inches='tight', facecolor='white')
+        return png_filename
+
+# 每个线程一个模板（图形对象不能跨线程共用），首次渲染时构建
+_chart_templates = threading.local()
+
+def render_figures_headless(series1_df, series2_df, h, png_filename='氧解吸实验分析图表.png', use_cache=True,
+                            n_boot=None):
+    """无界面渲染三联图：复用进程内的图形模板，不弹窗、不阻塞；返回PNG路径，失败返回None"""
+    key = render_cache_key(series1_df, series2_df, h, 'headless', n_boot)
+    if use_cache and copy_cached_render(key, png_filename):
+        return png_filename
+    try:
+        template = getattr(_chart_templates, 'template', None)
+        if template is None:
+            template = _chart_templates.template = ChartTemplate()
+        template.render(series1_df, series2_df, png_filename, n_boot)
+        print(f"✓ 图表已保存为PNG文件: {png_filename}")
+    except Exception as e:
+        print(f"✗ 保存PNG图表时出错: {e}")
+        return None
+    if use_cache:
+        render_cache_store(key, png_filename)
+    return png_filename
+
+# ========== 新增：多系列总览图 ==========
+
+def plot_series_overview(series_dfs, h, png_filename='氧解吸实验分析图表.png', show=False, n_boot=None):
+    """任意多个系列的总览图：改气量的系列画在图1（横轴u），改液量的系列画在图2（横轴U_L），
+    图3为各系列的y-x操作线。每个系列一种颜色，Kxa为实线圆点（左轴），H_OL为虚线方块（右轴）
+    """
+    import matplotlib
+    from matplotlib.figure import Figure
+    configure_plot_font()
+    fig = plt.figure(figsize=PLOT_SETTINGS['figsize']) if show else Figure(figsize=PLOT_SETTINGS['figsize'])
+    palette = matplotlib.colormaps['tab10'].colors
+    fits = fit_series_table(series_dfs, n_boot).set_index(['系列', '关系'])
+
+    panels = {}
+    for index, (axis_key, xlabel, title) in enumerate([
+            ('gas', '空塔气速 u (m/s)', '图1: 传质性能与空塔气速关系'),
+            ('liquid', '喷淋密度 U_L (m³/(m²·h))', '图2: 传质性能与喷淋密度关系')], 1):
+        ax = fig.add_subplot(1, 3, index)
+        axb = ax.twinx()
+        for a in (ax, axb):
+            a.set_xscale('log')
+            a.set_yscale('log')
+        ChartTemplate._set_labels(ax, xlabel, '体积传质系数 Kxa (kmol/(m³·h))', title)
+        axb.set_ylabel('传质单元高度 H_OL (m)', fontsize=14)
+        ax.grid(True, which="both", ls="--", alpha=0.3)
+        panels[axis_key] = (ax, axb)
+    ax3 = fig.add_subplot(1, 3, 3)
+    ChartTemplate._set_labels(ax3, '液相氧摩尔分数 x (×10^6)', '气相氧摩尔分数 y', '图3: 氧解吸过程 y-x 图')
+    ax3.grid(True, alpha=0.3)
+
+    x_max = 0.0
+    for i, (name, df) in enumerate(series_dfs.items()):
+        color = palette[i % len(palette)]
+        axis = SERIES_AXES[series_axis(name, df)]
+        ax, axb = panels[series_axis(name, df)]
+        valid = ((df['体积传质系数_Kxa_kmol_m3_h'] > 0) & (df['传质单元高度_H_OL_m'] > 0)).to_numpy()
+        x = df[axis['x_col']].to_numpy(dtype=float)[valid]
+        kxa = df['体积传质系数_Kxa_kmol_m3_h'].to_numpy(dtype=float)[valid]
+        hol = df['传质单元高度_H_OL_m'].to_numpy(dtype=float)[valid]
+        ax.plot(x, kxa, 'o-', color=color, linewidth=2, markersize=7, label=f'{name} Kxa', zorder=5)
+        axb.plot(x, hol, 's--', color=color, linewidth=1.5, markersize=6, alpha=0.7, label=f'{name} H_OL', zorder=5)
+        if len(x) >= 2:
+            x_fit = np.logspace(np.log10(x.min() * 0.9), np.log10(x.max() * 1.1), 50)
+            for label, target in (('Kxa', ax), ('H_OL', axb)):
+                fit = fits.loc[(name, f"{label}_{axis['var']}")]
+                if np.isfinite(fit['指数_b']):
+                    target.plot(x_fit, fit['系数_a'] * x_fit**fit['指数_b'], ':', color=color, linewidth=1.5, zorder=4)
+
+        if len(df):
+            x1 = df['入口摩尔分数_x1'].to_numpy(dtype=float) * 1e6
+            x2 = df['出口摩尔分数_x2'].to_numpy(dtype=float) * 1e6
+            ax3.plot([x1.max(), x2.min()], [0.21, 0.21], '--', color=color, linewidth=2, alpha=0.7,
+                     label=f'{name} 操作线', zorder=2)
+            ax3.plot(x1, np.full_like(x1, 0.21), 'o', color=color, markersize=7, zorder=3)
+            ax3.plot(x2, np.full_like(x2, 0.21), 's', color=color, markersize=6, zorder=3)
+            x_max = max(x_max, x1.max())
+    x_eq = np.linspace(0, (x_max or 20) * 1.2, 100)
+    ax3.plot(x_eq, np.full_like(x_eq, 0.21), 'k-', linewidth=3, label='平衡线', zorder=1)
+    ax3.legend(loc='best', fontsize=8)
+
+    for ax, axb in panels.values():
+        handles = ax.get_legend_handles_labels()[0] + axb.get_legend_handles_labels()[0]
+        if handles:
+            ax.legend(handles, [hd.get_label() for hd in handles], loc='upper left', fontsize=8, ncol=2)
+        else:
+            ax.text(0.5, 0.5, '无数据', transform=ax.transAxes, ha='center', va='center', fontsize=14)
+
+    fig.suptitle(f'氧解吸实验数据分析结果（{len(series_dfs)}个系列）', fontsize=18, fontweight='bold',
+                 fontfamily='sans-serif', y=1.02)
+    fig.tight_layout(rect=[0, 0, 1, 0.96])
+    try:
+        fig.savefig(png_filename, dpi=PLOT_SETTINGS['dpi'], bbox_inches='tight', facecolor='white')
+        print(f"✓ 图表已保存为PNG文件: {png_filename}")
+    except Exception as e:
+        print(f"✗ 保存PNG图表时出错: {e}")
+        png_filename = None
+    if show:
+        plt.show()
+    return png_filename
+
+def plot_series(series_dfs, h, png_filename='氧解吸实验分析图表.png', show=True, use_cache=True, headless=None,
+                n_boot=None):
+    """按实际存在的系列绘图：恰为系列I、II时用plot_figures的详细三联图，否则用总览图"""
+    if set(series_dfs) == {'I', 'II'}:
+        return plot_figures(series_dfs['I'], series_dfs['II'], h, png_filename=png_filename, show=show,
+                            use_cache=use_cache, headless=headless, n_boot=n_boot)
+    headless = HEADLESS if headless is None else headless
+    return plot_series_overview(series_dfs, h, png_filename, show=show and not headless, n_boot=n_boot)
+
+_CN_NUMERALS = '一二三四五六七八九十'
+
+def print_series_tables(series_dfs, h, tower=None):
+    """打印各系列处理后的数据表"""
+    for i, (name, df) in enumerate(series_dfs.items()):
+        numeral = _CN_NUMERALS[i] if i < len(_CN_NUMERALS) else str(i + 1)
+        print(("\n" if i else "") + "=" * 120)
+        print(f"（{numeral}）系列 {name} 数据处理表")
+        print("=" * 120)
+        
+        gas = series_axis(name, df) == 'gas'
+        for idx, row in df.iterrows():
+            if gas:
+                flow = (f"V_g: {row['气体流量_V_g_m3_h']:6.1f} m3/h | "
+                        f"u: {row['空塔气速_u_m_s']:6.4f} m/s | ")
+            else:
+                flow = (f"L_v: {row['液体流量_L_v_L_h']:6.1f} L/h | "
+                        f"U_L: {row['喷淋密度_U_L_m3_m2_h']:6.2f} m3/(m2·h) | ")
+            print(f"{row['组号']:>6} | " + flow +
+                  f"Kxa: {row['体积传质系数_Kxa_kmol_m3_h']:7.2f} kmol/(m3·h) | "
+                  f"H_OL: {row['传质单元高度_H_OL_m']:6.3f} m")
     
     print("\n" + "=" * 120)
     print("实验条件说明：")
-    print(f"塔内径 D = {D*1000:.1f} mm")
-    print(f"塔截面积 F = {F:.6f} m2")
+    tower = DEFAULT_TOWER if tower is None else tower
+    print(f"塔内径 D = {tower.D*1000:.1f} mm")
+    print(f"塔截面积 F = {tower.F:.6f} m2")
     print(f"填料层高度 h = {h:.3f} m")
     print("=" * 120)
 
-# ========== 新增：菜单系统 ==========
+def print_processed_tables(df1, df2, h):
+    """打印处理后的数据表 - h已作为参数传入"""
+    print_series_tables({'I': df1, 'II': df2}, h)
 
-def clear_screen():
-    """清屏"""
-    os.system('cls' if sys.platform == 'win32' else 'clear')
+# ========== 新增：增量重算（依赖追踪计算图） ==========
 
-def show_menu():
-    """显示主菜单"""
-    print("=" * 70)
-    print("           氧解吸实验数据处理系统")
-    print("=" * 70)
-    print("1. 执行完整数据分析（输入新数据）")
-    print("2. 使用测试数据分析")
-    print("3. 查看历史结果文件")
-    print("4. 重新绘制上次的图表")
-    print("5. 系统设置与帮助")
-    print("0. 退出程序")
-    print("-" * 70)
+class ComputeGraph:
+    """依赖追踪的计算图：节点按需计算并缓存，输入改变时只让其下游节点失效
 
-def option1_full_analysis():
-    """选项1：完整数据分析"""
-    clear_screen()
-    print("=" * 70)
-    print("氧解吸实验数据处理系统（含数据验证）")
-    print("=" * 70)
-    
-    # 获取填料层高度
+    每个节点的值带一个版本号（全局递增），使用方比较版本号即可知道结果是否变化
+    """
+
+    def __init__(self):
+        import itertools
+        self._nodes = {}        # 节点名 -> (计算函数, 依赖节点名)
+        self._dependents = {}   # 节点名 -> 直接依赖它的节点名
+        self._values = {}
+        self._versions = {}
+        self._counter = itertools.count(1)
+        self.recomputed = []    # 最近重新计算过的节点，调用clear_log()清空
+
+    def input(self, name, value):
+        """设置输入节点；新值与旧值相同时不触发任何重算"""
+        if name in self._values and _same_value(self._values[name], value):
+            return False
+        self._invalidate(name)
+        self._values[name] = value
+        self._versions[name] = next(self._counter)
+        return True
+
+    def node(self, name, func, *deps):
+        """定义（或重新定义）计算节点：值为func(*各依赖节点的值)"""
+        for dep in self._nodes.get(name, (None, ()))[1]:
+            self._dependents.get(dep, set()).discard(name)
+        self._nodes[name] = (func, deps)
+        for dep in deps:
+            self._dependents.setdefault(dep, set()).add(name)
+        self._invalidate(name)
+
+    def get(self, name):
+        """取节点的值，缺失（或已失效）时先计算其依赖"""
+        if name not in self._values:
+            func, deps = self._nodes[name]
+            self._values[name] = func(*(self.get(dep) for dep in deps))
+            self._versions[name] = next(self._counter)
+            self.recomputed.append(name)
+        return self._values[name]
+
+    def version(self, name):
+        """节点当前值的版本号（必要时先计算）"""
+        self.get(name)
+        return self._versions[name]
+
+    def clear_log(self):
+        self.recomputed = []
+
+    def _invalidate(self, name):
+        """清除name（若是计算节点）及其全部下游节点的缓存值"""
+        stack, seen = [name], {name}
+        while stack:
+            current = stack.pop()
+            if current in self._nodes:
+                self._values.pop(current, None)
+            for dep in self._dependents.get(current, ()):
+                if dep not in seen:
+                    seen.add(dep)
+                    stack.append(dep)
+
+def _same_value(a, b):
+    """输入值是否未变化（数组逐元素比较）"""
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return np.shape(a) == np.shape(b) and np.array_equal(a, b)
+    return type(a) is type(b) and a == b
+
+class IncrementalAnalysis:
+    """增量分析：各系列读数、h、塔配置作为输入，明细列、拟合、导出表和图表面板作为下游节点
+
+    改h只重算Kxa、H_OL及其下游（L、x1、x2、x_star、U_L等不变，y-x图面板不重画）；
+    修正一组读数只重算该系列。导出和作图只重写版本变化过的表和面板。
+    """
+
+    def __init__(self, series_data, h, tower=None, n_boot=None, n_samples=None):
+        self.graph = ComputeGraph()
+        self.graph.input('h', float(h))
+        self.graph.input('tower', DEFAULT_TOWER if tower is None else tower)
+        self.graph.input('n_boot', BOOTSTRAP_RESAMPLES if n_boot is None else n_boot)
+        self.graph.input('n_samples', UNCERTAINTY_SAMPLES if n_samples is None else n_samples)
+        self.names = []
+        self._exported = {}   # (文件名, 格式) -> {表名: 已写出的版本号}
+        self._chart = None
+        self._drawn = {}      # 图表面板 -> 已画出的依赖版本号
+        self._saved = {}      # PNG文件名 -> 保存时各面板的版本号
+        for name, data in series_data.items():
+            self.set_series(name, data)
+
+    @classmethod
+    def from_series_dfs(cls, series_dfs, h, tower=None, n_boot=None, n_samples=None):
+        """由已处理的明细表（取其中的输入列和组号）建立"""
+        analysis = cls({}, h, tower, n_boot, n_samples)
+        for name, df in series_dfs.items():
+            analysis.set_series(name, df[['液体流量_L_v_L_h', '气体流量_V_g_m3_h', '水温_T_C',
+                                          '入口浓度_C1_mg_L', '出口浓度_C2_mg_L']].to_numpy(dtype=float),
+                                labels=list(df['组号']))
+        return analysis
+
+    @property
+    def h(self):
+        return self.graph.get('h')
+
+    @property
+    def tower(self):
+        return self.graph.get('tower')
+
+    def set_h(self, h):
+        """修改填料层高度"""
+        return self.graph.input('h', float(h))
+
+    def set_tower(self, tower):
+        """修改塔配置"""
+        return self.graph.input('tower', tower)
+
+    def set_series(self, name, data, labels=None):
+        """设置（或新增）一个系列的全部读数，每行L_v, V_g, T, C1, C2"""
+        rows = np.asarray(data, dtype=float).reshape(-1, 5)
+        if labels is None:
+            labels = [f'{name}-{i}' for i in range(1, len(rows) + 1)]
+        g = self.graph
+        g.input(f'labels:{name}', tuple(labels))
+        g.input(f'rows:{name}', rows)
+        if name in self.names:
+            return
+        self.names.append(name)
+        g.node(f'base:{name}', lambda rows, tower: _kxa_base_columns(*rows.T, tower), f'rows:{name}', 'tower')
+        g.node(f'height:{name}', _kxa_height_columns, f'base:{name}', 'h', 'tower')
+        g.node(f'detail:{name}', lambda labels, rows, base, height: _assemble_detail(list(labels), rows,
+                                                                                   {**base, **height}),
+               f'labels:{name}', f'rows:{name}', f'base:{name}', f'height:{name}')
+        g.node(f'fit:{name}', lambda df, n_boot, name=name: fit_series_table({name: df}, n_boot),
+               f'detail:{name}', 'n_boot')
+        g.node(f'summary:{name}', lambda df, name=name: _summary_sheet(name, df), f'detail:{name}')
+        g.node(f'uncertainty:{name}', lambda df, h, tower, n: propagate_uncertainty(df, h, n, tower=tower),
+               f'detail:{name}', 'h', 'tower', 'n_samples')
+        # y-x图只用到x1、x2、x_star，与h无关
+        g.node(f'yx:{name}', lambda base: pd.DataFrame({'入口摩尔分数_x1': base['x1'],
+                                                        '出口摩尔分数_x2': base['x2'],
+                                                        '平衡摩尔分数_x_star': base['x_star']}),
+               f'base:{name}')
+        g.node('fits', lambda *tables: pd.concat(tables, ignore_index=True),
+               *[f'fit:{n}' for n in self.names])
+        g.node('conditions', _conditions_sheet, 'h', 'tower')
+
+    def set_reading(self, name, index, values):
+        """修正某系列第index组（从0开始）的读数"""
+        rows = self.graph.get(f'rows:{name}').copy()
+        rows[index] = np.asarray(values, dtype=float)
+        return self.graph.input(f'rows:{name}', rows)
+
+    def series_dfs(self):
+        """{系列名: 明细DataFrame}"""
+        return {name: self.graph.get(f'detail:{name}') for name in self.names}
+
+    def fits(self):
+        """各系列的幂律拟合表（同fit_series_table）"""
+        return self.graph.get('fits')
+
+    def sheet_nodes(self):
+        """{表名: 节点名}，顺序与build_series_sheets一致"""
+        sheets = {_sheet_name(f'系列{name}_详细数据'): f'detail:{name}' for name in self.names}
+        sheets.update({_sheet_name(f'系列{name}_汇总'): f'summary:{name}' for name in self.names})
+        sheets['幂律拟合'] = 'fits'
+        if self.graph.get('n_samples') > 0:
+            sheets.update({_sheet_name(f'系列{name}_不确定度'): f'uncertainty:{name}' for name in self.names})
+        sheets['实验条件'] = 'conditions'
+        return sheets
+
+    def export(self, filename, formats=None):
+        """导出结果，返回本次重写的表名列表
+
+        parquet/feather/csv每表一个文件，只重写内容变化过的表；xlsx须整本写出，任一表变化时
+        用缓存的各表重写（不重新计算未变化的表）
+        """
+        formats = EXPORT_FORMATS if formats is None else formats
+        nodes = self.sheet_nodes()
+        versions = {sheet: self.graph.version(node) for sheet, node in nodes.items()}
+        rewritten = set()
+        for fmt in formats:
+            key = (os.path.abspath(filename), fmt)
+            written = self._exported.get(key, {})
+            changed = [sheet for sheet in nodes if written.get(sheet) != versions[sheet]]
+            if fmt == 'xlsx' and (changed or not os.path.exists(filename)):
+                _write_excel({sheet: self.graph.get(node) for sheet, node in nodes.items()}, filename)
+            elif fmt != 'xlsx' and changed:
+                _write_sheet_files({sheet: self.graph.get(nodes[sheet]) for sheet in changed}, filename, fmt)
+            else:
+                continue
+            self._exported[key] = versions
+            rewritten.update(changed)
+        return [sheet for sheet in nodes if sheet in rewritten]
+
+    def update_chart(self, chart=None):
+        """把变化过的数据更新到三联图模板的对应面板，返回重画的面板名；只适用于标准两系列I、II"""
+        if set(self.names) != {'I', 'II'}:
+            raise ValueError("三联图只适用于系列I、II，其余情况请用plot_series_overview")
+        if chart is not None and chart is not self._chart:
+            self._chart, self._drawn = chart, {}
+        elif self._chart is None:
+            self._chart = ChartTemplate()
+        chart = self._chart
+        g = self.graph
+        fit_index = lambda name: g.get(f'fit:{name}').set_index('关系')
+        panels = {
+            # 图1为系列II（改气量），图2为系列I（改液量）
+            'gas': (('detail:II', 'fit:II'),
+                    lambda: chart._update_twin_panel(chart.panels[0], g.get('detail:II'), fit_index('II'))),
+            'liquid': (('detail:I', 'fit:I'),
+                       lambda: chart._update_twin_panel(chart.panels[1], g.get('detail:I'), fit_index('I'))),
+            'yx': (('yx:I', 'yx:II'), lambda: chart._update_yx_panel(g.get('yx:I'), g.get('yx:II'))),
+        }
+        redrawn = []
+        for panel, (deps, update) in panels.items():
+            versions = tuple(g.version(dep) for dep in deps)
+            if self._drawn.get(panel) != versions:
+                update()
+                self._drawn[panel] = versions
+                redrawn.append(panel)
+        return redrawn
+
+    def render(self, png_filename='氧解吸实验分析图表.png'):
+        """更新图表并保存PNG；非标准系列组合时画总览图"""
+        if set(self.names) != {'I', 'II'}:
+            return plot_series_overview(self.series_dfs(), self.h, png_filename)
+        self.update_chart()
+        # 各面板都未变化且文件仍在时不再保存
+        drawn = dict(self._drawn)
+        key = os.path.abspath(png_filename)
+        if self._saved.get(key) == drawn and os.path.exists(png_filename):
+            return png_filename
+        self._chart.save(png_filename)
+        self._saved[key] = drawn
+        return png_filename
+
+# ========== 新增：实时仪表盘（blitting） ==========
+
+LIVE_DASHBOARD_FPS = 10        # 最高刷新帧率
+LIVE_DASHBOARD_LOG_MARGIN = 1.5   # 对数坐标扩展范围时两端各留的倍数余量
+
+def decimate_for_pixels(x, y, n_pixels, log_x=False):
+    """点数超过像素列数时抽稀：按x分到n_pixels列，每列只保留y最小和最大的点
+
+    曲线形状和极值在屏幕上与全部点一致；返回按x排序的(x, y)
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n_pixels = max(int(n_pixels), 1)
+    if len(x) <= 2 * n_pixels:
+        return x, y
+    pos = np.log10(x) if log_x else x
+    span = pos.max() - pos.min()
+    bins = ((pos - pos.min()) / (span if span > 0 else 1) * (n_pixels - 1)).astype(np.intp)
+    order = np.lexsort((y, bins))            # 先按列、列内按y排序
+    sorted_bins = bins[order]
+    first = np.flatnonzero(np.r_[True, sorted_bins[1:] != sorted_bins[:-1]])
+    last = np.r_[first[1:] - 1, len(order) - 1]
+    keep = np.unique(np.concatenate([order[first], order[last]]))
+    keep = keep[np.argsort(x[keep], kind='stable')]
+    return x[keep], y[keep]
+
+class LiveDashboard(ChartTemplate):
+    """实时仪表盘：三联图窗口常开，每帧只重绘变化的artist（blitting）
+
+    坐标轴、网格、标签和图例画在背景中只绘制一次；数据超出当前坐标范围时才扩大范围
+    并完整重绘一次。刷新频率不超过max_fps，点数超过像素分辨率时自动抽稀。
+    """
+
+    def __init__(self, max_fps=LIVE_DASHBOARD_FPS):
+        configure_plot_font()
+        super().__init__(plt.figure(figsize=PLOT_SETTINGS['figsize']))
+        self.max_fps = max_fps
+        self.frames = 0
+        self.full_draws = 0
+        self._last_frame = float('-inf')
+        self._background = None
+        self._needs_full_draw = True
+        self._scaled = set()   # 已按数据设置过范围的(坐标轴, 方向)
+
+        self._animated = []
+        for panel in self.panels:
+            self._animated += [panel[k] for k in ('kxa', 'kxa_fit', 'hol', 'hol_fit',
+                                                 'kxa_text', 'kxa_corr', 'hol_text', 'hol_corr')]
+        self._animated += [self.eq_line, self.op_line, self.inlet_point, self.outlet_point]
+        self._animated += [a for pair in self.drive_arrows for a in pair]
+        for artist in self._animated:
+            artist.set_animated(True)
+
+        self.fig.canvas.mpl_connect('draw_event', self._on_draw)
+        if not HEADLESS:
+            plt.show(block=False)
+
+    def _set_points(self, line, x, y):
+        x, y = decimate_for_pixels(x, y, line.axes.bbox.width, log_x=line.axes.get_xscale() == 'log')
+        line.set_data(x, y)
+
+    def _autoscale(self, ax):
+        """数据超出当前范围时才扩大（两端留余量）并标记需要完整重绘；否则范围不变，只做blit"""
+        ax.relim()
+        points = ax.dataLim.get_points()
+        if not np.all(np.isfinite(points)):
+            return
+        for i, (axis, get_lim, set_lim, scale) in enumerate([
+                ('x', ax.get_xlim, ax.set_xlim, ax.get_xscale()),
+                ('y', ax.get_ylim, ax.set_ylim, ax.get_yscale())]):
+            d0, d1 = points[0][i], points[1][i]
+            v0, v1 = sorted(get_lim())
+            if (id(ax), axis) in self._scaled and v0 <= d0 and d1 <= v1:
+                continue
+            if scale == 'log':
+                if d0 <= 0:
+                    continue
+                set_lim(d0 / LIVE_DASHBOARD_LOG_MARGIN, d1 * LIVE_DASHBOARD_LOG_MARGIN)
+            else:
+                pad = (d1 - d0) * 0.25 if d1 > d0 else abs(d0) * 0.02 or 1.0
+                set_lim(d0 - pad, d1 + pad)
+            self._scaled.add((id(ax), axis))
+            self._needs_full_draw = True
+
+    def _on_draw(self, event):
+        """完整重绘（含窗口缩放）后保存背景，并画上动态artist"""
+        self._background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        for artist in self._animated:
+            if artist.get_visible():
+                self.fig.draw_artist(artist)
+
+    def due(self):
+        """距上一帧是否已超过帧间隔（数据准备较费时时，调用方可先判断再组装数据）"""
+        return time.perf_counter() - self._last_frame >= 1 / self.max_fps
+
+    def update(self, series1_df, series2_df, fits=None, force=False):
+        """刷新一帧；未到帧间隔且force=False时跳过并返回False"""
+        if not force and not self.due():
+            return False
+        self._last_frame = time.perf_counter()
+        if fits is None:
+            fits = fit_series_relationships(series1_df, series2_df)
+        self._update_twin_panel(self.panels[0], series2_df, fits)
+        self._update_twin_panel(self.panels[1], series1_df, fits)
+        self._update_yx_panel(series1_df, series2_df)
+
+        canvas = self.fig.canvas
+        if self._background is None or self._needs_full_draw:
+            if not self._layout_done:
+                self.fig.tight_layout(rect=[0, 0, 1, 0.96])
+                self._layout_done = True
+            self._needs_full_draw = False
+            self.full_draws += 1
+            canvas.draw()   # 触发_on_draw
+        else:
+            canvas.restore_region(self._background)
+            self._draw_animated()
+        canvas.blit(self.fig.bbox)
+        canvas.flush_events()
+        self.frames += 1
+        return True
+
+    async def pump(self):
+        """在asyncio事件循环中定期处理窗口事件，保持界面响应"""
+        while True:
+            self.fig.canvas.flush_events()
+            await asyncio.sleep(1 / self.max_fps)
+
+    def close(self):
+        plt.close(self.fig)
+
+# ========== 新增：批量表格读取与分块验证 ==========
+
+# 输入文件列名 -> 内部短列名（同时接受导出表的中文列名和简写）
+INPUT_COLUMN_ALIASES = {
+    '系列': 'series', 'series': 'series',
+    '液体流量_L_v_L_h': 'L_v', 'L_v': 'L_v',
+    '气体流量_V_g_m3_h': 'V_g', 'V_g': 'V_g',
+    '水温_T_C': 'T', 'T': 'T',
+    '入口浓度_C1_mg_L': 'C1', 'C1': 'C1',
+    '出口浓度_C2_mg_L': 'C2', 'C2': 'C2',
+    '填料层高度_h_m': 'h', 'h': 'h',
+    '塔内径_D_m': 'D', 'D': 'D',
+}
+INPUT_VALUE_COLUMNS = ['L_v', 'V_g', 'T', 'C1', 'C2']
+DEFAULT_CHUNK_ROWS = 100_000
+
+def _iter_raw_chunks(path, chunksize):
+    """按文件类型分块读取原始表格，每块最多chunksize行"""
+    lower = path.lower()
+    if lower.endswith('.parquet'):
+        import pyarrow.parquet as pq  # 可选依赖，仅读取Parquet时需要
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    elif lower.endswith(('.xlsx', '.xlsm')):
+        # 只读模式逐行流式解析，不把整个工作簿载入内存
+        from openpyxl import load_workbook
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = wb.worksheets[0].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            buffer = []
+            for row in rows:
+                buffer.append(row)
+                if len(buffer) >= chunksize:
+                    yield pd.DataFrame(buffer, columns=header)
+                    buffer = []
+            if buffer:
+                yield pd.DataFrame(buffer, columns=header)
+        finally:
+            wb.close()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+def _normalize_run_columns(chunk, path):
+    """统一列名为内部短列名，数值列转为float（无法解析的记为NaN）"""
+    chunk = chunk.rename(columns=lambda c: INPUT_COLUMN_ALIASES.get(str(c).strip(), c))
+    missing = [c for c in INPUT_VALUE_COLUMNS if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"{path} 缺少列: {', '.join(missing)}")
+    for col in INPUT_VALUE_COLUMNS:
+        chunk[col] = pd.to_numeric(chunk[col], errors='coerce')
+    if 'series' in chunk.columns:
+        chunk['series'] = chunk['series'].astype(str).str.strip()
+    return chunk
+
+def iter_run_chunks(path, chunksize=DEFAULT_CHUNK_ROWS):
+    """分块读取实验数据文件(CSV/XLSX/Parquet)，每块整体验证一次
+
+    逐块产出(数据块, 错误码数组)，错误码含义见ERROR_CODE_MESSAGES
+    """
+    for chunk in _iter_raw_chunks(path, chunksize):
+        chunk = _normalize_run_columns(chunk, path)
+        codes = validate_data_array(chunk['T'].to_numpy(), chunk['C1'].to_numpy(), chunk['C2'].to_numpy(),
+                                    L_v=chunk['L_v'].to_numpy(), V_g=chunk['V_g'].to_numpy())
+        yield chunk, codes
+
+def load_run_table(path, chunksize=DEFAULT_CHUNK_ROWS):
+    """读取整个实验数据文件，返回(数据表, 每行错误码数组)"""
+    chunks, codes = [], []
+    for chunk, chunk_codes in iter_run_chunks(path, chunksize):
+        chunks.append(chunk)
+        codes.append(chunk_codes)
+    if not chunks:
+        return pd.DataFrame(columns=['series'] + INPUT_VALUE_COLUMNS), np.zeros(0, dtype=np.uint8)
+    return pd.concat(chunks, ignore_index=True), np.concatenate(codes)
+
+def valid_long_table(df, codes, path):
+    """取出通过验证的数据行（含series列的长表），打印被拒绝行的统计"""
+    if 'series' not in df.columns:
+        raise ValueError(f"{path} 缺少列: series")
+    for msg, count in summarize_error_codes(codes).items():
+        print(f"⚠ {os.path.basename(path)}: {count} 行{msg}，已跳过")
+    valid = df[valid_mask(codes)]
+    if valid.empty:
+        raise ValueError(f"{path} 中没有有效数据")
+    return valid
+
+# ========== 新增：结果库（SQLite，只追加） ==========
+
+RESULTS_DB_NAME = '氧解吸实验结果库.sqlite'
+
+# 明细数据列 -> 结果库字段
+RESULT_DB_COLUMNS = [
+    ('组号', 'group_no'),
+    ('液体流量_L_v_L_h', 'L_v'),
+    ('气体流量_V_g_m3_h', 'V_g'),
+    ('水温_T_C', 'T'),
+    ('入口浓度_C1_mg_L', 'C1'),
+    ('出口浓度_C2_mg_L', 'C2'),
+    ('喷淋密度_U_L_m3_m2_h', 'U_L'),
+    ('空塔气速_u_m_s', 'u'),
+    ('液体摩尔流量_L_kmol_h', 'L_mol'),
+    ('入口摩尔分数_x1', 'x1'),
+    ('出口摩尔分数_x2', 'x2'),
+    ('平衡摩尔分数_x_star', 'x_star'),
+    ('对数项_ln', 'ln_term'),
+    ('体积传质系数_Kxa_kmol_m3_h', 'Kxa'),
+    ('传质单元高度_H_OL_m', 'H_OL'),
+]
+
+_RESULTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    h REAL NOT NULL,
+    D REAL,
+    source TEXT,
+    workbook TEXT,
+    png TEXT,
+    n_rows INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_runs_created_at ON runs(created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_h ON runs(h);
+CREATE INDEX IF NOT EXISTS idx_runs_workbook ON runs(workbook);
+CREATE TABLE IF NOT EXISTS results (
+    run_id TEXT NOT NULL,
+    series TEXT NOT NULL,
+    """ + ",\n    ".join(f"{col} {'TEXT' if col == 'group_no' else 'REAL'}" for _, col in RESULT_DB_COLUMNS) + """
+);
+CREATE INDEX IF NOT EXISTS idx_results_run_series ON results(run_id, series);
+CREATE INDEX IF NOT EXISTS idx_results_series ON results(series);
+CREATE TABLE IF NOT EXISTS artifacts (
+    path TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_artifacts_kind_mtime ON artifacts(kind, mtime_ns);
+CREATE INDEX IF NOT EXISTS idx_artifacts_mtime ON artifacts(mtime_ns);
+"""
+RESULTS_DB_VERSION = 1   # 结构变化时加1，并在_migrate_results_db中补上升级步骤
+
+def _migrate_results_db(conn):
+    """建表并升级旧库，完成后写入user_version；在写锁内重新检查版本，多进程同时首次打开时只执行一次"""
+    conn.execute("BEGIN IMMEDIATE")
     try:
-        h = float(input("请输入填料层高度 h (m): "))
-    except:
-        print("输入错误，使用默认值 h = 0.8 m")
+        if conn.execute("PRAGMA user_version").fetchone()[0] < RESULTS_DB_VERSION:
+            for statement in _RESULTS_SCHEMA.split(';'):
+                if statement.strip():
+                    conn.execute(statement)
+            # 早期建立的结果库没有D列，补上（旧记录为NULL，即标准塔）
+            if 'D' not in {row[1] for row in conn.execute("PRAGMA table_info(runs)")}:
+                conn.execute("ALTER TABLE runs ADD COLUMN D REAL")
+            conn.execute("DROP TABLE IF EXISTS manifest_dirs")   # 早期按目录mtime对账的记录表，已不用
+            conn.execute(f"PRAGMA user_version = {RESULTS_DB_VERSION}")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+def connect_results_db(db_path=RESULTS_DB_NAME):
+    """打开（必要时创建）结果库；多进程同时写入时等待锁。库结构已是最新时不再执行建表语句"""
+    import sqlite3
+    conn = sqlite3.connect(db_path, timeout=30)
+    if conn.execute("PRAGMA user_version").fetchone()[0] < RESULTS_DB_VERSION:
+        _migrate_results_db(conn)
+    return conn
+
+def store_run(series_dfs, h, workbook=None, png=None, source='', db_path=RESULTS_DB_NAME, tower=None):
+    """把一次分析的各系列明细追加到结果库，返回run_id
+
+    series_dfs为{系列名: 明细DataFrame}
+    """
+    tower = DEFAULT_TOWER if tower is None else tower
+    import datetime
+    import uuid
+    now = datetime.datetime.now()
+    run_id = f"{now.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+    rename = dict(RESULT_DB_COLUMNS)
+    conn = connect_results_db(db_path)
+    try:
+        with conn:
+            for series, df in series_dfs.items():
+                rows = df[list(rename)].rename(columns=rename)
+                rows.insert(0, 'series', series)
+                rows.insert(0, 'run_id', run_id)
+                rows.to_sql('results', conn, if_exists='append', index=False)
+            conn.execute(
+                "INSERT INTO runs (run_id, created_at, h, D, source, workbook, png, n_rows) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, now.strftime('%Y-%m-%d %H:%M:%S'), float(h), tower.D, source,
+                 os.path.abspath(workbook) if workbook else None,
+                 os.path.abspath(png) if png else None,
+                 int(sum(len(df) for df in series_dfs.values()))))
+    finally:
+        conn.close()
+    return run_id
+
+def record_series_run(series_dfs, h, workbook=None, png=None, source='', db_path=RESULTS_DB_NAME, tower=None):
+    """store_run的容错包装：写入结果库失败只提示，不影响分析流程；同时更新文件清单"""
+    try:
+        run_id = store_run(series_dfs, h, workbook, png, source, db_path, tower)
+        update_manifest([p for p in (workbook, png) if p], db_path)
+        return run_id
+    except Exception as e:
+        print(f"⚠ 写入结果库失败: {e}")
+        return None
+
+def record_run(series1_df, series2_df, h, workbook=None, png=None, source='', db_path=RESULTS_DB_NAME):
+    """记录标准两系列（I、II）的一次分析"""
+    return record_series_run({'I': series1_df, 'II': series2_df}, h, workbook, png, source, db_path)
+
+def list_runs(limit=20, offset=0, series=None, h=None, db_path=RESULTS_DB_NAME):
+    """按时间倒序分页列出结果库中的分析记录，可按系列和h筛选"""
+    if not os.path.exists(db_path):
+        return pd.DataFrame(columns=['run_id', 'created_at', 'h', 'D', 'source', 'workbook', 'png', 'n_rows'])
+    where, params = [], []
+    if series is not None:
+        where.append("run_id IN (SELECT run_id FROM results WHERE series = ?)")
+        params.append(series)
+    if h is not None:
+        where.append("h = ?")
+        params.append(float(h))
+    sql = "SELECT * FROM runs"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY created_at DESC, rowid DESC LIMIT ? OFFSET ?"
+    conn = connect_results_db(db_path)
+    try:
+        return pd.read_sql_query(sql, conn, params=params + [limit, offset])
+    finally:
+        conn.close()
+
+def load_run(run_id=None, db_path=RESULTS_DB_NAME):
+    """从结果库读取一次分析（默认最近一次），返回(run信息, {系列名: 明细DataFrame})；无记录时返回(None, {})"""
+    if not os.path.exists(db_path):
+        return None, {}
+    conn = connect_results_db(db_path)
+    try:
+        if run_id is None:
+            runs = pd.read_sql_query("SELECT * FROM runs ORDER BY created_at DESC, rowid DESC LIMIT 1", conn)
+        else:
+            runs = pd.read_sql_query("SELECT * FROM runs WHERE run_id = ?", conn, params=[run_id])
+        if runs.empty:
+            return None, {}
+        run = runs.iloc[0].to_dict()
+        rows = pd.read_sql_query("SELECT * FROM results WHERE run_id = ? ORDER BY rowid", conn,
+                                 params=[run['run_id']])
+    finally:
+        conn.close()
+    rename = {col: name for name, col in RESULT_DB_COLUMNS}
+    series_dfs = {series: part.drop(columns=['run_id', 'series']).rename(columns=rename).reset_index(drop=True)
+                  for series, part in rows.groupby('series', sort=False)}
+    return run, series_dfs
+
+# ========== 新增：增量回归累加器 ==========
+
+class PowerLawAccumulator:
+    """幂律 y = a·x^b 的增量回归：只保存累加和，增加/删除数据点与合并均为O(1)（与点数无关）"""
+
+    def __init__(self, sums=None):
+        self.sums = np.zeros(11) if sums is None else np.array(sums, dtype=float)
+
+    def add(self, x, y):
+        """加入一个或一批数据点（非正值自动忽略）"""
+        terms, _ = _power_law_terms(x, y)
+        self.sums += terms.sum(axis=1)
+        return self
+
+    def remove(self, x, y):
+        """删除先前加入的数据点"""
+        terms, _ = _power_law_terms(x, y)
+        self.sums -= terms.sum(axis=1)
+        return self
+
+    def merge(self, other):
+        """合并另一个累加器（如并行进程各自累计的结果）"""
+        self.sums += other.sums
+        return self
+
+    def __add__(self, other):
+        return PowerLawAccumulator(self.sums + other.sums)
+
+    @property
+    def n(self):
+        return int(round(self.sums[0]))
+
+    def fit(self):
+        """当前的拟合结果：n、a、b、se_b、se_lg_a、r2、r（点数不足2时为NaN）"""
+        return {key: value[()] for key, value in _power_law_from_sums(self.sums).items()}
+
+class RelationshipAccumulators:
+    """各系列Kxa、H_OL两个幂律关系的累加器组，关系与fit_series_table一致
+
+    axes为{系列名: 'liquid'/'gas'}，默认DEFAULT_SERIES_AXES；其余系列首次加入时由series_axis判断
+    """
+
+    def __init__(self, axes=None):
+        self.axes = dict(DEFAULT_SERIES_AXES if axes is None else axes)
+        self.accumulators = {}   # (系列, 关系) -> PowerLawAccumulator，按首次出现的顺序
+
+    def _apply(self, series_name, data, sign):
+        if series_name not in self.axes:
+            self.axes[series_name] = series_axis(series_name, data)
+        axis = SERIES_AXES[self.axes[series_name]]
+        kxa = np.atleast_1d(np.asarray(data['体积传质系数_Kxa_kmol_m3_h'], dtype=float))
+        hol = np.atleast_1d(np.asarray(data['传质单元高度_H_OL_m'], dtype=float))
+        positive = (kxa > 0) & (hol > 0)   # 与绘图一致
+        x = np.atleast_1d(np.asarray(data[axis['x_col']], dtype=float))[positive]
+        for label, y in (('Kxa', kxa), ('H_OL', hol)):
+            key = (series_name, f"{label}_{axis['var']}")
+            acc = self.accumulators.setdefault(key, PowerLawAccumulator())
+            acc.add(x, y[positive]) if sign > 0 else acc.remove(x, y[positive])
+
+    def add(self, series_name, data):
+        """加入一个系列的数据；data为明细DataFrame或{列名: 值/数组}"""
+        self._apply(series_name, data, 1)
+        return self
+
+    def remove(self, series_name, data):
+        """删除先前加入的数据"""
+        self._apply(series_name, data, -1)
+        return self
+
+    def merge(self, other):
+        for key, acc in other.accumulators.items():
+            self.accumulators.setdefault(key, PowerLawAccumulator()).merge(acc)
+        self.axes.update(other.axes)
+        return self
+
+    def fit_table(self):
+        """当前拟合表，行列与fit_series_table一致（不含bootstrap区间）"""
+        sums = np.stack([acc.sums for acc in self.accumulators.values()]) if self.accumulators else np.zeros((0, 11))
+        return pd.DataFrame({
+            '关系': [relation for _, relation in self.accumulators],
+            '系列': [series_name for series_name, _ in self.accumulators],
+            **_fit_table_columns(_power_law_from_sums(sums)),
+        })
+
+def _archive_series_axes(conn):
+    """按整个归档判断各系列的横轴（与series_axis相同的相对离散度规则），避免分块各自判断"""
+    stats = pd.read_sql_query(
+        "SELECT series, AVG(L_v) AS ml, AVG(L_v * L_v) AS ml2, AVG(V_g) AS mg, AVG(V_g * V_g) AS mg2 "
+        "FROM results GROUP BY series", conn)
+    axes = {}
+    for row in stats.itertuples(index=False):
+        if row.series in DEFAULT_SERIES_AXES:
+            axes[row.series] = DEFAULT_SERIES_AXES[row.series]
+            continue
+
+        def spread(mean, mean_sq):
+            mean = abs(mean or 0.0)
+            return np.sqrt(max((mean_sq or 0.0) - mean * mean, 0.0)) / mean if mean > 0 else 0.0
+        axes[row.series] = 'gas' if spread(row.mg, row.mg2) > spread(row.ml, row.ml2) else 'liquid'
+    return axes
+
+def accumulate_results_db(db_path=RESULTS_DB_NAME, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """分块扫描结果库中全部明细，累计各系列的幂律关系（整个归档的总体拟合），内存与归档大小无关"""
+    if not os.path.exists(db_path):
+        return RelationshipAccumulators()
+    rename = {col: name for name, col in RESULT_DB_COLUMNS}
+    conn = connect_results_db(db_path)
+    try:
+        accumulators = RelationshipAccumulators(_archive_series_axes(conn))
+        query = "SELECT series, U_L, u, Kxa, H_OL FROM results"
+        for chunk in pd.read_sql_query(query, conn, chunksize=chunk_rows):
+            chunk = chunk.rename(columns=rename)
+            for series_name, part in chunk.groupby('series', sort=False):
+                accumulators.add(series_name, part)
+    finally:
+        conn.close()
+    return accumulators
+
+# ========== 新增：结果文件清单（增量维护） ==========
+
+HISTORY_PAGE_SIZE = 20
+
+def _artifact_kind(name):
+    """判断文件是否属于结果文件，返回类型(xlsx/csv/parquet/feather/png)，否则None"""
+    stem, ext = os.path.splitext(name)
+    ext = ext.lower().lstrip('.')
+    if ext == 'png' and (stem.startswith(('氧解吸实验', '实时采集图表')) or stem.endswith('_分析图表')
+                         or stem == 'oxygen_desorption_analysis'):
+        return 'png'
+    if ext == 'xlsx' and (stem.startswith('氧解吸实验') or '结果' in stem):
+        return 'xlsx'
+    if ext in ('csv', 'parquet', 'feather') and ('结果' in stem or 'analysis' in stem.lower()):
+        return ext
+    return None
+
+def _upsert_artifacts(conn, entries):
+    """entries为(路径, 文件名, 类型, 大小, mtime_ns)列表"""
+    conn.executemany(
+        "INSERT INTO artifacts (path, name, kind, size, mtime_ns) VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT(path) DO UPDATE SET size = excluded.size, mtime_ns = excluded.mtime_ns",
+        entries)
+
+def update_manifest(paths, db_path=RESULTS_DB_NAME):
+    """保存结果后增量登记指定文件（不扫描目录）；写结果文件的地方（含原地覆盖）都应调用"""
+    entries = []
+    for path in filter(None, paths):
+        name = os.path.basename(path)
+        kind = _artifact_kind(name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        if kind:
+            entries.append((os.path.abspath(path), name, kind, st.st_size, st.st_mtime_ns))
+    if not entries:
+        return
+    conn = connect_results_db(db_path)
+    try:
+        with conn:
+            _upsert_artifacts(conn, entries)
+    finally:
+        conn.close()
+
+def sync_manifest(db_path=RESULTS_DB_NAME):
+    """与结果目录对账（兜底程序外的增删改）：scandir一次，逐个比较大小和mtime，只写有变化的条目
+
+    返回是否修改了清单
+    """
+    result_dir = os.path.dirname(os.path.abspath(db_path))
+    conn = connect_results_db(db_path)
+    try:
+        found = {}
+        with os.scandir(result_dir) as it:
+            for entry in it:
+                kind = _artifact_kind(entry.name)
+                if kind and entry.is_file():
+                    st = entry.stat()
+                    found[entry.path] = (entry.path, entry.name, kind, st.st_size, st.st_mtime_ns)
+        known = {path: (size, mtime) for path, size, mtime in
+                 conn.execute("SELECT path, size, mtime_ns FROM artifacts")}
+        removed = [(path,) for path in known if path not in found]
+        changed = [e for path, e in found.items() if known.get(path) != (e[3], e[4])]
+        if not (removed or changed):
+            return False
+        with conn:
+            conn.executemany("DELETE FROM artifacts WHERE path = ?", removed)
+            _upsert_artifacts(conn, changed)
+        return True
+    finally:
+        conn.close()
+
+def query_manifest(kind=None, keyword='', limit=HISTORY_PAGE_SIZE, offset=0, db_path=RESULTS_DB_NAME):
+    """分页查询结果文件清单（按修改时间倒序），可按类型和文件名关键字筛选
+
+    返回(总数, DataFrame)；工作簿行附带对应分析的h、来源和图表文件
+    """
+    where = "WHERE (? IS NULL OR a.kind = ?) AND a.name LIKE ?"
+    params = [kind, kind, f'%{keyword}%']
+    conn = connect_results_db(db_path)
+    try:
+        total = conn.execute(f"SELECT COUNT(*) FROM artifacts a {where}", params).fetchone()[0]
+        page = pd.read_sql_query(
+            f"SELECT a.name, a.kind, a.size, a.mtime_ns, r.h, r.source, r.png "
+            f"FROM artifacts a LEFT JOIN runs r ON r.workbook = a.path {where} "
+            f"ORDER BY a.mtime_ns DESC LIMIT ? OFFSET ?", conn, params=params + [limit, offset])
+    finally:
+        conn.close()
+    return total, page
+
+# ========== 新增：重绘用的工作簿读取（按需解析+旁路缓存） ==========
+
+# 重绘图表实际用到的明细列（流量列供非标准系列判断横轴）
+REPLOT_COLUMNS = [
+    '组号', '液体流量_L_v_L_h', '气体流量_V_g_m3_h', '空塔气速_u_m_s', '喷淋密度_U_L_m3_m2_h', '入口摩尔分数_x1', '出口摩尔分数_x2',
+    '平衡摩尔分数_x_star', '体积传质系数_Kxa_kmol_m3_h', '传质单元高度_H_OL_m',
+]
+REPLOT_SIDECAR_SUFFIX = '.replot.npz'
+# 本工具写出的含明细表的工作簿（交互分析、测试数据、批处理、实时采集）
+REPLOT_WORKBOOK_PATTERNS = ('氧解吸实验数据处理结果_*.xlsx', '氧解吸实验测试数据结果_*.xlsx',
+                            '*_处理结果.xlsx', '实时采集结果_*.xlsx')
+
+def _read_replot_sheets(path):
+    """openpyxl只读模式打开工作簿，只解析各系列明细表的所需列和实验条件中的h
+
+    返回({系列名: DataFrame}, h)，系列按工作表顺序
+    """
+    import re
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        frames = {}
+        for sheet_name in wb.sheetnames:
+            match = re.fullmatch(r'系列(.+)_详细数据', sheet_name)
+            if match is None:
+                continue
+            rows = wb[sheet_name].iter_rows(values_only=True)
+            header = list(next(rows, ()))
+            wanted = [(header.index(col), col) for col in REPLOT_COLUMNS if col in header]
+            data = [[row[i] for i, _ in wanted] for row in rows]
+            df = pd.DataFrame(data, columns=[col for _, col in wanted])
+            for col in df.columns:
+                df[col] = df[col].astype(str) if col == '组号' else pd.to_numeric(df[col], errors='coerce').astype(float)
+            frames[match.group(1)] = df
+        if not frames:
+            raise ValueError(f"{path} 中没有系列明细表(系列*_详细数据)")
+
         h = 0.8
-    
-    print("\n" + "-" * 70)
-    print("系列 I 数据输入")
-    print("格式：液体流量(L/h), 气体流量(m3/h), 温度(°C), C1(mg/L), C2(mg/L)")
-    print("示例：30.0, 20.0, 25.0, 25.5, 10.0")
-    print("注意：C1应在18-28 mg/L范围内，C2 ≥ C_sat（温度对应饱和浓度）")
+        if '实验条件' in wb.sheetnames:
+            for row in wb['实验条件'].iter_rows(min_row=2, values_only=True):
+                if row and row[0] == '填料层高度_h_m':
+                    h = float(row[1])
+                    break
+    finally:
+        wb.close()
+    return frames, h
+
+def _read_replot_sidecar(sidecar, stamp):
+    """读取npz旁路缓存（不允许pickle），工作簿已改变时返回None"""
+    import json
+    with np.load(sidecar, allow_pickle=False) as cached:
+        meta = json.loads(str(cached['meta']))
+        if meta['stamp'] != list(stamp) or meta['columns'] != REPLOT_COLUMNS:
+            return None
+        frames = {}
+        for i, (name, columns) in enumerate(meta['series']):
+            frames[name] = pd.DataFrame({col: cached[f's{i}_c{j}'] for j, col in enumerate(columns)})
+            if '组号' in frames[name]:
+                frames[name]['组号'] = frames[name]['组号'].astype(str)   # 与直接解析的列类型一致
+    return frames, meta['h']
+
+def _write_replot_sidecar(sidecar, stamp, series_dfs, h):
+    """各列存为npz数组，元数据（工作簿标记、系列名、列名、h）存为其中的JSON字符串"""
+    import json
+    meta = {'stamp': list(stamp), 'columns': REPLOT_COLUMNS, 'h': h,
+            'series': [[name, list(df.columns)] for name, df in series_dfs.items()]}
+    arrays = {'meta': np.array(json.dumps(meta, ensure_ascii=False))}
+    for i, df in enumerate(series_dfs.values()):
+        for j, col in enumerate(df.columns):
+            arrays[f's{i}_c{j}'] = df[col].to_numpy(dtype=str if col == '组号' else float)
+    tmp = f'{sidecar}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, sidecar)
+
+def load_workbook_for_replot(path, use_cache=True):
+    """读取重绘所需的数据，返回({系列名: DataFrame}, h)
+
+    解析结果以npz旁路文件保存在工作簿旁，工作簿mtime和大小不变时直接读取，跳过XML解析；
+    缓存无法读取（损坏、格式变化等）时重新解析并重写
+    """
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    sidecar = path + REPLOT_SIDECAR_SUFFIX
+    if use_cache and os.path.exists(sidecar):
+        try:
+            cached = _read_replot_sidecar(sidecar, stamp)
+            if cached is not None:
+                return cached
+        except Exception:
+            pass
+
+    series_dfs, h = _read_replot_sheets(path)
+    if use_cache:
+        try:
+            _write_replot_sidecar(sidecar, stamp, series_dfs, h)
+        except OSError as e:
+            print(f"⚠ 写入缓存文件失败: {e}")
+    return series_dfs, h
+
+# ========== 新增：分析会话（代替菜单间传递结果的全局变量） ==========
+class AnalysisSession:
+    """一次交互会话的状态：当前塔配置和最近一次的分析结果，在各菜单选项之间传递"""
+
+    def __init__(self, tower=None, n_boot=None, n_samples=None):
+        self.tower = DEFAULT_TOWER if tower is None else tower
+        self.n_boot = BOOTSTRAP_RESAMPLES if n_boot is None else n_boot   # 幂律拟合的bootstrap次数
+        self.n_samples = UNCERTAINTY_SAMPLES if n_samples is None else n_samples   # 不确定度抽样次数
+        self.series_dfs = None   # 最近一次分析的{系列名: 明细DataFrame}
+        self.analysis = None     # 最近一次分析的增量计算图，假设分析时才建立
+
+    @property
+    def h(self):
+        """当前填料层高度"""
+        return self.tower.h
+
+    def remember(self, series_dfs, tower):
+        """记住最近一次分析的结果和所用的塔配置"""
+        self.series_dfs = series_dfs
+        self.tower = tower
+        self.analysis = None
+
+    def incremental(self):
+        """最近一次分析的IncrementalAnalysis（首次调用时建立，之后复用其缓存）"""
+        if self.analysis is None and self.series_dfs is not None:
+            self.analysis = IncrementalAnalysis.from_series_dfs(self.series_dfs, self.h, self.tower, self.n_boot,
+                                                                self.n_samples)
+        return self.analysis
+
+# ========== 新增：菜单系统 ==========
+
+def clear_screen():
+    """清屏"""
+    os.system('cls' if sys.platform == 'win32' else 'clear')
+
+def show_menu():
+    """显示主菜单"""
+    print("=" * 70)
+    print("           氧解吸实验数据处理系统")
+    print("=" * 70)
+    print("1. 执行完整数据分析（输入新数据）")
+    print("2. 使用测试数据分析")
+    print("3. 查看历史结果文件")
+    print("4. 重新绘制上次的图表")
+    print("5. 系统设置与帮助")
+    print("6. 假设分析：修改h或修正读数（增量重算）")
+    print("0. 退出程序")
     print("-" * 70)
-    
-    series1_data = []
-    for i in range(5):
+
+# 手动输入时的系列名（超出后用序号）
+SERIES_NAMES = ['I', 'II', 'III', 'IV', 'V', 'VI', 'VII', 'VIII', 'IX', 'X']
+
+def series_names(count):
+    """前count个系列的名称"""
+    return [SERIES_NAMES[i] if i < len(SERIES_NAMES) else str(i + 1) for i in range(count)]
+
+def _input_count(prompt, default):
+    """输入正整数，直接回车或输入错误时取默认值"""
+    text = input(prompt).strip()
+    if not text:
+        return default
+    try:
+        return max(int(text), 1)
+    except ValueError:
+        print(f"输入错误，使用默认值 {default}")
+        return default
+
+def input_series_data(count=5):
+    """逐组手动输入一个系列的数据，每组验证通过后才进入下一组"""
+    series_data = []
+    for i in range(count):
         while True:
             try:
                 input_str = input(f"第 {i+1} 组: ")
@@ -752,7 +2734,7 @@ def option1_full_analysis():
                     is_valid, error_msg = validate_data_input(T, C1, C2)
                     
                     if is_valid:
-                        series1_data.append(values)
+                        series_data.append(values)
                         print(f"✓ 第 {i+1} 组数据验证通过")
                         break
                     else:
@@ -763,106 +2745,136 @@ def option1_full_analysis():
                     print("错误：需要5个数值")
             except ValueError:
                 print("错误：请输入数字")
+    return series_data
+
+def option1_full_analysis(session):
+    """选项1：完整数据分析"""
+    clear_screen()
+    print("=" * 70)
+    print("氧解吸实验数据处理系统（含数据验证）")
+    print("=" * 70)
     
-    print("\n" + "-" * 70)
-    print("系列 II 数据输入")
-    print("-" * 70)
+    # 获取填料层高度
+    try:
+        h = float(input("请输入填料层高度 h (m): "))
+        if not (np.isfinite(h) and h > 0):
+            raise ValueError(h)
+    except:
+        print(f"输入错误，使用默认值 h = {session.h:g} m")
+        h = session.h
     
-    series2_data = []
-    for i in range(5):
-        while True:
-            try:
-                input_str = input(f"第 {i+1} 组: ")
-                values = [float(x.strip()) for x in input_str.split(',')]
-                if len(values) == 5:
-                    L_v, V_g, T, C1, C2 = values
-                    
-                    # ========== 数据验证 ==========
-                    is_valid, error_msg = validate_data_input(T, C1, C2)
-                    
-                    if is_valid:
-                        series2_data.append(values)
-                        print(f"✓ 第 {i+1} 组数据验证通过")
-                        break
-                    else:
-                        print(f"\n✗ 数据验证失败:")
-                        print(error_msg)
-                        print("请重新输入数据")
-                else:
-                    print("错误：需要5个数值")
-            except ValueError:
-                print("错误：请输入数字")
+    # 塔内径默认沿用本次会话的塔配置
+    tower = session.tower.replace(h=h)
+    D_text = input(f"请输入塔内径 D (m，直接回车为 {tower.D:g}): ").strip()
+    if D_text:
+        try:
+            tower = tower.replace(D=float(D_text))
+        except ValueError:
+            print(f"输入错误，使用 D = {tower.D:g} m")
+    
+    # 可直接从数据文件批量读取（任意多个系列），否则逐组手动输入
+    series_dfs = None
+    source = '手动输入'
+    data_path = input("\n数据文件路径（CSV/XLSX/Parquet，直接回车则手动输入）: ").strip().strip('"')
+    if data_path:
+        try:
+            df, codes = load_run_table(data_path)
+            series_dfs = process_long_table(valid_long_table(df, codes, data_path), h, tower=tower)
+            print("✓ 已读取 " + "、".join(f"系列{name} {len(part)} 组" for name, part in series_dfs.items())
+                  + " 有效数据")
+            source = data_path
+        except Exception as e:
+            print(f"✗ 读取数据文件失败: {e}")
+            print("改为手动输入")
+            series_dfs = None
+    
+    if series_dfs is None:
+        series_count = _input_count("系列数（直接回车为2，即系列I、II）: ", 2)
+        group_count = _input_count("每个系列的组数（直接回车为5）: ", 5)
+        series_data = {}
+        for i, name in enumerate(series_names(series_count)):
+            print("\n" + "-" * 70)
+            print(f"系列 {name} 数据输入")
+            if i == 0:
+                print("格式：液体流量(L/h), 气体流量(m3/h), 温度(°C), C1(mg/L), C2(mg/L)")
+                print("示例：30.0, 20.0, 25.0, 25.5, 10.0")
+                print("注意：C1应在18-28 mg/L范围内，C2 ≥ C_sat（温度对应饱和浓度）")
+            print("-" * 70)
+            series_data[name] = input_series_data(group_count)
     
     # 处理数据
     print("\n" + "=" * 70)
     print("正在处理数据...")
     print("=" * 70)
     
-    series1_df = process_series_data('I', series1_data, h)
-    series2_df = process_series_data('II', series2_data, h)
+    if series_dfs is None:
+        series_dfs = {name: process_series_data(name, data, h, tower) for name, data in series_data.items()}
     
     # 打印结果
-    print_processed_tables(series1_df, series2_df, h)
+    print_series_tables(series_dfs, h, tower)
     
     # 保存到Excel
     import datetime
     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
     excel_filename = f'氧解吸实验数据处理结果_{timestamp}.xlsx'
-    success = save_to_excel(series1_df, series2_df, excel_filename, h)
+    success = save_series_to_excel(series_dfs, excel_filename, h, tower=tower, n_boot=session.n_boot,
+                                   n_samples=session.n_samples)
     
     if success:
         print(f"\n✓ 数据已成功导出到Excel文件: {excel_filename}")
         print(f"文件位置: {os.path.abspath(excel_filename)}")
         
-        # 保存当前数据到全局变量，以便后续使用
-        global last_series1_df, last_series2_df, last_h
-        last_series1_df = series1_df
-        last_series2_df = series2_df
-        last_h = h
+        # 记入会话，以便后续使用
+        session.remember(series_dfs, tower)
     else:
         print("\n✗ Excel文件导出失败")
     
-    # 绘制图表
+    # 绘制图表（每次分析一个PNG，与同一时间戳的工作簿对应）
     print("\n" + "=" * 70)
     print("正在生成图表...")
     print("=" * 70)
     
-    plot_figures(series1_df, series2_df, h)
+    png_filename = plot_series(series_dfs, h, png_filename=f'氧解吸实验分析图表_{timestamp}.png',
+                               n_boot=session.n_boot)
+    if success:
+        record_series_run(series_dfs, h, workbook=excel_filename, png=png_filename, source=source, tower=tower)
     
     input("\n数据分析完成！按回车键返回菜单...")
 
-def option2_test_data():
-    """选项2：使用测试数据分析"""
+# 测试数据（已调整为满足验证条件），选项2和实时采集模拟器共用
+TEST_SERIES1_DATA = [
+    [15.0, 20.0, 25.0, 20.5, 9.0],   # C1=20.5 (18-28), C2=9.0 > C_sat=8.26
+    [30.0, 20.0, 25.0, 22.0, 9.5],   # C1=22.0, C2=9.5 > C_sat
+    [45.0, 20.0, 25.0, 24.0, 10.0],  # C1=24.0, C2=10.0 > C_sat
+    [60.0, 20.0, 25.0, 26.0, 10.5],  # C1=26.0, C2=10.5 > C_sat
+    [75.0, 20.0, 25.0, 28.0, 11.0]   # C1=28.0, C2=11.0 > C_sat
+]
+
+TEST_SERIES2_DATA = [
+    [45.0, 10.0, 25.0, 22.0, 9.0],   # C1=22.0, C2=9.0 > C_sat
+    [45.0, 15.0, 25.0, 22.0, 9.5],   # C1=22.0, C2=9.5 > C_sat
+    [45.0, 20.0, 25.0, 22.0, 10.0],  # C1=22.0, C2=10.0 > C_sat
+    [45.0, 25.0, 25.0, 22.0, 10.5],  # C1=22.0, C2=10.5 > C_sat
+    [45.0, 30.0, 25.0, 22.0, 11.0]   # C1=22.0, C2=11.0 > C_sat
+]
+
+def option2_test_data(session):
+    """选项2：使用测试数据分析（标准塔）"""
     clear_screen()
     print("使用测试数据运行程序...")
     
     # 定义h变量
     h = 0.8
     
-    # 测试数据（已调整为满足验证条件）
-    series1_test = [
-        [15.0, 20.0, 25.0, 20.5, 9.0],   # C1=20.5 (18-28), C2=9.0 > C_sat=8.26
-        [30.0, 20.0, 25.0, 22.0, 9.5],   # C1=22.0, C2=9.5 > C_sat
-        [45.0, 20.0, 25.0, 24.0, 10.0],  # C1=24.0, C2=10.0 > C_sat
-        [60.0, 20.0, 25.0, 26.0, 10.5],  # C1=26.0, C2=10.5 > C_sat
-        [75.0, 20.0, 25.0, 28.0, 11.0]   # C1=28.0, C2=11.0 > C_sat
-    ]
+    series1_test = TEST_SERIES1_DATA
+    series2_test = TEST_SERIES2_DATA
     
-    series2_test = [
-        [45.0, 10.0, 25.0, 22.0, 9.0],   # C1=22.0, C2=9.0 > C_sat
-        [45.0, 15.0, 25.0, 22.0, 9.5],   # C1=22.0, C2=9.5 > C_sat
-        [45.0, 20.0, 25.0, 22.0, 10.0],  # C1=22.0, C2=10.0 > C_sat
-        [45.0, 25.0, 25.0, 22.0, 10.5],  # C1=22.0, C2=10.5 > C_sat
-        [45.0, 30.0, 25.0, 22.0, 11.0]   # C1=22.0, C2=11.0 > C_sat
-    ]
-    
-    # 验证测试数据
+    # 验证测试数据（整列验证，只为失败的行生成说明）
     print("\n验证测试数据...")
-    for i, data in enumerate(series1_test + series2_test, 1):
-        _, _, T, C1, C2 = data
-        is_valid, error_msg = validate_data_input(T, C1, C2)
-        if not is_valid:
-            print(f"测试数据{i}验证失败: {error_msg}")
+    L_v, V_g, T, C1, C2 = np.asarray(series1_test + series2_test, dtype=float).T
+    codes = validate_data_array(T, C1, C2, L_v=L_v, V_g=V_g)
+    for row, error_msg in iter_error_messages(codes, L_v, V_g, T, C1, C2):
+        print(f"测试数据{row + 1}验证失败: {error_msg}")
     
     series1_df = process_series_data('I', series1_test, h)
     series2_df = process_series_data('II', series2_test, h)
@@ -874,70 +2886,131 @@ def option2_test_data():
     import datetime
     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
     test_filename = f'氧解吸实验测试数据结果_{timestamp}.xlsx'
-    success = save_to_excel(series1_df, series2_df, test_filename, h)
+    success = save_to_excel(series1_df, series2_df, test_filename, h, n_boot=session.n_boot,
+                            n_samples=session.n_samples)
     
     if success:
         print(f"\n✓ 测试数据已成功导出到: {test_filename}")
         print(f"文件位置: {os.path.abspath(test_filename)}")
         
-        # 保存到全局变量
-        global last_series1_df, last_series2_df, last_h
-        last_series1_df = series1_df
-        last_series2_df = series2_df
-        last_h = h
+        # 记入会话
+        session.remember({'I': series1_df, 'II': series2_df}, DEFAULT_TOWER.replace(h=h))
     
-    # 绘制图表
-    plot_figures(series1_df, series2_df, h)
+    # 绘制图表，记录实际保存的PNG
+    png_filename = plot_figures(series1_df, series2_df, h, png_filename=f'氧解吸实验测试数据图表_{timestamp}.png',
+                                n_boot=session.n_boot)
+    if success:
+        record_run(series1_df, series2_df, h, workbook=test_filename, png=png_filename, source='测试数据')
     
     input("\n测试数据分析完成！按回车键返回菜单...")
 
 def option3_view_history():
-    """选项3：查看历史结果"""
-    clear_screen()
-    print("历史分析结果文件")
-    print("=" * 70)
+    """选项3：查看历史结果（基于文件清单，支持分页和筛选；r查看结果库中的分析记录）"""
+    import datetime
+    page, kind, keyword = 0, None, ''
     
-    try:
-        import glob
-        # 查找所有结果文件
-        excel_files = glob.glob("氧解吸实验数据*.xlsx") + glob.glob("氧解吸实验测试*.xlsx")
-        csv_files = glob.glob("*.csv")
+    while True:
+        clear_screen()
+        print("历史分析结果文件")
+        print("=" * 70)
         
-        if not excel_files and not csv_files:
-            print("暂无历史文件")
+        try:
+            sync_manifest()
+            total, rows = query_manifest(kind, keyword, HISTORY_PAGE_SIZE, page * HISTORY_PAGE_SIZE)
+        except Exception as e:
+            print(f"读取历史文件出错: {e}")
+            input("\n按回车键返回菜单...")
+            return
+        
+        if total == 0:
+            print("暂无历史文件" if not (kind or keyword) else "没有符合筛选条件的文件")
         else:
-            if excel_files:
-                print("Excel文件:")
-                for i, f in enumerate(sorted(excel_files, reverse=True), 1):
-                    size = os.path.getsize(f) / 1024
-                    import datetime
-                    mtime = datetime.datetime.fromtimestamp(os.path.getmtime(f))
-                    print(f"{i}. {f} ({size:.1f}KB, {mtime.strftime('%Y-%m-%d %H:%M')})")
-            
-            if csv_files:
-                print("\nCSV文件:")
-                for i, f in enumerate(sorted(csv_files, reverse=True), 1):
-                    if "结果" in f or "analysis" in f.lower():
-                        size = os.path.getsize(f) / 1024
-                        import datetime
-                        mtime = datetime.datetime.fromtimestamp(os.path.getmtime(f))
-                        print(f"{i}. {f} ({size:.1f}KB, {mtime.strftime('%Y-%m-%d %H:%M')})")
-            
-            print(f"\nPNG图表文件:")
-            png_files = glob.glob("*.png")
-            if png_files:
-                for f in png_files:
-                    if os.path.exists(f):
-                        print(f"  - {f}")
-            else:
-                print("  暂无PNG图表文件")
-    
-    except Exception as e:
-        print(f"读取历史文件出错: {e}")
+            for i, row in enumerate(rows.itertuples(index=False), page * HISTORY_PAGE_SIZE + 1):
+                mtime = datetime.datetime.fromtimestamp(row.mtime_ns / 1e9)
+                line = f"{i}. [{row.kind}] {row.name} ({row.size / 1024:.1f}KB, {mtime.strftime('%Y-%m-%d %H:%M')})"
+                if pd.notna(row.h):
+                    line += f"  h={row.h:.3f} m"
+                if isinstance(row.png, str):
+                    line += f"  图表: {os.path.basename(row.png)}"
+                print(line)
+        
+        pages = max(1, -(-total // HISTORY_PAGE_SIZE))
+        filters = '，'.join(x for x in (f"类型={kind}" if kind else '', f"关键字={keyword}" if keyword else '') if x)
+        print("-" * 70)
+        print(f"第 {page + 1}/{pages} 页，共 {total} 个文件" + (f"（筛选: {filters}）" if filters else ''))
+        cmd = input("n 下一页 | p 上一页 | f 关键字 | t 类型(xlsx/csv/png) | c 清除筛选 | r 分析记录 | 回车返回: ").strip()
+        
+        if cmd == 'n' and page + 1 < pages:
+            page += 1
+        elif cmd == 'p' and page > 0:
+            page -= 1
+        elif cmd == 'f':
+            keyword, page = input("文件名关键字: ").strip(), 0
+        elif cmd == 't':
+            kind, page = input("文件类型: ").strip().lower() or None, 0
+        elif cmd == 'c':
+            page, kind, keyword = 0, None, ''
+        elif cmd == 'r':
+            view_run_history()
+        elif cmd == '':
+            return
+
+def view_run_history():
+    """结果库中的分析记录：按时间倒序分页，可按系列和h筛选"""
+    page, series, h = 0, None, None
     
-    input("\n按回车键返回菜单...")
+    while True:
+        clear_screen()
+        print("历史分析记录（结果库）")
+        print("=" * 70)
+        
+        try:
+            # 多取一条，判断是否还有下一页
+            runs = list_runs(HISTORY_PAGE_SIZE + 1, page * HISTORY_PAGE_SIZE, series, h)
+        except Exception as e:
+            print(f"读取结果库出错: {e}")
+            input("\n按回车键返回...")
+            return
+        has_next = len(runs) > HISTORY_PAGE_SIZE
+        
+        if runs.empty:
+            print("暂无分析记录" if series is None and h is None else "没有符合筛选条件的记录")
+        for i, row in enumerate(runs.head(HISTORY_PAGE_SIZE).itertuples(index=False), page * HISTORY_PAGE_SIZE + 1):
+            line = f"{i}. {row.created_at}  h={row.h:.3f} m"
+            if pd.notna(row.D):
+                line += f"  D={row.D:g} m"
+            line += f"  {row.n_rows}组"
+            if isinstance(row.source, str) and row.source:
+                line += f"  来源: {os.path.basename(row.source)}"
+            if isinstance(row.workbook, str):
+                line += f"  工作簿: {os.path.basename(row.workbook)}"
+            if isinstance(row.png, str):
+                line += f"  图表: {os.path.basename(row.png)}"
+            print(line)
+        
+        filters = '，'.join(x for x in (f"系列={series}" if series is not None else '',
+                                       f"h={h:g} m" if h is not None else '') if x)
+        print("-" * 70)
+        print(f"第 {page + 1} 页" + (f"（筛选: {filters}）" if filters else ''))
+        cmd = input("n 下一页 | p 上一页 | s 系列 | h 填料层高度 | c 清除筛选 | 回车返回: ").strip()
+        
+        if cmd == 'n' and has_next:
+            page += 1
+        elif cmd == 'p' and page > 0:
+            page -= 1
+        elif cmd == 's':
+            series, page = input("系列名: ").strip() or None, 0
+        elif cmd == 'h':
+            try:
+                h, page = float(input("填料层高度 h (m): ")), 0
+            except ValueError:
+                print("输入错误")
+        elif cmd == 'c':
+            page, series, h = 0, None, None
+        elif cmd == '':
+            return
 
-def option4_replot_charts():
+def option4_replot_charts(session):
     """选项4：重新绘制上次的图表"""
     clear_screen()
     print("重新绘制图表")
@@ -945,43 +3018,33 @@ def option4_replot_charts():
     
     try:
         # 检查是否有上次的数据
-        if 'last_series1_df' in globals() and 'last_series2_df' in globals():
+        if session.series_dfs is not None:
             print("找到上次的数据，正在重新绘制图表...")
-            plot_figures(last_series1_df, last_series2_df, last_h)
+            update_manifest([plot_series(session.series_dfs, session.h, n_boot=session.n_boot)])
             print("\n图表重新绘制完成！")
         else:
             print("未找到上次的数据记录")
             print("请先执行选项1或2进行数据分析")
             
-            # 尝试查找最近的数据文件
+            # 优先从结果库取最近一次分析（索引查询）
+            run, series_dfs = load_run()
+            # 兼容结果库建立之前的工作簿：查找最近的数据文件
             import glob
-            excel_files = glob.glob("氧解吸实验数据*.xlsx")
-            if excel_files:
+            excel_files = [] if run else [f for pattern in REPLOT_WORKBOOK_PATTERNS for f in glob.glob(pattern)]
+            if run and series_dfs:
+                print(f"\n找到最近一次分析记录: {run['created_at']} (h = {run['h']:.3f} m)")
+                choice = input("是否加载此记录并绘制图表？(y/n): ")
+                if choice.lower() == 'y':
+                    update_manifest([plot_series(series_dfs, run['h'], n_boot=session.n_boot)])
+            elif excel_files:
                 latest_file = max(excel_files, key=os.path.getmtime)
                 print(f"\n找到最近的数据文件: {latest_file}")
                 choice = input("是否加载此文件并绘制图表？(y/n): ")
                 if choice.lower() == 'y':
                     try:
-                        import pandas as pd
-                        # 读取Excel文件
-                        excel_data = pd.read_excel(latest_file, sheet_name=None)
-                        
-                        if '系列I_详细数据' in excel_data and '系列II_详细数据' in excel_data:
-                            series1_df = excel_data['系列I_详细数据']
-                            series2_df = excel_data['系列II_详细数据']
-                            
-                            # 从实验条件sheet获取h值
-                            if '实验条件' in excel_data:
-                                conditions = excel_data['实验条件']
-                                h_row = conditions[conditions['参数'] == '填料层高度_h_m']
-                                if not h_row.empty:
-                                    h = float(h_row.iloc[0]['数值'])
-                                else:
-                                    h = 0.8
-                            else:
-                                h = 0.8
-                            
-                            plot_figures(series1_df, series2_df, h)
+                        # 只解析各系列明细表和h，重复加载时直接读旁路缓存
+                        series_dfs, h = load_workbook_for_replot(latest_file)
+                        update_manifest([plot_series(series_dfs, h, n_boot=session.n_boot)])
                     except Exception as e:
                         print(f"加载文件失败: {e}")
     
@@ -1018,51 +3081,113 @@ def option5_settings_help():
     
     print("\n🛠️ 依赖库检查:")
     libraries = ['pandas', 'numpy', 'matplotlib', 'openpyxl']
+    from importlib.util import find_spec
     for lib in libraries:
-        try:
-            __import__(lib)
+        if find_spec(lib) is not None:
             print(f"✓ {lib}")
-        except ImportError:
+        else:
             print(f"✗ {lib} 未安装")
     
     input("\n按回车键返回菜单...")
 
-def main_menu():
+WHAT_IF_EXCEL = '氧解吸实验假设分析结果.xlsx'
+WHAT_IF_PNG = '氧解吸实验假设分析图表.png'
+
+def option6_what_if(session):
+    """选项6：假设分析——修改h或修正某组读数，只重算受影响的列、拟合、表和图表面板"""
+    clear_screen()
+    print("假设分析（增量重算）")
+    print("=" * 70)
+    
+    analysis = session.incremental()
+    if analysis is None:
+        print("未找到上次的数据记录")
+        print("请先执行选项1或2进行数据分析")
+        input("\n按回车键返回菜单...")
+        return
+    
+    while True:
+        print(f"\n当前 h = {analysis.h:g} m，D = {analysis.tower.D:g} m，系列: {'、'.join(analysis.names)}")
+        cmd = input("h 修改填料层高度 | r 修正一组读数 | s 保存结果和图表 | 回车返回: ").strip()
+        analysis.graph.clear_log()
+        t0 = time.perf_counter()
+        
+        if cmd == 'h':
+            try:
+                h = float(input("新的填料层高度 h (m): "))
+                if not (np.isfinite(h) and h > 0):
+                    raise ValueError(h)
+                analysis.set_h(h)
+            except ValueError:
+                print("输入错误，h须为正数")
+                continue
+        elif cmd == 'r':
+            name = input("系列名: ").strip()
+            if name not in analysis.names:
+                print(f"没有系列 {name}")
+                continue
+            index = _input_count("组序号（从1开始，直接回车为1）: ", 1) - 1
+            try:
+                values = [float(v) for v in input("液体流量, 气体流量, 温度, C1, C2: ").replace('，', ',').split(',')]
+                if len(values) != 5:
+                    raise ValueError("需要5个数值")
+                analysis.set_reading(name, index, values)
+            except (ValueError, IndexError) as e:
+                print(f"输入错误: {e}")
+                continue
+            L_v, V_g, T, C1, C2 = values
+            code = int(validate_data_array(T, C1, C2, L_v=L_v, V_g=V_g))
+            if code != ERR_OK:
+                print(f"⚠ {format_error_code(code, T, C1, C2, L_v, V_g)}")
+        elif cmd == 's':
+            rewritten = analysis.export(WHAT_IF_EXCEL)
+            print(f"✓ 重写了 {len(rewritten)} 个表: {WHAT_IF_EXCEL}" if rewritten else "结果未变化，无需重新导出")
+            analysis.render(WHAT_IF_PNG)
+            print(f"✓ 图表: {WHAT_IF_PNG}")
+            update_manifest([WHAT_IF_EXCEL, WHAT_IF_PNG])   # 原地覆盖不改变目录，须显式登记
+            continue
+        elif cmd == '':
+            # 塔配置带上本次修改的h，会话的默认h与明细数据保持一致
+            session.series_dfs, session.tower = analysis.series_dfs(), analysis.tower.replace(h=analysis.h)
+            return
+        else:
+            continue
+        
+        series_dfs = analysis.series_dfs()
+        analysis.fits()
+        elapsed = (time.perf_counter() - t0) * 1000
+        print_series_tables(series_dfs, analysis.h, analysis.tower)
+        print(f"重算 {len(analysis.graph.recomputed)} 个节点，用时 {elapsed:.1f} ms")
+
+def main_menu(session=None):
     """主菜单循环"""
-    # 初始化全局变量
-    global last_series1_df, last_series2_df, last_h
-    last_series1_df = None
-    last_series2_df = None
-    last_h = 0.8
+    session = AnalysisSession() if session is None else session
     
-    # 检查必要的库
-    try:
-        import openpyxl
-        print("✓ openpyxl 库已安装")
-    except ImportError:
-        print("✗ openpyxl 库未安装，正在安装...")
-        import subprocess
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "openpyxl"])
-        print("✓ openpyxl 库安装完成")
-        import openpyxl
+    # 检查必要的库（只查找不导入，也不自动联网安装）
+    from importlib.util import find_spec
+    if find_spec('openpyxl') is None:
+        print("✗ openpyxl 库未安装，Excel导出将不可用")
+        print("  请手动执行: pip install openpyxl")
     
     while True:
         clear_screen()
         show_menu()
         
         try:
-            choice = input("\n请选择操作 (0-5): ").strip()
+            choice = input("\n请选择操作 (0-6): ").strip()
             
             if choice == '1':
-                option1_full_analysis()
+                option1_full_analysis(session)
             elif choice == '2':
-                option2_test_data()
+                option2_test_data(session)
             elif choice == '3':
                 option3_view_history()
             elif choice == '4':
-                option4_replot_charts()
+                option4_replot_charts(session)
             elif choice == '5':
                 option5_settings_help()
+            elif choice == '6':
+                option6_what_if(session)
             elif choice == '0':
                 print("\n感谢使用氧解吸实验数据处理系统，再见！")
                 import time
@@ -1082,8 +3207,1026 @@ def main_menu():
             traceback.print_exc()
             input("按回车键继续...")
 
+# ========== 新增：实时数据采集（asyncio） ==========
+
+LIVE_DEFAULT_SOURCE = 'tcp://127.0.0.1:9750'
+LIVE_BUFFER_SIZE = 1000        # 读数缓冲上限：TCP/管道满时暂停读取（反压），UDP满时丢弃最旧读数
+LIVE_AVERAGE_WINDOW = 10       # 每个工况按最近N条读数取平均（读数约每秒一条）
+LIVE_READING_FIELDS = ('L_v', 'V_g', 'T', 'C1', 'C2')
+
+def parse_reading(line):
+    """解析一行传感器读数，无法解析时返回None
+
+    格式为JSON对象或 key=value 列表（空格/逗号分隔），例如
+    ts=1718000000.5 series=I point=3 L_v=45 V_g=20 T=25.1 C1=22.0 C2=9.4
+    各字段可分条发送（如溶氧仪只发C1、C2），缺少的字段沿用该工况已有读数
+    """
+    text = line.decode('utf-8', 'replace') if isinstance(line, bytes) else line
+    text = text.strip()
+    if not text:
+        return None
+    try:
+        if text.startswith('{'):
+            import json
+            raw = json.loads(text)
+        else:
+            raw = dict(token.split('=', 1) for token in text.replace(',', ' ').split())
+        reading = {
+            'ts': float(raw.get('ts', time.time())),
+            'series': str(raw.get('series', 'I')).strip(),
+            'point': int(raw.get('point', 1)),
+        }
+        for field in LIVE_READING_FIELDS:
+            if raw.get(field) not in (None, ''):
+                reading[field] = float(raw[field])
+    except (ValueError, TypeError, AttributeError):
+        return None
+    return reading if reading['series'] else None
+
+def _print_live_update(result):
+    """默认的实时结果输出：每个工况更新一行"""
+    flag = '' if result['code'] == ERR_OK else '  ⚠ ' + format_error_code(result['code'])
+    print(f"[{result['series']}-{result['point']}] Kxa = {result['Kxa']:8.2f} kmol/(m³·h) | "
+          f"H_OL = {result['H_OL']:.4f} m | 读数 {result['readings']} 条 | "
+          f"延迟 {result['latency'] * 1000:.0f} ms{flag}")
+
+class _ReadingDatagramProtocol:
+    """UDP读数接收：每个数据报可含多行读数"""
+
+    def __init__(self, acquisition):
+        self.acquisition = acquisition
+
+    def connection_made(self, transport):
+        pass
+
+    def datagram_received(self, data, addr):
+        for line in data.splitlines():
+            reading = parse_reading(line)
+            if reading is not None:
+                self.acquisition.offer(reading)
+
+    def error_received(self, exc):
+        print(f"UDP接收错误: {exc}")
+
+    def connection_lost(self, exc):
+        pass
+
+class LiveAcquisition:
+    """实时采集：读数进入有界缓冲，由单个消费者逐条更新各工况的Kxa、H_OL
+
+    工况以(系列, 组号)区分，输入取最近LIVE_AVERAGE_WINDOW条读数的平均值。
+    每条读数到达后立即重新计算该工况并回调on_update。
+    """
+
+    def __init__(self, h=0.8, buffer_size=LIVE_BUFFER_SIZE, on_update=None, tower=None):
+        self.h = h
+        self.tower = DEFAULT_TOWER if tower is None else tower
+        self.buffer_size = buffer_size
+        self.on_update = on_update or _print_live_update
+        self.points = {}     # (系列, 组号) -> {字段: 最近读数}
+        self.results = {}    # (系列, 组号) -> 最新计算结果
+        self.fits = RelationshipAccumulators()   # 有效工况的幂律拟合，随读数增量更新
+        self.dropped = 0     # UDP缓冲满时丢弃的读数
+        self.queue = None
+        self._stop = None
+
+    def update(self, reading):
+        """用一条读数更新所属工况；输入齐全时计算并返回结果，否则返回None"""
+        from collections import deque
+        key = (reading['series'], reading['point'])
+        window = self.points.setdefault(key, {f: deque(maxlen=LIVE_AVERAGE_WINDOW) for f in LIVE_READING_FIELDS})
+        for field in LIVE_READING_FIELDS:
+            if field in reading:
+                window[field].append(reading[field])
+        if not all(window.values()):
+            return None
+
+        L_v, V_g, T, C1, C2 = (sum(window[f]) / len(window[f]) for f in LIVE_READING_FIELDS)
+        res = calculate_kxa_h_batch(L_v, V_g, T, C1, C2, self.h, self.tower)
+        result = {
+            'series': key[0], 'point': key[1],
+            'L_v': L_v, 'V_g': V_g, 'T': T, 'C1': C1, 'C2': C2,
+            'Kxa': float(res['Kxa']), 'H_OL': float(res['H_OL']),
+            'U_L': float(res['U_L']), 'u': float(res['u']),
+            'code': int(validate_data_array(T, C1, C2, L_v=L_v, V_g=V_g)),
+            'readings': max(len(v) for v in window.values()),
+            'latency': time.time() - reading['ts'],
+        }
+        # 拟合中替换该工况的旧值；非标准系列在横轴确定之前暂不计入拟合
+        previous = self.results.get(key)
+        fitted = key[0] in self.fits.axes
+        if fitted and previous is not None and previous['code'] == ERR_OK:
+            self.fits.remove(key[0], self._fit_point(previous))
+        if fitted and result['code'] == ERR_OK:
+            self.fits.add(key[0], self._fit_point(result))
+        self.results[key] = result
+        if not fitted:
+            self._resolve_axis(key[0])
+        self.on_update(result)
+        return result
+
+    def _resolve_axis(self, series):
+        """非标准系列有两个有效工况后按series_axis判断横轴，并把已有工况补入拟合"""
+        valid = [r for key, r in self.results.items() if key[0] == series and r['code'] == ERR_OK]
+        if len(valid) < 2:
+            return
+        rows = [[r['L_v'], r['V_g'], r['T'], r['C1'], r['C2']] for r in valid]
+        self.fits.axes[series] = series_axis(series, process_series_data(series, rows, self.h, self.tower))
+        for r in valid:
+            self.fits.add(series, self._fit_point(r))
+
+    @staticmethod
+    def _fit_point(result):
+        return {
+            '喷淋密度_U_L_m3_m2_h': result['U_L'],
+            '空塔气速_u_m_s': result['u'],
+            '体积传质系数_Kxa_kmol_m3_h': result['Kxa'],
+            '传质单元高度_H_OL_m': result['H_OL'],
+        }
+
+    def offer(self, reading):
+        """无流控的来源（UDP）放入读数：缓冲满时丢弃最旧的一条，保证结果时效"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.queue.task_done()
+            self.dropped += 1
+        self.queue.put_nowait(reading)
+
+    async def _feed(self, reader):
+        """逐行读取流；缓冲满时await阻塞、暂停读取，由TCP/管道的流控把压力传回发送端"""
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            reading = parse_reading(line)
+            if reading is not None:
+                await self.queue.put(reading)
+
+    async def _consume(self):
+        while True:
+            reading = await self.queue.get()
+            try:
+                self.update(reading)
+            except Exception as e:
+                print(f"读数处理出错: {e}")
+            finally:
+                self.queue.task_done()
+
+    def stop(self):
+        """请求结束采集（可在回调或其他协程中调用）"""
+        if self._stop is not None:
+            self._stop.set()
+
+    async def _wait(self, duration):
+        try:
+            await asyncio.wait_for(self._stop.wait(), timeout=duration)
+        except asyncio.TimeoutError:
+            pass
+
+    async def run(self, source=LIVE_DEFAULT_SOURCE, duration=None, ready=None):
+        """从source采集直到duration秒后或stop()；source为tcp://主机:端口、udp://主机:端口或pipe://路径
+
+        ready为asyncio.Event时，开始监听后将其置位（供模拟器等待）
+        """
+        scheme, _, address = check_live_source(source)   # 先检查，不支持时尚未启动任何任务
+        self.queue = asyncio.Queue(maxsize=self.buffer_size)
+        self._stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        consumer = asyncio.create_task(self._consume())
+        closers = []
+        try:
+            if scheme in ('tcp', 'udp'):
+                host, _, port = address.rpartition(':')
+                if scheme == 'tcp':
+                    async def handle(reader, writer):
+                        try:
+                            await self._feed(reader)
+                        finally:
+                            writer.close()
+                    server = await asyncio.start_server(handle, host or '127.0.0.1', int(port))
+                    closers.append(server.close)
+                else:
+                    transport, _ = await loop.create_datagram_endpoint(
+                        lambda: _ReadingDatagramProtocol(self), local_addr=(host or '127.0.0.1', int(port)))
+                    closers.append(transport.close)
+            elif scheme == 'pipe':
+                if not os.path.exists(address):
+                    os.mkfifo(address)
+                # 以读写方式打开：没有写入端时不会读到EOF，写入端可反复连接
+                pipe = os.fdopen(os.open(address, os.O_RDWR | os.O_NONBLOCK), 'rb', buffering=0)
+                reader = asyncio.StreamReader()
+                transport, _ = await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), pipe)
+                closers.append(transport.close)
+                closers.append(asyncio.create_task(self._feed(reader)).cancel)
+
+            if ready is not None:
+                ready.set()
+            await self._wait(duration)
+            await self.queue.join()   # 处理完缓冲中剩余的读数
+        finally:
+            for close in closers:
+                close()
+            consumer.cancel()
+        return self.results
+
+    def series_frames(self, names=()):
+        """把各工况的平均输入整理为{系列名: 结果表}，系列按首次出现的顺序；未通过验证的工况不计入
+
+        names中的系列即使尚无读数也给出空表（如仪表盘固定显示的系列I、II）
+        """
+        frames = {}
+        for series in dict.fromkeys([*names, *(key[0] for key in self.results)]):
+            rows = [[r['L_v'], r['V_g'], r['T'], r['C1'], r['C2']]
+                    for key, r in sorted(self.results.items()) if key[0] == series and r['code'] == ERR_OK]
+            frames[series] = process_series_data(series, rows, self.h, self.tower)
+        return frames
+
+    def dashboard_view(self):
+        """仪表盘所需的(系列I, 系列II, 拟合表)；仪表盘只显示标准的两个系列"""
+        frames = self.series_frames(('I', 'II'))
+        fits = self.fits.fit_table()
+        return frames['I'], frames['II'], fits[fits['系列'].isin(['I', 'II'])].set_index('关系')
+
+async def simulate_sensor_stream(source=LIVE_DEFAULT_SOURCE, interval=1.0, repeats=5, noise=0.02, seed=None):
+    """传感器模拟器：按测试数据逐工况发送带噪声的读数（流量、温度与溶氧分条发送）"""
+    rng = np.random.default_rng(seed)
+    scheme, _, address = source.partition('://')
+    loop = asyncio.get_running_loop()
+    if scheme == 'tcp':
+        host, _, port = address.rpartition(':')
+        _, writer = await asyncio.open_connection(host or '127.0.0.1', int(port))
+
+        async def send(data):
+            writer.write(data)
+            await writer.drain()   # 接收端缓冲满时在此等待
+        close = writer.close
+    elif scheme == 'udp':
+        host, _, port = address.rpartition(':')
+        transport, _ = await loop.create_datagram_endpoint(asyncio.DatagramProtocol,
+                                                           remote_addr=(host or '127.0.0.1', int(port)))
+
+        async def send(data):
+            transport.sendto(data)
+        close = transport.close
+    elif scheme == 'pipe':
+        # 非阻塞写入端交给事件循环，写满时由drain等待，不阻塞循环
+        pipe = os.fdopen(os.open(address, os.O_WRONLY | os.O_NONBLOCK), 'wb', buffering=0)
+        transport, protocol = await loop.connect_write_pipe(asyncio.streams.FlowControlMixin, pipe)
+        writer = asyncio.StreamWriter(transport, protocol, None, loop)
+
+        async def send(data):
+            writer.write(data)
+            await writer.drain()
+        close = writer.close
+    else:
+        raise ValueError(f"不支持的数据来源: {source}")
+
+    try:
+        for series, data in (('I', TEST_SERIES1_DATA), ('II', TEST_SERIES2_DATA)):
+            for point, values in enumerate(data, 1):
+                for _ in range(repeats):
+                    L_v, V_g, T, C1, C2 = np.asarray(values) * (1 + noise * rng.standard_normal(5) / 10)
+                    head = f"ts={time.time():.3f} series={series} point={point}"
+                    await send(f"{head} L_v={L_v:.3f} V_g={V_g:.3f} T={T:.2f}\n"
+                               f"{head} C1={C1:.3f} C2={C2:.3f}\n".encode('utf-8'))
+                    await asyncio.sleep(interval)
+    except ConnectionError:
+        pass   # 采集端已结束（如到达采集时长）并关闭了连接或管道，模拟器随之停止
+    finally:
+        close()
+
+def check_live_source(source):
+    """检查数据来源，返回(scheme, '://', 地址)；不支持的来源抛出ValueError
+
+    pipe://使用POSIX命名管道(mkfifo)，Windows上没有，改用tcp://或udp://
+    """
+    scheme, sep, address = source.partition('://')
+    if scheme not in ('tcp', 'udp', 'pipe'):
+        raise ValueError(f"不支持的数据来源: {source}（应为tcp://、udp://或pipe://）")
+    if scheme == 'pipe' and not hasattr(os, 'mkfifo'):
+        raise ValueError(f"当前系统不支持命名管道来源 {source}，请改用tcp://或udp://")
+    return scheme, sep, address
+
+def run_live_acquisition(source=LIVE_DEFAULT_SOURCE, h=0.8, duration=None, out_dir='.', simulate=False,
+                         interval=1.0, dashboard=False, tower=None, n_boot=None, n_samples=None):
+    """命令行实时采集：结束（到时或Ctrl+C）后导出结果、保存图表并记入结果库
+
+    dashboard=True时同时打开实时仪表盘；tower为塔配置（默认DEFAULT_TOWER）；
+    n_boot、n_samples为导出结果中幂律拟合的bootstrap次数和不确定度抽样次数
+    """
+    check_live_source(source)
+    acquisition = LiveAcquisition(h, tower=tower)
+    board = LiveDashboard() if dashboard else None
+
+    def on_update(result):
+        _print_live_update(result)
+        # 帧间隔未到时不组装数据，高频读数下也不拖慢采集
+        if board is not None and board.due():
+            series1_df, series2_df, fits = acquisition.dashboard_view()
+            board.update(series1_df, series2_df, fits=fits)
+    acquisition.on_update = on_update
+
+    async def session():
+        pump = asyncio.create_task(board.pump()) if board is not None else None
+        try:
+            if not simulate:
+                await acquisition.run(source, duration)
+                return
+            # 采集与模拟器同时运行：先结束的一方决定何时停止（到达采集时长或模拟数据发送完毕）
+            ready = asyncio.Event()
+            task = asyncio.create_task(acquisition.run(source, duration, ready=ready))
+            listening = asyncio.create_task(ready.wait())
+            await asyncio.wait({task, listening}, return_when=asyncio.FIRST_COMPLETED)
+            listening.cancel()
+            if task.done():
+                await task   # 未能开始监听，抛出其错误
+                return
+            simulator = asyncio.create_task(simulate_sensor_stream(source, interval=interval))
+            done, _ = await asyncio.wait({task, simulator}, return_when=asyncio.FIRST_COMPLETED)
+            if simulator in done:
+                if simulator.exception() is not None:
+                    print(f"⚠ 传感器模拟器出错: {simulator.exception()}")
+                await asyncio.sleep(0.1)   # 让最后的读数到达
+                acquisition.stop()
+            else:
+                simulator.cancel()
+                await asyncio.gather(simulator, return_exceptions=True)
+            await task
+        finally:
+            if pump is not None:
+                pump.cancel()
+
+    print(f"开始实时采集: {source}（Ctrl+C结束）")
+    try:
+        asyncio.run(session())
+    except KeyboardInterrupt:
+        print("\n采集已停止")
+    if acquisition.dropped:
+        print(f"⚠ UDP缓冲已满，丢弃了 {acquisition.dropped} 条旧读数")
+
+    if board is not None:
+        series1_df, series2_df, fits = acquisition.dashboard_view()
+        board.update(series1_df, series2_df, fits=fits, force=True)
+    series_dfs = {name: df for name, df in acquisition.series_frames().items() if len(df)}
+    if not series_dfs:
+        print("未采集到完整的有效工况")
+        return acquisition
+    import datetime
+    os.makedirs(out_dir, exist_ok=True)
+    stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    excel_filename = os.path.join(out_dir, f'实时采集结果_{stamp}.xlsx')
+    png_filename = os.path.join(out_dir, f'实时采集图表_{stamp}.png')
+    if save_series_to_excel(series_dfs, excel_filename, h, tower=acquisition.tower, n_boot=n_boot,
+                            n_samples=n_samples):
+        plot_series(series_dfs, h, png_filename=png_filename, show=False, headless=True, n_boot=n_boot)
+        record_series_run(series_dfs, h, workbook=excel_filename, png=png_filename, source=source,
+                          db_path=os.path.join(out_dir, RESULTS_DB_NAME), tower=acquisition.tower)
+    if board is not None and not HEADLESS:
+        plt.show()   # 采集结束后仪表盘保持打开，关闭窗口后返回
+    return acquisition
+
+# ========== 新增：无交互批处理（命令行） ==========
+
+BATCH_FILE_PATTERNS = ('*.csv', '*.xlsx', '*.parquet')
+
+def expand_input_paths(patterns):
+    """将目录、通配符和文件路径展开为去重后的输入文件列表"""
+    import glob
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for ext in BATCH_FILE_PATTERNS:
+                files.extend(glob.glob(os.path.join(pattern, ext)))
+        elif any(ch in pattern for ch in '*?['):
+            files.extend(glob.glob(pattern))
+        elif os.path.isfile(pattern):
+            files.append(pattern)
+        else:
+            print(f"✗ 找不到输入: {pattern}")
+    return sorted(set(files))
+
+def run_pipeline_file(path, out_dir, h=None, plot=True, formats=None, D=None, targets=None, n_boot=None,
+                      n_samples=None):
+    """对单个输入文件执行完整流程：数据处理、导出结果、绘制图表；返回结果文件路径
+
+    h、D为None时取文件中的h列、D列（首行），否则用标准塔的值；
+    每个文件各用一个塔配置，不同几何尺寸的文件可以同时并行处理。
+    targets为设计目标表时，按本文件数据拟合的浓度模型和幂律反算，结果写入"设计反算"表。
+    n_boot、n_samples等设置都作为参数传入（不读写全局变量），spawn方式的子进程也得到相同的结果
+    """
+    df, codes = load_run_table(path)
+    tower = TowerConfig.from_table(df, h=h, D=D)
+    h = tower.h
+
+    valid_df = valid_long_table(df, codes, path)
+    series_dfs = process_long_table(valid_df, h, tower=tower)
+    extra_sheets = None
+    if targets is not None:
+        extra_sheets = {'设计反算': solve_design_targets(targets, ConcentrationModel.fit(valid_df),
+                                                      fit_series_table(series_dfs), tower)}
+
+    stem = os.path.splitext(os.path.basename(path))[0]
+    excel_filename = os.path.join(out_dir, f'{stem}_处理结果.xlsx')
+    if not save_series_to_excel(series_dfs, excel_filename, h, formats, tower=tower, extra_sheets=extra_sheets,
+                                n_boot=n_boot, n_samples=n_samples):
+        raise RuntimeError(f"结果导出失败: {excel_filename}")
+    png_filename = os.path.join(out_dir, f'{stem}_分析图表.png') if plot else None
+    if plot:
+        plot_series(series_dfs, h, png_filename=png_filename, show=False, headless=True, n_boot=n_boot)
+    record_series_run(series_dfs, h,
+                      workbook=excel_filename if 'xlsx' in (EXPORT_FORMATS if formats is None else formats) else None,
+                      png=png_filename, source=os.path.abspath(path),
+                      db_path=os.path.join(out_dir, RESULTS_DB_NAME), tower=tower)
+    if 'xlsx' in (EXPORT_FORMATS if formats is None else formats):
+        return excel_filename
+    return os.path.splitext(excel_filename)[0] + "_*"
+
+def run_batch(inputs, out_dir='.', workers=None, h=None, plot=True, formats=None, D=None, targets=None,
+              n_boot=None, n_samples=None):
+    """批量处理多个输入文件，按进程池并行；返回失败文件数"""
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    files = expand_input_paths(inputs)
+    if not files:
+        print("没有找到可处理的输入文件")
+        return 0
+    os.makedirs(out_dir, exist_ok=True)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(files)))
+    print(f"共 {len(files)} 个文件，使用 {workers} 个进程处理")
+
+    failures = 0
+    if workers == 1:
+        for path in files:
+            try:
+                print(f"✓ {path} -> {run_pipeline_file(path, out_dir, h, plot, formats, D, targets, n_boot, n_samples)}")
+            except Exception as e:
+                failures += 1
+                print(f"✗ {path}: {e}")
+        return failures
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_pipeline_file, path, out_dir, h, plot, formats, D, targets, n_boot, n_samples): path
+                   for path in files}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                print(f"✓ {path} -> {future.result()}")
+            except Exception as e:
+                failures += 1
+                print(f"✗ {path}: {e}")
+    return failures
+
+# ========== 新增：参数扫描（L_v、V_g、T、h网格） ==========
+
+SWEEP_AXES = ('L_v', 'V_g', 'T', 'h')     # 网格维度，h变化最快
+SWEEP_CHUNK_POINTS = 1_000_000            # 每块计算的网格点数，控制每个进程的内存
+SWEEP_OUTPUT_COLUMNS = ('L_v', 'V_g', 'T', 'h', 'C1', 'C2', 'U_L', 'u', 'Kxa', 'H_OL')
+
+class ConcentrationModel:
+    """扫描用的入口/出口浓度模型：C = c0 + c_L·L_v + c_V·V_g + c_T·T
+
+    常数模型即各斜率为0；可由实验数据最小二乘拟合得到。可pickle，供多进程使用
+    """
+    FEATURES = ('L_v', 'V_g', 'T')
+
+    def __init__(self, C1_coefs, C2_coefs):
+        self.C1_coefs = np.asarray(C1_coefs, dtype=float).reshape(len(self.FEATURES) + 1)
+        self.C2_coefs = np.asarray(C2_coefs, dtype=float).reshape(len(self.FEATURES) + 1)
+
+    @classmethod
+    def constant(cls, C1, C2):
+        """C1、C2取固定值"""
+        return cls([C1, 0, 0, 0], [C2, 0, 0, 0])
+
+    @classmethod
+    def fit(cls, df):
+        """由数据表（列L_v、V_g、T、C1、C2）最小二乘拟合
+
+        数据中为常数或与前面的变量共线的自变量无法确定斜率，不参与拟合（斜率取0，
+        即固定在数据中的取值，其作用并入截距），并给出警告
+        """
+        if len(df) < len(cls.FEATURES) + 1:
+            raise ValueError(f"拟合浓度模型至少需要 {len(cls.FEATURES) + 1} 行有效数据")
+        columns = {col: df[col].to_numpy(dtype=float) for col in cls.FEATURES}
+        # 按中心化、归一化后的列判断秩，避免量纲差异影响判断
+        scaled = [np.ones(len(df))]
+        kept, dropped = [], []
+        for col, values in columns.items():
+            centered = values - values.mean()
+            scale = np.abs(centered).max()
+            candidate = scaled + [centered / scale] if scale > 0 else None
+            if candidate is not None and np.linalg.matrix_rank(np.column_stack(candidate)) == len(candidate):
+                scaled, kept = candidate, kept + [col]
+            else:
+                dropped.append(col)
+        if dropped:
+            print(f"⚠ 浓度模型: {'、'.join(dropped)} 在数据中为常数或与其他变量共线，不参与拟合（斜率取0）")
+
+        X = np.column_stack([np.ones(len(df))] + [columns[col] for col in kept])
+        Y = df[['C1', 'C2']].to_numpy(dtype=float)
+        solved = np.linalg.lstsq(X, Y, rcond=None)[0]
+        coefs = np.zeros((len(cls.FEATURES) + 1, 2))
+        coefs[[0] + [cls.FEATURES.index(col) + 1 for col in kept]] = solved
+        return cls(coefs[:, 0], coefs[:, 1])
+
+    def __call__(self, L_v, V_g, T, h):
+        """返回网格点上的(C1, C2)"""
+        def evaluate(c):
+            return c[0] + c[1] * L_v + c[2] * V_g + c[3] * T
+        return evaluate(self.C1_coefs), evaluate(self.C2_coefs)
+
+    def __repr__(self):
+        def formula(name, c):
+            return f"{name} = {c[0]:.4g} {c[1]:+.4g}·L_v {c[2]:+.4g}·V_g {c[3]:+.4g}·T"
+        return f"{formula('C1', self.C1_coefs)}; {formula('C2', self.C2_coefs)}"
+
+def parse_sweep_axis(text):
+    """解析网格维度：起:止:点数（等间距）、逗号分隔的取值，或单个值"""
+    if ':' in text:
+        start, stop, num = text.split(':')
+        return np.linspace(float(start), float(stop), int(num))
+    return np.array([float(v) for v in text.split(',')])
+
+def sweep_dtype(float_dtype='float64'):
+    """扫描结果的结构化dtype：各数值列 + 验证错误码"""
+    return np.dtype([(col, float_dtype) for col in SWEEP_OUTPUT_COLUMNS] + [('code', np.uint8)])
+
+def sweep_chunk(axes, start, stop, model, tower=None):
+    """计算网格中平铺下标[start, stop)的点，返回{列名: 数组}"""
+    shape = tuple(len(axes[name]) for name in SWEEP_AXES)
+    index = np.unravel_index(np.arange(start, stop), shape)
+    L_v, V_g, T, h = (np.asarray(axes[name], dtype=float)[i] for name, i in zip(SWEEP_AXES, index))
+    C1, C2 = model(L_v, V_g, T, h)
+    C1 = np.broadcast_to(C1, L_v.shape)
+    C2 = np.broadcast_to(C2, L_v.shape)
+    res = calculate_kxa_h_batch(L_v, V_g, T, C1, C2, h, tower)
+    return {
+        'L_v': L_v, 'V_g': V_g, 'T': T, 'h': h, 'C1': C1, 'C2': C2,
+        'U_L': res['U_L'], 'u': res['u'], 'Kxa': res['Kxa'], 'H_OL': res['H_OL'],
+        'code': validate_data_array(T, C1, C2, L_v=L_v, V_g=V_g),
+    }
+
+def _sweep_worker(axes, start, stop, model, tower, fmt, path, float_dtype):
+    """子进程：计算一块并直接写入输出（npy内存映射的对应切片，或一个Parquet分片文件）"""
+    columns = sweep_chunk(axes, start, stop, model, tower)
+    if fmt == 'npy':
+        out = np.load(path, mmap_mode='r+')
+        block = np.empty(stop - start, dtype=out.dtype)
+        for col, values in columns.items():
+            block[col] = values
+        out[start:stop] = block
+        out.flush()
+        del out
+    else:
+        import pyarrow as pa  # 可选依赖，仅输出Parquet时需要
+        import pyarrow.parquet as pq
+        table = pa.table({col: values if col == 'code' else values.astype(float_dtype)
+                          for col, values in columns.items()})
+        pq.write_table(table, os.path.join(path, f'part-{start:012d}.parquet'))
+    valid = columns['code'] == ERR_OK
+    kxa = columns['Kxa'][valid]
+    return stop - start, int(valid.sum()), (float(kxa.min()), float(kxa.max())) if len(kxa) else None
+
+def run_sweep(axes, model, out_path, fmt='npy', workers=None, chunk_points=None, tower=None,
+              float_dtype='float64'):
+    """参数扫描：把L_v×V_g×T×h网格按块分给进程池计算，结果直接写入npy内存映射数组或Parquet数据集
+
+    axes为{维度名: 取值数组}（维度见SWEEP_AXES）；model(L_v, V_g, T, h)返回(C1, C2)，
+    须可pickle（如ConcentrationModel）。每块最多chunk_points个点，内存与网格总点数无关。
+    返回汇总信息字典
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    axes = {name: np.asarray(axes[name], dtype=float).ravel() for name in SWEEP_AXES}
+    total = int(np.prod([len(values) for values in axes.values()]))
+    if total == 0:
+        raise ValueError("扫描网格为空")
+    chunk_points = chunk_points or SWEEP_CHUNK_POINTS
+    chunks = [(start, min(start + chunk_points, total)) for start in range(0, total, chunk_points)]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(chunks)))
+    tower = DEFAULT_TOWER if tower is None else tower
+
+    if fmt == 'npy':
+        from numpy.lib.format import open_memmap
+        open_memmap(out_path, mode='w+', dtype=sweep_dtype(float_dtype), shape=(total,)).flush()
+    elif fmt == 'parquet':
+        try:
+            import pyarrow  # noqa: F401  可选依赖，须在建目录、开进程池之前检查
+        except ImportError:
+            raise ImportError("输出Parquet需要pyarrow，请先安装: pip install pyarrow") from None
+        os.makedirs(out_path, exist_ok=True)
+    else:
+        raise ValueError(f"不支持的扫描输出格式: {fmt}（可选 npy、parquet）")
+
+    print(f"扫描 {' × '.join(f'{name}[{len(v)}]' for name, v in axes.items())} = {total:,} 个点，"
+          f"{len(chunks)} 块，{workers} 个进程")
+    t0 = time.perf_counter()
+    done = valid = 0
+    kxa_range = [np.inf, -np.inf]
+
+    def collect(result):
+        nonlocal done, valid
+        n, n_valid, span = result
+        done += n
+        valid += n_valid
+        if span is not None:
+            kxa_range[0] = min(kxa_range[0], span[0])
+            kxa_range[1] = max(kxa_range[1], span[1])
+        print(f"\r进度: {done / total:6.1%}  ({done:,}/{total:,})", end='', flush=True)
+
+    args = (axes, model, tower, fmt, out_path, float_dtype)
+    if workers == 1:
+        for start, stop in chunks:
+            collect(_sweep_worker(axes, start, stop, *args[1:]))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_sweep_worker, axes, start, stop, *args[1:]) for start, stop in chunks]
+            for future in as_completed(futures):
+                collect(future.result())
+    elapsed = time.perf_counter() - t0
+    print(f"\n✓ 扫描完成: {elapsed:.1f} s（{total / max(elapsed, 1e-9):,.0f} 点/秒），"
+          f"有效点 {valid:,}，结果: {out_path}")
+    return {'points': total, 'valid': valid, 'seconds': elapsed, 'path': out_path,
+            'Kxa_range': tuple(kxa_range) if valid else None}
+
+# ========== 新增：设计反算（向量化区间求解） ==========
+
+SOLVER_TOLERANCE = 1e-10     # 区间相对宽度小于该值时视为收敛
+SOLVER_MAX_ITER = 100
+SOLVER_RESIDUAL_TOLERANCE = 1e-6   # 收敛后函数值与目标的相对偏差上限，超过说明区间内函数不连续
+# 各待求量的默认搜索区间；流量和h按对数二分，温度按线性二分
+SOLVER_BOUNDS = {'L_v': (1.0, 1000.0), 'V_g': (0.1, 500.0), 'T': (0.0, 30.0), 'h': (0.01, 50.0)}
+SOLVER_QUANTITIES = ('Kxa', 'H_OL')
+
+# 求解状态码
+SOLVE_OK = 0
+SOLVE_NO_BRACKET = 1
+SOLVE_MAX_ITER = 2
+SOLVE_INVALID = 3
+SOLVE_NOT_APPLICABLE = 4
+SOLVE_DISCONTINUOUS = 5
+SOLVE_STATUS_MESSAGES = {
+    SOLVE_OK: '收敛',
+    SOLVE_NO_BRACKET: '目标不在搜索区间内',
+    SOLVE_MAX_ITER: '未在最大迭代次数内收敛',
+    SOLVE_INVALID: '输入无效',
+    SOLVE_NOT_APPLICABLE: '不适用',
+    SOLVE_DISCONTINUOUS: '函数在解处不连续，无精确解',
+}
+
+def solve_bracketed(func, target, lo, hi, log_scale=True, tol=None, max_iter=None):
+    """向量化区间求根：对全部目标同时二分，求func(x, 下标) = target
+
+    func接收试探值数组及其对应的目标下标，返回同形状的函数值；lo、hi为各目标的搜索区间。
+    每次迭代只计算尚未收敛的目标。返回(解, 状态码, 迭代次数)
+    """
+    tol = SOLVER_TOLERANCE if tol is None else tol
+    max_iter = SOLVER_MAX_ITER if max_iter is None else max_iter
+    target = np.asarray(target, dtype=float).ravel()
+    n = target.size
+    lo = np.broadcast_to(np.asarray(lo, dtype=float), n).copy()
+    hi = np.broadcast_to(np.asarray(hi, dtype=float), n).copy()
+    x = np.full(n, np.nan)
+    status = np.full(n, SOLVE_NO_BRACKET, dtype=np.uint8)
+    iters = np.zeros(n, dtype=np.int32)
+    index = np.arange(n)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        f_lo = func(lo, index) - target
+        f_hi = func(hi, index) - target
+    invalid = ~(np.isfinite(target) & np.isfinite(f_lo) & np.isfinite(f_hi) & (lo < hi))
+    if log_scale:
+        invalid |= ~(lo > 0)
+    status[invalid] = SOLVE_INVALID
+    for bound, f_bound in ((lo, f_lo), (hi, f_hi)):
+        exact = ~invalid & (f_bound == 0)
+        x[exact] = bound[exact]
+        status[exact] = SOLVE_OK
+    active = index[~invalid & (status != SOLVE_OK) & (np.sign(f_lo) != np.sign(f_hi))]
+    a, b, fa = lo[active], hi[active], f_lo[active]
+
+    for it in range(1, max_iter + 1):
+        if active.size == 0:
+            break
+        m = np.sqrt(a * b) if log_scale else (a + b) / 2
+        with np.errstate(invalid='ignore', divide='ignore'):
+            fm = func(m, active) - target[active]
+        same = np.sign(fm) == np.sign(fa)
+        a, fa = np.where(same, m, a), np.where(same, fm, fa)
+        b = np.where(same, b, m)
+        iters[active] = it
+        done = (fm == 0) | (np.abs(b - a) <= tol * np.abs(m)) | ~np.isfinite(fm)
+        x[active[done]] = m[done]
+        status[active[done]] = np.where(np.isfinite(fm[done]), SOLVE_OK, SOLVE_INVALID)
+        keep = ~done
+        active, a, b, fa = active[keep], a[keep], b[keep], fa[keep]
+
+    x[active] = np.sqrt(a * b) if log_scale else (a + b) / 2
+    status[active] = SOLVE_MAX_ITER
+
+    # 二分在跳跃点（如推动力计算的分支切换处）也会“收敛”，用残差区分
+    solved = index[status == SOLVE_OK]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        residual = np.abs(func(x[solved], solved) - target[solved])
+    jump = ~(residual <= SOLVER_RESIDUAL_TOLERANCE * np.maximum(np.abs(target[solved]), 1e-300))
+    status[solved[jump]] = SOLVE_DISCONTINUOUS
+    return x, status, iters
+
+def _model_function(quantity, unknown, conditions, model, tower):
+    """机理模型中quantity随unknown变化的函数，供solve_bracketed调用
+
+    其余输入取conditions中各目标的值；C1、C2由浓度模型model给出，model为None时取conditions中的C1、C2
+    """
+    def func(x, index):
+        values = {name: conditions[name][index] for name in SWEEP_AXES if name != unknown}
+        values[unknown] = x
+        if model is None:
+            C1, C2 = conditions['C1'][index], conditions['C2'][index]
+        else:
+            C1, C2 = model(values['L_v'], values['V_g'], values['T'], values['h'])
+        res = calculate_kxa_h_batch(values['L_v'], values['V_g'], values['T'], C1, C2, values['h'], tower)
+        return np.broadcast_to(res[quantity], x.shape)
+    return func
+
+def inverse_power_law(a, b, target):
+    """由幂律 y = a·x^b 解析反解 x = (y/a)^(1/b)，返回(解, 状态码)"""
+    a, b, target = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (a, b, target)))
+    ok = np.isfinite(a) & np.isfinite(b) & (a > 0) & (b != 0) & (target > 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x = np.where(ok, (target / np.where(ok, a, 1.0)) ** (1.0 / np.where(ok, b, 1.0)), np.nan)
+    return x, np.where(ok, SOLVE_OK, SOLVE_INVALID).astype(np.uint8)
+
+# 幂律反解得到横轴变量后换算为流量：待求量 -> (横轴变量, 换算系数函数)
+_POWER_LAW_UNKNOWNS = {
+    'L_v': ('U_L', lambda tower: tower.F * 1000),    # U_L = L_v / (F·1000)
+    'V_g': ('u', lambda tower: tower.F * 3600),      # u = V_g / 3600 / F
+}
+
+def solve_design_targets(targets, model=None, fits=None, tower=None, tol=None, max_iter=None):
+    """批量设计反算
+
+    targets每行一个目标：quantity（Kxa或H_OL）、target（目标值）、unknown（待求量L_v/V_g/T/h），
+    以及其余工况列L_v、V_g、T、h（待求量那一列可省略）；可选列lo、hi（搜索区间）、
+    C1、C2（model为None时使用）、series（幂律反解所用系列）。
+    按(quantity, unknown)分组，各组一次向量化求解。单调关系下，解即目标值的临界工况，
+    例如H_OL ≤ 0.5 m 时的解为H_OL恰为0.5 m的流量。
+    fits为fit_series_table的结果时，对L_v、V_g另给出幂律拟合的解析反解。返回加上结果列的表
+    """
+    tower = DEFAULT_TOWER if tower is None else tower
+    table = targets.reset_index(drop=True).copy()
+    n = len(table)
+    unknown_quantity = set(table['quantity']) - set(SOLVER_QUANTITIES)
+    unknown_var = set(table['unknown']) - set(SOLVER_BOUNDS)
+    if unknown_quantity or unknown_var:
+        raise ValueError(f"无法求解: {', '.join(map(str, unknown_quantity | unknown_var))}"
+                         f"（quantity可选{SOLVER_QUANTITIES}，unknown可选{tuple(SOLVER_BOUNDS)}）")
+    conditions = {name: table[name].to_numpy(dtype=float) if name in table.columns else np.full(n, np.nan)
+                  for name in SWEEP_AXES + ('C1', 'C2')}
+    target = table['target'].to_numpy(dtype=float)
+
+    solution = np.full(n, np.nan)
+    status = np.full(n, SOLVE_INVALID, dtype=np.uint8)
+    iters = np.zeros(n, dtype=np.int32)
+    fit_solution = np.full(n, np.nan)
+    fit_status = np.full(n, SOLVE_NOT_APPLICABLE, dtype=np.uint8)
+    for (quantity, unknown), rows in table.groupby(['quantity', 'unknown'], sort=False).indices.items():
+        lo, hi = SOLVER_BOUNDS[unknown]
+        lo = table['lo'].to_numpy(dtype=float)[rows] if 'lo' in table.columns else lo
+        hi = table['hi'].to_numpy(dtype=float)[rows] if 'hi' in table.columns else hi
+        group = {name: values[rows] for name, values in conditions.items()}
+        func = _model_function(quantity, unknown, group, model, tower)
+        solution[rows], status[rows], iters[rows] = solve_bracketed(
+            func, target[rows], lo, hi, log_scale=unknown != 'T', tol=tol, max_iter=max_iter)
+
+        if fits is not None and unknown in _POWER_LAW_UNKNOWNS:
+            var, scale = _POWER_LAW_UNKNOWNS[unknown]
+            candidates = fits[fits['关系'] == f'{quantity}_{var}']
+            if 'series' in table.columns:
+                chosen = table['series'].astype(str).to_numpy()[rows]
+            else:
+                chosen = np.full(len(rows), candidates['系列'].iloc[0] if len(candidates) else '')
+            params = candidates.set_index('系列')[['系数_a', '指数_b']].reindex(chosen).to_numpy(dtype=float)
+            x, fit_status[rows] = inverse_power_law(params[:, 0], params[:, 1], target[rows])
+            fit_solution[rows] = x * scale(tower)
+
+    # 解处的工况是否仍在模型适用范围内
+    at = {name: np.where(table['unknown'] == name, solution, conditions[name]) for name in SWEEP_AXES}
+    if model is None:
+        C1, C2 = conditions['C1'], conditions['C2']
+    else:
+        C1, C2 = model(at['L_v'], at['V_g'], at['T'], at['h'])
+    codes = validate_data_array(at['T'], np.broadcast_to(C1, n), np.broadcast_to(C2, n),
+                                L_v=at['L_v'], V_g=at['V_g'])
+
+    table['解_机理模型'] = solution
+    table['状态_机理模型'] = [SOLVE_STATUS_MESSAGES[c] for c in status]
+    table['迭代次数'] = iters
+    table['解处验证'] = [('' if np.isnan(x) else format_error_code(c) if c else '通过')
+                     for c, x in zip(codes, solution)]
+    if fits is not None:
+        table['解_幂律拟合'] = fit_solution
+        table['状态_幂律拟合'] = [SOLVE_STATUS_MESSAGES[c] for c in fit_status]
+    return table
+
+def load_design_targets(path):
+    """读取设计目标表(CSV/XLSX)"""
+    if path.lower().endswith(('.xlsx', '.xlsm')):
+        table = pd.read_excel(path)
+    else:
+        table = pd.read_csv(path)
+    missing = [c for c in ('quantity', 'target', 'unknown') if c not in table.columns]
+    if missing:
+        raise ValueError(f"{path} 缺少列: {', '.join(missing)}")
+    return table
+
+def build_arg_parser():
+    """命令行参数：不带子命令时进入交互菜单"""
+    import argparse
+    # 关闭前缀缩写：子命令的--h不能被主解析器当作--headless/--help的缩写
+    parser = argparse.ArgumentParser(description='氧解吸实验数据处理系统', allow_abbrev=False)
+    parser.add_argument('--startup-profile', action='store_true',
+                        help='报告启动及各依赖库的导入耗时后退出')
+    parser.add_argument('--headless', action='store_true',
+                        help='绘图只保存PNG，不弹出窗口（无显示器的工作站）')
+    parser.add_argument('--bootstrap', type=int, default=0, metavar='N',
+                        help='对幂律拟合做N次bootstrap重采样，在图表和工作簿中给出a、b的置信区间')
+    parser.add_argument('--uncertainty', type=int, default=0, metavar='N',
+                        help='每行抽N组扰动输入做蒙特卡洛不确定度传播，结果写入工作簿（N≥2，0为不计算）')
+    subparsers = parser.add_subparsers(dest='command')
+
+    batch = subparsers.add_parser('batch', help='无交互批量处理实验数据文件(CSV/XLSX/Parquet)')
+    batch.add_argument('inputs', nargs='+', help='输入文件、目录或通配符')
+    batch.add_argument('-o', '--out-dir', default='.', help='结果输出目录（默认当前目录）')
+    batch.add_argument('-j', '--workers', type=int, default=None, help='并行进程数（默认CPU核数）')
+    batch.add_argument('--h', type=float, default=None, dest='h',
+                       help='填料层高度 h (m)，默认取文件中的h列，否则0.8')
+    batch.add_argument('--D', type=float, default=None, dest='D',
+                       help=f'塔内径 D (m)，默认取文件中的D列，否则{DEFAULT_TOWER.D:g}')
+    batch.add_argument('--no-plot', action='store_true', help='只导出Excel，不绘制图表')
+    batch.add_argument('--targets', default=None,
+                       help='设计目标表(CSV/XLSX)：按各文件的数据反算所需流量或h，写入工作簿的"设计反算"表')
+    batch.add_argument('-f', '--formats', default=','.join(EXPORT_FORMATS),
+                       help=f"导出格式，逗号分隔（可选: {', '.join(SUPPORTED_EXPORT_FORMATS)}）")
+
+    sweep = subparsers.add_parser('sweep', help='参数扫描：在L_v×V_g×T×h网格上批量计算Kxa、H_OL，用于新塔设计')
+    sweep.add_argument('--L_v', required=True, help='液体流量(L/h)：起:止:点数，或逗号分隔的取值')
+    sweep.add_argument('--V_g', required=True, help='气体流量(m3/h)，格式同上')
+    sweep.add_argument('--T', required=True, help='水温(°C)，格式同上')
+    sweep.add_argument('--h', required=True, dest='h', help='填料层高度(m)，格式同上')
+    sweep.add_argument('--D', type=float, default=DEFAULT_TOWER.D, dest='D',
+                       help=f'塔内径 D (m)，默认{DEFAULT_TOWER.D:g}')
+    concentration = sweep.add_mutually_exclusive_group(required=True)
+    concentration.add_argument('--C', nargs=2, type=float, metavar=('C1', 'C2'),
+                               help='入口、出口浓度取固定值(mg/L)')
+    concentration.add_argument('--data', help='由该实验数据文件的有效行拟合C1、C2关于L_v、V_g、T的线性模型')
+    sweep.add_argument('-o', '--out', default='参数扫描结果.npy',
+                       help='输出：.npy内存映射数组，或Parquet数据集目录（--format parquet）')
+    sweep.add_argument('--format', choices=('npy', 'parquet'), default='npy', help='输出格式（默认npy）')
+    sweep.add_argument('--float32', action='store_true', help='数值列用float32存储，体积减半')
+    sweep.add_argument('-j', '--workers', type=int, default=None, help='并行进程数（默认CPU核数）')
+    sweep.add_argument('--chunk', type=int, default=SWEEP_CHUNK_POINTS, help=f'每块点数（默认{SWEEP_CHUNK_POINTS}）')
+
+    solve = subparsers.add_parser('solve', help='设计反算：求达到目标Kxa/H_OL所需的流量、温度或填料层高度')
+    solve.add_argument('targets', help='设计目标表(CSV/XLSX)，列: quantity, target, unknown, L_v, V_g, T, h')
+    source = solve.add_mutually_exclusive_group()
+    source.add_argument('--data', help='实验数据文件：拟合浓度模型，并给出幂律拟合的反解')
+    source.add_argument('--C', nargs=2, type=float, metavar=('C1', 'C2'), help='入口、出口浓度取固定值(mg/L)')
+    solve.add_argument('--D', type=float, default=DEFAULT_TOWER.D, dest='D',
+                       help=f'塔内径 D (m)，默认{DEFAULT_TOWER.D:g}')
+    solve.add_argument('-o', '--out', default='设计反算结果.xlsx', help='输出文件(.xlsx或.csv)')
+
+    archive = subparsers.add_parser('archive-fit', help='对结果库中全部历史明细做总体幂律拟合（分块扫描，内存与归档大小无关）')
+    archive.add_argument('--db', default=RESULTS_DB_NAME, help=f'结果库路径（默认{RESULTS_DB_NAME}）')
+    archive.add_argument('--chunk', type=int, default=DEFAULT_CHUNK_ROWS, help=f'每块行数（默认{DEFAULT_CHUNK_ROWS}）')
+    archive.add_argument('-o', '--out', default=None, help='同时把拟合表保存到该文件(.xlsx或.csv)')
+
+    live = subparsers.add_parser('live', help='实时采集：从TCP/UDP端口或命名管道读取传感器读数并即时计算')
+    live.add_argument('source', nargs='?', default=LIVE_DEFAULT_SOURCE,
+                      help=f'tcp://主机:端口、udp://主机:端口 或 pipe://路径（默认{LIVE_DEFAULT_SOURCE}）')
+    live.add_argument('--duration', type=float, default=None, help='采集时长(s)，默认直到Ctrl+C')
+    live.add_argument('--h', type=float, default=0.8, dest='h', help='填料层高度 h (m)，默认0.8')
+    live.add_argument('--D', type=float, default=DEFAULT_TOWER.D, dest='D',
+                      help=f'塔内径 D (m)，默认{DEFAULT_TOWER.D:g}')
+    live.add_argument('-o', '--out-dir', default='.', help='结果输出目录（默认当前目录）')
+    live.add_argument('--simulate', action='store_true', help='同时运行传感器模拟器，向该来源发送测试读数')
+    live.add_argument('--interval', type=float, default=1.0, help='模拟器读数间隔(s)，默认1')
+    live.add_argument('--dashboard', action='store_true', help='打开实时仪表盘（blitting刷新三联图）')
+    return parser
+
+def main(argv=None):
+    """程序入口：解析命令行，批处理或进入菜单"""
+    global HEADLESS
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    if args.uncertainty < 0 or args.uncertainty == 1:
+        parser.error("--uncertainty 须为0（不计算）或至少为2（样本标准差需要两次以上抽样）")
+    if args.startup_profile:
+        report_startup_profile()
+        return 0
+    if args.headless:
+        HEADLESS = True
+    if args.command == 'batch':
+        formats = tuple(f.strip().lower() for f in args.formats.split(',') if f.strip())
+        unknown = [f for f in formats if f not in SUPPORTED_EXPORT_FORMATS]
+        if unknown:
+            print(f"✗ 不支持的导出格式: {', '.join(unknown)}")
+            return 2
+        targets = load_design_targets(args.targets) if args.targets else None
+        failures = run_batch(args.inputs, args.out_dir, args.workers, args.h, not args.no_plot, formats, args.D,
+                             targets, args.bootstrap, args.uncertainty)
+        return 1 if failures else 0
+    if args.command == 'sweep':
+        if args.data:
+            df, codes = load_run_table(args.data)
+            model = ConcentrationModel.fit(df[valid_mask(codes)])
+        else:
+            model = ConcentrationModel.constant(*args.C)
+        print(f"浓度模型: {model}")
+        axes = {name: parse_sweep_axis(getattr(args, name)) for name in SWEEP_AXES}
+        try:
+            run_sweep(axes, model, args.out, args.format, args.workers, args.chunk, TowerConfig(D=args.D),
+                      'float32' if args.float32 else 'float64')
+        except ImportError as e:
+            print(f"✗ {e}")
+            return 2
+        return 0
+    if args.command == 'solve':
+        tower = TowerConfig(D=args.D)
+        model = fits = None
+        if args.data:
+            df, codes = load_run_table(args.data)
+            valid_df = valid_long_table(df, codes, args.data)
+            tower = TowerConfig.from_table(df, D=args.D)
+            model = ConcentrationModel.fit(valid_df)
+            fits = fit_series_table(process_long_table(valid_df, tower.h, tower=tower))
+        elif args.C:
+            model = ConcentrationModel.constant(*args.C)
+        if model is not None:
+            print(f"浓度模型: {model}")
+        result = solve_design_targets(load_design_targets(args.targets), model, fits, tower)
+        if args.out.lower().endswith('.csv'):
+            result.to_csv(args.out, index=False, encoding='utf-8-sig')
+        else:
+            _write_excel({'设计反算': result}, args.out)
+        counts = result['状态_机理模型'].value_counts()
+        print(f"✓ 共 {len(result)} 个目标（" + "，".join(f"{k} {v}" for k, v in counts.items()) + f"），结果: {args.out}")
+        return 0
+    if args.command == 'archive-fit':
+        if not os.path.exists(args.db):
+            print(f"✗ 找不到结果库: {args.db}")
+            return 2
+        table = accumulate_results_db(args.db, args.chunk).fit_table()
+        print(table.to_string(index=False))
+        if args.out:
+            if args.out.lower().endswith('.csv'):
+                table.to_csv(args.out, index=False, encoding='utf-8-sig')
+            else:
+                _write_excel({'归档幂律拟合': table}, args.out)
+            print(f"✓ 拟合表已保存: {args.out}")
+        return 0
+    if args.command == 'live':
+        try:
+            check_live_source(args.source)
+        except ValueError as e:
+            print(f"✗ {e}")
+            return 2
+        run_live_acquisition(args.source, args.h, args.duration, args.out_dir, args.simulate, args.interval,
+                             args.dashboard, TowerConfig(D=args.D, h=args.h), args.bootstrap,
+                             args.uncertainty)
+        return 0
+    main_menu(AnalysisSession(n_boot=args.bootstrap, n_samples=args.uncertainty))
+    return 0
+
+# ========== 新增：启动耗时分析 ==========
+
+# 按实际使用顺序列出的重型依赖
+PROFILED_MODULES = ['pandas', 'matplotlib', 'matplotlib.pyplot', 'matplotlib.font_manager', 'openpyxl']
+
+def report_startup_profile():
+    """打印程序启动耗时及各重型库的导入耗时"""
+    print("=" * 70)
+    print("启动耗时分析")
+    print("=" * 70)
+    print(f"{'程序自身（到菜单就绪）':<28}{(time.perf_counter() - _STARTUP_T0) * 1000:10.1f} ms")
+    total = 0.0
+    for name in PROFILED_MODULES:
+        if name in sys.modules:
+            print(f"{name:<32}{'已加载':>10}")
+            continue
+        t0 = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            print(f"{name:<32}{'未安装':>10}")
+            continue
+        elapsed = (time.perf_counter() - t0) * 1000
+        total += elapsed
+        print(f"{name:<32}{elapsed:10.1f} ms")
+    print("-" * 70)
+    print(f"{'重型库导入合计':<25}{total:10.1f} ms")
+
 # ========== 程序入口 ==========
 
 if __name__ == "__main__":
-    # 直接进入菜单模式
-    main_menu()
\ No newline at end of file
+    # 带batch子命令时批处理，否则直接进入菜单模式
+    sys.exit(main())
\ No newline at end of file